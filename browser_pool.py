@@ -0,0 +1,201 @@
+# Selenium 브라우저 세션 풀
+# - 멀티프로세싱 워커 프로세스마다 Chrome 세션 하나를 띄워 두고 여러 카테고리에서 재사용합니다.
+#   (카테고리마다 Chrome을 새로 띄우고 종료하던 시간을 줄임)
+# - 카테고리를 시작할 때마다 세션을 초기화(쿠키 삭제, 추가 창 닫기, 빈 페이지 이동)하고 상태를 확인합니다.
+# - 응답하지 않거나, max_pages 페이지 이상 사용했거나, 메모리(RSS)가 max_rss_mb를 넘으면
+#   카테고리 사이에서 새 세션으로 교체합니다.
+# - 워커 프로세스가 종료될 때 세션을 정리합니다 (multiprocessing.util.Finalize).
+
+import os
+from multiprocessing import util
+from time import sleep, monotonic
+
+import psutil
+from selenium import webdriver
+from selenium.webdriver.chrome.service import Service
+
+from page_readiness import AdaptiveTimeout
+
+# 이 페이지 수 이상 사용한 세션은 교체
+BROWSER_MAX_PAGES = 500
+
+# Chrome 프로세스(드라이버 + 브라우저 + 렌더러) 메모리 합계가 이 값(MB)을 넘으면 교체
+BROWSER_MAX_RSS_MB = 1500
+
+# 프로세스별 세션 (워커 프로세스 안에서만 사용)
+_process_session = None
+
+
+class BrowserSession:
+    """
+    재사용되는 Chrome 세션 하나 (시작 시간, 사용 페이지 수, 메모리 사용량을 기록)
+    """
+    def __init__(self, options, driver_path, max_pages=BROWSER_MAX_PAGES, max_rss_mb=BROWSER_MAX_RSS_MB):
+        self.options = options
+        self.driver_path = driver_path
+        self.max_pages = max_pages
+        self.max_rss_mb = max_rss_mb
+        self.browser = None
+        self.pages = 0  # 현재 세션에서 처리한 페이지 수
+        self.starts = 0  # 세션을 띄운 횟수
+        self.startup_time = 0.0  # 세션을 띄우는 데 걸린 시간 합계
+        self.last_startup = 0.0  # 가장 최근 acquire에서 걸린 시작 시간 (재사용이면 0)
+        self.recycled = 0  # 페이지 수 / 메모리 / 상태 이상으로 교체한 횟수
+        self.list_timeout = AdaptiveTimeout()  # 목록 대기 타임아웃 (세션을 교체해도 유지)
+
+    def acquire(self):
+        """
+        초기화된 브라우저를 반환하는 메서드 (필요하면 새로 띄우거나 교체)
+        """
+        self.last_startup = 0.0
+        if self.browser is not None:
+            reason = self.recycle_reason()
+            if reason:
+                print(f"브라우저 세션 교체 ({reason}) - pid {os.getpid()}")
+                self.recycled += 1
+                self.quit()
+        if self.browser is None:
+            self.start()
+        else:
+            self.reset()
+        return self.browser
+
+    def start(self):
+        start_time = monotonic()
+        self.browser = webdriver.Chrome(service=Service(self.driver_path), options=self.options)
+        self.last_startup = monotonic() - start_time
+        self.startup_time += self.last_startup
+        self.starts += 1
+        self.pages = 0
+
+    def reset(self):
+        """
+        이전 카테고리의 상태(추가 창, 쿠키, 현재 페이지)를 지우는 메서드
+        """
+        handles = self.browser.window_handles
+        for handle in handles[1:]:
+            self.browser.switch_to.window(handle)
+            self.browser.close()
+        self.browser.switch_to.window(handles[0])
+        self.browser.delete_all_cookies()
+        self.browser.get('about:blank')
+
+    def healthy(self):
+        """
+        브라우저가 명령에 응답하는지 확인하는 메서드
+        """
+        try:
+            return self.browser.execute_script('return 1') == 1
+        except Exception:
+            return False
+
+    def recycle_reason(self):
+        """
+        세션을 교체해야 하는 이유를 반환하는 메서드 (교체가 필요 없으면 '')
+        """
+        if not self.healthy():
+            return '응답 없음'
+        if self.max_pages and self.pages >= self.max_pages:
+            return f'{self.pages}페이지 사용'
+        rss_mb = self.rss_mb()
+        if self.max_rss_mb and rss_mb > self.max_rss_mb:
+            return f'메모리 {rss_mb:.0f}MB'
+        return ''
+
+    def count_page(self):
+        self.pages += 1
+
+    def rss_mb(self):
+        """
+        드라이버와 하위 Chrome 프로세스의 메모리(RSS) 합계(MB)
+        """
+        try:
+            process = psutil.Process(self.browser.service.process.pid)
+            processes = [process] + process.children(recursive=True)
+        except Exception:
+            return 0.0
+        rss = 0
+        for proc in processes:
+            try:
+                rss += proc.memory_info().rss
+            except psutil.Error:
+                pass
+        return rss / 1024 / 1024
+
+    def discard(self):
+        """
+        오류가 난 세션을 종료해 다음 acquire에서 새로 띄우도록 하는 메서드
+        """
+        self.recycled += 1
+        self.quit()
+
+    def quit(self):
+        """
+        브라우저와 드라이버를 종료하고 남은 Chrome 프로세스를 정리하는 메서드
+        """
+        browser, self.browser = self.browser, None
+        if browser is None:
+            return
+        try:
+            pid = browser.service.process.pid
+        except Exception:
+            pid = None
+
+        try:
+            # 브라우저 종료
+            browser.quit()
+            sleep(1)  # 브라우저 종료 후 잠시 대기
+        except Exception:
+            pass
+
+        if pid is not None:
+            try:
+                # 프로세스 강제 종료
+                process = psutil.Process(pid)
+                for proc in process.children(recursive=True):
+                    proc.kill()
+                process.kill()
+            except Exception:
+                pass
+
+    def category_stats(self, readiness=None, extract_time=0.0):
+        """
+        카테고리 하나를 처리한 뒤의 세션 통계 (readiness를 넘기면 대기 / 추출 시간 포함)
+        """
+        return {'pid': os.getpid(), 'startup_time': self.last_startup, 'pages': self.pages,
+                'rss_mb': self.rss_mb() if self.browser is not None else 0.0,
+                'wait_time': readiness.wait_time if readiness else 0.0,
+                'timeouts': readiness.timeouts if readiness else 0,
+                'extract_time': extract_time}
+
+
+def acquire_browser_session(options, driver_path, max_pages=BROWSER_MAX_PAGES, max_rss_mb=BROWSER_MAX_RSS_MB):
+    """
+    현재 프로세스의 브라우저 세션을 반환하는 함수 (처음 호출 시 생성하고 프로세스 종료 시 정리 등록)
+    """
+    global _process_session
+    if _process_session is None:
+        _process_session = BrowserSession(options, driver_path, max_pages, max_rss_mb)
+        util.Finalize(_process_session, _process_session.quit, exitpriority=10)
+    return _process_session
+
+
+def format_browser_stats(stats_list):
+    """
+    카테고리별 세션 통계를 모아 세션 시작 시간 / 메모리 요약 문자열을 만드는 함수
+    """
+    stats_list = [stats for stats in stats_list if stats]
+    if not stats_list:
+        return ''
+    starts = [stats['startup_time'] for stats in stats_list if stats['startup_time'] > 0]
+    peak_rss = {}
+    for stats in stats_list:
+        peak_rss[stats['pid']] = max(peak_rss.get(stats['pid'], 0.0), stats['rss_mb'])
+    lines = [f"브라우저 세션 {len(peak_rss)}개, 시작 {len(starts)}회 (카테고리 {len(stats_list)}개), "
+             f"시작 시간 합계 {sum(starts):.1f}초 (평균 {sum(starts) / len(starts) if starts else 0:.1f}초), "
+             f"목록 대기 {sum(stats['wait_time'] for stats in stats_list):.1f}초 "
+             f"(타임아웃 {sum(stats['timeouts'] for stats in stats_list)}회), "
+             f"제품 추출 {sum(stats['extract_time'] for stats in stats_list):.1f}초"]
+    for pid, rss_mb in sorted(peak_rss.items()):
+        lines.append(f"  pid {pid}: 최대 RSS {rss_mb:.0f}MB")
+    return '\n'.join(lines)
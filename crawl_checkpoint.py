@@ -0,0 +1,124 @@
+# 카테고리 / 페이지 단위 크롤링 체크포인트
+# - 크롤링 중에는 CSV를 <카테고리>.csv.part에 기록하고, 페이지가 끝날 때마다
+#   파일을 flush/fsync한 뒤 (페이지, 기록한 행 수, 파일 크기)를 체크포인트 파일에 저장합니다.
+# - 카테고리가 끝나면 .part 파일을 최종 CSV로 원자적으로 교체(os.replace)하고 매니페스트를 남깁니다.
+#   중간에 실패하면 이전 실행의 CSV는 그대로 남습니다.
+# - 행은 BufferedCsvFile로 모아 기록합니다 (체크포인트 / 완료 시점에는 버퍼를 비우고 fsync).
+# - resume이면 마지막 체크포인트 크기로 .part 파일을 자르고 다음 페이지부터 이어서 기록합니다.
+
+import csv
+import json
+import os
+import re
+from datetime import datetime
+
+from crawl_output import BufferedCsvFile, CSV_BUFFER_ROWS, publish, write_manifest
+
+CSV_HEADER = ['Name', 'Spec', 'ImageURL']
+
+
+def checkpoint_path(state_dir, category):
+    safe_category = re.sub(r'[\\/*?:"<>|]', '_', category)
+    return os.path.join(state_dir, f'{safe_category}.checkpoint.json')
+
+
+def load_checkpoint(state_dir, category):
+    """
+    카테고리의 체크포인트를 읽는 함수 (없으면 None)
+    """
+    path = checkpoint_path(state_dir, category)
+    if not os.path.exists(path):
+        return None
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+class CheckpointedCsv:
+    """
+    페이지 단위로 체크포인트를 남기며 기록하는 카테고리 CSV 파일
+    - writerow는 csv.writer와 같은 방식으로 사용합니다 (ImageRowWriter에 그대로 넘길 수 있음).
+    - commit_page(page): 그 페이지까지 기록한 행을 디스크에 반영하고 체크포인트를 저장합니다.
+    - 페이지 번호가 건너뛰면(중간 페이지 실패) 그 뒤로는 체크포인트를 갱신하지 않습니다.
+    """
+    def __init__(self, csv_path, state_dir, category, resume=False, buffer_rows=CSV_BUFFER_ROWS):
+        self.csv_path = csv_path
+        self.part_path = csv_path + '.part'
+        self.checkpoint_path = checkpoint_path(state_dir, category)
+        self.page = 0  # 마지막으로 체크포인트를 남긴 페이지
+        self.rows = 0
+        self.gap = False
+        os.makedirs(state_dir, exist_ok=True)
+
+        checkpoint = load_checkpoint(state_dir, category) if resume else None
+        if checkpoint and not checkpoint.get('done') and os.path.exists(self.part_path):
+            # 마지막 체크포인트 이후에 기록된 행은 버리고 이어서 기록
+            with open(self.part_path, 'r+b') as f:
+                f.truncate(checkpoint['size'])
+            self.page = checkpoint['page']
+            self.rows = checkpoint['rows']
+            self.file = BufferedCsvFile(self.part_path, append=True, buffer_rows=buffer_rows)
+        else:
+            self.file = BufferedCsvFile(self.part_path, buffer_rows=buffer_rows)
+            self.file.writerow(CSV_HEADER)
+            self._save(done=False)
+
+    @property
+    def resumed(self):
+        return self.page > 0
+
+    @property
+    def start_page(self):
+        """
+        이번 실행에서 크롤링을 시작할 페이지
+        """
+        return self.page + 1
+
+    def writerow(self, row):
+        self.file.writerow(row)
+        self.rows += 1
+
+    def read_names(self):
+        """
+        이어서 기록하는 경우 이미 기록된 제품명 목록을 반환하는 메서드
+        """
+        self.file.flush()
+        with open(self.part_path, 'r', newline='', encoding='utf-8-sig') as f:
+            reader = csv.reader(f)
+            next(reader, None)
+            return [row[0] for row in reader if row]
+
+    def commit_page(self, page):
+        """
+        page까지 기록한 행을 디스크에 반영하고 체크포인트를 저장하는 메서드
+        """
+        if page != self.page + 1:
+            self.gap = True
+        if self.gap:
+            return
+        self.page = page
+        self._save(done=False)
+
+    def finalize(self):
+        """
+        .part 파일을 최종 CSV로 교체하고 매니페스트와 완료 체크포인트를 남기는 메서드
+        """
+        self.file.close(sync=True)
+        publish(self.part_path, self.csv_path)
+        write_manifest(self.csv_path, self.rows, self.file.size, self.file.sha256)
+        self._save(done=True, sync=False)
+
+    def close(self):
+        """
+        완료하지 못한 경우 .part 파일을 (다음 resume을 위해) 그대로 두고 닫는 메서드
+        """
+        self.file.close()
+
+    def _save(self, done, sync=True):
+        if sync:
+            self.file.sync()
+        size = 0 if done else self.file.size
+        temp_path = self.checkpoint_path + '.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump({'page': self.page, 'rows': self.rows, 'size': size, 'done': done,
+                       'updated': datetime.now().isoformat(timespec='seconds')}, f)
+        os.replace(temp_path, self.checkpoint_path)
@@ -0,0 +1,218 @@
+# 크롤링 결과 CSV 출력 / 원자적 게시 / 매니페스트
+# - 행을 메모리에 모아(csv.writer → 문자열 버퍼) buffer_rows개마다 한 번에 인코딩해 기록합니다.
+#   기록하는 바이트로 SHA-256을 계산하므로 완료 후 파일을 다시 읽지 않습니다.
+# - 임시 파일에 기록하고 fsync한 뒤 최종 경로로 원자적으로 교체(os.replace)합니다.
+#   다른 스크립트가 작성 중인 CSV를 읽는 일이 없습니다.
+# - 최종 CSV 옆에 매니페스트(<파일>.csv.manifest.json: 행 수, 크기, SHA-256, 크롤링 시각)를 남깁니다.
+# - LoadedInputs: 적재 스크립트(insert_opensearch.py, test/database.py)가 지난번에 적재한
+#   매니페스트와 비교해 바뀌지 않은 입력 파일을 건너뛸 때 사용합니다.
+
+import codecs
+import csv
+import hashlib
+import io
+import json
+import os
+from datetime import datetime
+
+# 행을 이 수만큼 모아 한 번에 기록
+CSV_BUFFER_ROWS = 1000
+
+# 매니페스트 파일 접미사
+MANIFEST_SUFFIX = '.manifest.json'
+
+# 이어서 기록할 때 기존 파일 해시를 계산하는 읽기 단위
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+def manifest_path(csv_path):
+    return csv_path + MANIFEST_SUFFIX
+
+
+def load_manifest(csv_path):
+    """
+    CSV 파일의 매니페스트를 읽는 함수 (없거나 읽을 수 없으면 None)
+    """
+    path = manifest_path(csv_path)
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def write_manifest(csv_path, rows, size, sha256, crawled_at=None):
+    """
+    CSV 파일 옆에 매니페스트를 저장하는 함수 (임시 파일 후 교체)
+    """
+    manifest = {'file': os.path.basename(csv_path), 'rows': rows, 'size': size, 'sha256': sha256,
+                'crawled_at': crawled_at or datetime.now().isoformat(timespec='seconds')}
+    path = manifest_path(csv_path)
+    temp_path = path + '.tmp'
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False)
+    os.replace(temp_path, path)
+    return manifest
+
+
+def manifest_matches(csv_path, manifest):
+    """
+    매니페스트가 현재 CSV 파일을 설명하는지 확인하는 함수 (파일 크기 비교, 파일을 읽지 않음)
+    """
+    if manifest is None or not os.path.exists(csv_path):
+        return False
+    return os.path.getsize(csv_path) == manifest.get('size')
+
+
+def publish(temp_path, final_path):
+    """
+    fsync까지 끝난 임시 파일을 최종 경로로 원자적으로 교체하는 함수
+    """
+    os.replace(temp_path, final_path)
+    # 이름 변경 자체도 디스크에 반영 (디렉토리를 열 수 없는 Windows에서는 생략)
+    if hasattr(os, 'O_DIRECTORY'):
+        fd = os.open(os.path.dirname(os.path.abspath(final_path)), os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+
+class BufferedCsvFile:
+    """
+    행을 모아 한 번에 기록하면서 SHA-256과 크기를 계산하는 CSV 파일 (utf-8-sig)
+    - append이면 기존 파일 뒤에 이어서 기록합니다 (기존 내용은 한 번 읽어 해시에 반영).
+    """
+    def __init__(self, path, append=False, buffer_rows=CSV_BUFFER_ROWS):
+        self.path = path
+        self.buffer_rows = buffer_rows
+        self.hasher = hashlib.sha256()
+        self.size = 0
+        self.pending = 0  # 버퍼에 있는 행 수
+        self.buffer = io.StringIO(newline='')
+        self.writer = csv.writer(self.buffer)
+
+        if append and os.path.exists(path):
+            with open(path, 'rb') as f:
+                for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b''):
+                    self.hasher.update(chunk)
+            self.file = open(path, 'ab')
+            self.size = os.fstat(self.file.fileno()).st_size
+        else:
+            self.file = open(path, 'wb')
+            self._write(codecs.BOM_UTF8)
+
+    @property
+    def closed(self):
+        return self.file.closed
+
+    @property
+    def sha256(self):
+        return self.hasher.hexdigest()
+
+    def writerow(self, row):
+        self.writer.writerow(row)
+        self.pending += 1
+        if self.pending >= self.buffer_rows:
+            self.flush()
+
+    def writerows(self, rows):
+        for row in rows:
+            self.writerow(row)
+
+    def flush(self):
+        """
+        버퍼의 행을 파일에 기록하는 메서드
+        """
+        if self.pending:
+            data = self.buffer.getvalue().encode('utf-8')
+            self.buffer.seek(0)
+            self.buffer.truncate()
+            self.pending = 0
+            self._write(data)
+        self.file.flush()
+
+    def sync(self):
+        """
+        버퍼의 행을 기록하고 디스크에 반영(fsync)하는 메서드
+        """
+        self.flush()
+        os.fsync(self.file.fileno())
+
+    def close(self, sync=False):
+        if self.file.closed:
+            return
+        if sync:
+            self.sync()
+        else:
+            self.flush()
+        self.file.close()
+
+    def _write(self, data):
+        self.hasher.update(data)
+        self.file.write(data)
+        self.size += len(data)
+
+
+class AtomicCsvFile(BufferedCsvFile):
+    """
+    임시 파일(<경로>.tmp)에 기록하고 commit()에서 최종 경로로 교체한 뒤 매니페스트를 남기는 CSV 파일
+    """
+    def __init__(self, path, buffer_rows=CSV_BUFFER_ROWS):
+        self.final_path = path
+        self.rows = 0
+        super().__init__(path + '.tmp', buffer_rows=buffer_rows)
+
+    def writerow(self, row):
+        super().writerow(row)
+        self.rows += 1
+
+    def commit(self, crawled_at=None):
+        """
+        fsync 후 최종 경로로 교체하고 매니페스트를 저장하는 메서드 (rows에는 헤더 제외)
+        """
+        self.close(sync=True)
+        publish(self.path, self.final_path)
+        return write_manifest(self.final_path, max(self.rows - 1, 0), self.size, self.sha256, crawled_at)
+
+    def discard(self):
+        self.close()
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+
+class LoadedInputs:
+    """
+    적재 스크립트가 이미 적재한 입력 파일의 매니페스트(SHA-256)를 기록하는 상태 파일
+    - unchanged(path): 매니페스트가 있고 지난번 적재 때와 같으면 True (매니페스트가 없으면 항상 적재)
+    - mark(path): 적재를 마친 파일의 매니페스트를 기록 (save()에서 저장)
+    """
+    def __init__(self, state_path):
+        self.state_path = state_path
+        self.loaded = {}
+        if os.path.exists(state_path):
+            with open(state_path, 'r', encoding='utf-8') as f:
+                self.loaded = json.load(f)
+
+    def unchanged(self, csv_path):
+        manifest = load_manifest(csv_path)
+        if not manifest_matches(csv_path, manifest):
+            return False
+        previous = self.loaded.get(os.path.basename(csv_path))
+        return previous is not None and previous.get('sha256') == manifest['sha256']
+
+    def mark(self, csv_path):
+        manifest = load_manifest(csv_path)
+        if manifest_matches(csv_path, manifest):
+            self.loaded[os.path.basename(csv_path)] = {
+                'sha256': manifest['sha256'], 'rows': manifest['rows'],
+                'loaded_at': datetime.now().isoformat(timespec='seconds')}
+
+    def save(self):
+        os.makedirs(os.path.dirname(os.path.abspath(self.state_path)), exist_ok=True)
+        temp_path = self.state_path + '.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.loaded, f, ensure_ascii=False, indent=2)
+        os.replace(temp_path, self.state_path)
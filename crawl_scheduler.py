@@ -0,0 +1,227 @@
+# asyncio 기반 크롤링 스케줄러
+# - 모든 카테고리를 (카테고리, 페이지) 작업 단위로 펼쳐 하나의 큐에서 처리합니다.
+# - 전역 동시 요청 수, 호스트별 동시 요청 수, 호스트별 토큰 버킷(초당 요청 수)으로 부하를 제한합니다.
+# - 페이지는 완료 순서와 관계없이 카테고리별 페이지 순서대로 on_page 콜백에 전달됩니다.
+# - 실제 HTTP 요청은 DanawaListFetcher(requests 세션)를 스레드 풀에서 실행합니다.
+
+import asyncio
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from time import monotonic
+from urllib.parse import urlparse
+
+from danawa_http import LIST_COUNT, parse_products
+
+# 전역 동시 요청 수
+GLOBAL_CONCURRENCY = 16
+
+# 호스트별 동시 요청 수
+PER_HOST_CONCURRENCY = 8
+
+# 호스트별 초당 요청 수 (0 이하이면 제한 없음)
+PER_HOST_RATE = 10.0
+
+
+class TokenBucket:
+    """
+    초당 rate개의 토큰이 채워지는 토큰 버킷 (최대 capacity개까지 버스트 허용)
+    """
+    def __init__(self, rate, capacity=None):
+        self.rate = rate
+        self.capacity = capacity or max(1.0, rate)
+        self.tokens = self.capacity
+        self.updated = monotonic()
+        self.lock = asyncio.Lock()
+
+    async def acquire(self):
+        if self.rate <= 0:
+            return
+        async with self.lock:
+            while True:
+                now = monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+class _CategoryState:
+    """
+    카테고리 하나의 진행 상태 (수집된 페이지, 다음에 전달할 페이지 번호 등)
+    """
+    def __init__(self, name, url, start_page=1):
+        self.name = name
+        self.url = url
+        self.start_page = start_page
+        self.listing = None
+        self.page_count = None  # 총 페이지 수 (모르면 None)
+        self.results = {}  # 페이지 번호 -> 제품 리스트
+        self.next_page = start_page  # 다음에 on_page로 전달할 페이지
+        self.stopped = False  # on_page가 중단을 요청했는지 여부
+        self.error = None
+        self.finished = False
+        self.lock = asyncio.Lock()
+
+
+class CrawlScheduler:
+    """
+    (카테고리, 페이지) 작업을 전역/호스트별 제한 아래에서 병렬 처리하는 스케줄러
+
+    on_page(name, page, products): 카테고리별 페이지 순서대로 호출 (워커 스레드에서 실행)
+                                   True를 반환하면 그 카테고리의 남은 페이지는 요청하지 않습니다.
+    on_finish(name, error): 카테고리 처리가 끝나면 한 번 호출 (error는 실패 시 메시지, 성공 시 None)
+    chain_pages: True이면 카테고리 안에서는 페이지를 하나씩 차례로 요청합니다 (증분 크롤링처럼 중간에 멈출 때 사용).
+    """
+    def __init__(self, fetcher, concurrency=GLOBAL_CONCURRENCY, per_host=PER_HOST_CONCURRENCY,
+                 rate=PER_HOST_RATE, burst=None, chain_pages=False):
+        self.fetcher = fetcher
+        self.chain_pages = chain_pages
+        self.concurrency = concurrency
+        self.per_host = per_host
+        self.rate = rate
+        self.burst = burst
+        self.stats = {'pages': 0, 'products': 0, 'errors': 0, 'elapsed': 0.0}
+
+    def run(self, categories, on_page, on_finish, start_pages=None):
+        """
+        categories: (이름, URL) 리스트. 모든 카테고리가 끝날 때까지 블록합니다.
+        start_pages: {이름: 시작 페이지} (이어서 크롤링할 때 사용, 없으면 1페이지부터)
+        """
+        return asyncio.run(self._run(categories, on_page, on_finish, start_pages or {}))
+
+    async def _run(self, categories, on_page, on_finish, start_pages):
+        self.on_page = on_page
+        self.on_finish = on_finish
+        self.queue = asyncio.Queue()
+        self.host_limits = {}
+        self.executor = ThreadPoolExecutor(max_workers=self.concurrency)
+        start_time = monotonic()
+
+        for name, url in categories:
+            self.queue.put_nowait(('open', _CategoryState(name, url, start_pages.get(name, 1)), None))
+
+        workers = [asyncio.create_task(self._worker()) for _ in range(self.concurrency)]
+        try:
+            await self.queue.join()
+        finally:
+            for worker in workers:
+                worker.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+            self.executor.shutdown(wait=True)
+
+        self.stats['elapsed'] = monotonic() - start_time
+        return self.stats
+
+    def _host_limit(self, url):
+        """
+        호스트별 (세마포어, 토큰 버킷)을 반환하는 메서드
+        """
+        host = urlparse(url).netloc
+        if host not in self.host_limits:
+            self.host_limits[host] = (asyncio.Semaphore(self.per_host), TokenBucket(self.rate, self.burst))
+        return self.host_limits[host]
+
+    async def _request(self, url, func, *args):
+        """
+        호스트 제한을 지키며 블로킹 요청 함수를 스레드 풀에서 실행하는 메서드
+        """
+        semaphore, bucket = self._host_limit(url)
+        async with semaphore:
+            await bucket.acquire()
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self.executor, func, *args)
+
+    async def _worker(self):
+        while True:
+            kind, state, page = await self.queue.get()
+            try:
+                if kind == 'open':
+                    await self._open(state)
+                else:
+                    await self._crawl_page(state, page)
+            except Exception:
+                state.error = traceback.format_exc()
+                self.stats['errors'] += 1
+                # 실패한 페이지는 빈 페이지로 처리해 이후 페이지 전달이 막히지 않도록 함
+                if kind == 'page' and not self.chain_pages:
+                    await self._store_page(state, page, [])
+                else:
+                    # 페이지를 차례로 요청하는 경우 이미 예약된 다음 페이지도 처리하지 않고 여기서 종료
+                    state.stopped = True
+                    await self._finish(state)
+            finally:
+                self.queue.task_done()
+
+    async def _open(self, state):
+        state.listing = await self._request(state.url, self.fetcher.open_category, state.url)
+        state.page_count = state.listing.page_count
+
+        if state.page_count is not None and state.start_page > state.page_count:
+            await self._finish(state)
+        elif state.page_count is None or self.chain_pages:
+            # 총 페이지 수를 모르거나 페이지를 차례로 요청하는 경우 시작 페이지부터 다음 페이지를 예약
+            self.queue.put_nowait(('page', state, state.start_page))
+        else:
+            for page in range(state.start_page, state.page_count + 1):
+                self.queue.put_nowait(('page', state, page))
+
+    async def _crawl_page(self, state, page):
+        if state.stopped or state.finished:
+            return
+        page_html = await self._request(state.listing.ajax_url, self.fetcher.fetch_page, state.listing, page)
+        products = parse_products(page_html)
+        self.stats['pages'] += 1
+        self.stats['products'] += len(products)
+
+        if state.listing.page_count is None:
+            if len(products) >= LIST_COUNT:
+                self.queue.put_nowait(('page', state, page + 1))
+            else:
+                state.page_count = page
+        elif self.chain_pages and page < state.listing.page_count:
+            self.queue.put_nowait(('page', state, page + 1))
+
+        await self._store_page(state, page, products)
+
+    async def _store_page(self, state, page, products):
+        """
+        페이지 결과를 저장하고, 순서가 이어지는 페이지들을 on_page로 전달하는 메서드
+        - on_page에서 오류가 나면 그 페이지를 건너뛰고 (페이지를 차례로 요청하면 카테고리를 여기서 종료)
+          on_finish가 끝난 카테고리에는 더 이상 전달하지 않습니다.
+        """
+        if state.finished:
+            return
+        state.results[page] = products
+        if state.page_count is None and not products:
+            state.page_count = page
+
+        async with state.lock:
+            loop = asyncio.get_running_loop()
+            while state.next_page in state.results and not state.stopped:
+                ready_page = state.next_page
+                ready_products = state.results.pop(ready_page)
+                if ready_products:
+                    try:
+                        stop = await loop.run_in_executor(self.executor, self.on_page, state.name, ready_page,
+                                                          ready_products)
+                    except Exception:
+                        state.error = traceback.format_exc()
+                        self.stats['errors'] += 1
+                        stop = self.chain_pages
+                    if stop:
+                        # 남은 페이지는 요청하지 않고 이 페이지에서 카테고리 종료
+                        state.stopped = True
+                        state.page_count = ready_page
+                state.next_page += 1
+
+        if state.page_count is not None and state.next_page > state.page_count:
+            await self._finish(state)
+
+    async def _finish(self, state):
+        if state.finished:
+            return
+        state.finished = True
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(self.executor, self.on_finish, state.name, state.error)
@@ -0,0 +1,83 @@
+# 증분 크롤링 상태 관리
+# - 카테고리별로 지난 실행에서 본 제품 ID를 상태 파일(<카테고리>.json)에 저장합니다.
+# - 목록을 신상품순으로 정렬해 앞 페이지부터 보다가, 이미 아는 제품만 있는 페이지가
+#   연속 stop_pages개 나오면 페이지 이동을 멈춥니다.
+# - 이번 실행에서 수집한 행 뒤에 지난 CSV의 나머지 행(이번에 수집되지 않은 제품)을 이어 붙여
+#   전체 목록 CSV를 유지합니다.
+
+import csv
+import json
+import os
+import re
+from datetime import datetime
+
+# 이미 아는 제품만 있는 페이지가 이 수만큼 연속되면 중단
+INCREMENTAL_STOP_PAGES = 2
+
+# 증분 크롤링에서 사용할 목록 정렬 (신상품순)
+INCREMENTAL_SORT_METHOD = 'NEW'
+
+
+class IncrementalState:
+    """
+    카테고리 하나의 증분 크롤링 상태 (지난 실행의 제품 ID, 지난 CSV 행, 이번 실행에서 본 제품)
+    - 상태 파일이 없으면 전체 크롤링을 하면서 제품 ID만 기록합니다.
+    """
+    def __init__(self, state_dir, category, csv_path, stop_pages=INCREMENTAL_STOP_PAGES):
+        safe_category = re.sub(r'[\\/*?:"<>|]', '_', category)
+        self.state_path = os.path.join(state_dir, f'{safe_category}.json')
+        self.stop_pages = stop_pages
+        self.known_ids = set()
+        self.seen_ids = set()
+        self.seen_names = set()
+        self.known_pages = 0  # 연속으로 나온 "이미 아는 페이지" 수
+        self.stopped = False
+        self.previous_rows = []
+        os.makedirs(state_dir, exist_ok=True)
+
+        if os.path.exists(self.state_path):
+            with open(self.state_path, 'r', encoding='utf-8') as f:
+                self.known_ids = set(json.load(f).get('ids', []))
+
+        # 지난 CSV는 이번 실행이 끝나면 교체되므로 미리 읽어 둠
+        if self.known_ids and os.path.exists(csv_path):
+            with open(csv_path, 'r', newline='', encoding='utf-8-sig') as f:
+                reader = csv.reader(f)
+                next(reader, None)
+                self.previous_rows = [row for row in reader if row]
+
+    def observe_page(self, items):
+        """
+        한 페이지의 (제품명, 제품 ID) 목록을 기록하고, 페이지 이동을 멈춰야 하면 True를 반환하는 메서드
+        """
+        product_ids = [product_id for _, product_id in items if product_id]
+        page_known = bool(product_ids) and all(product_id in self.known_ids for product_id in product_ids)
+        self.known_pages = self.known_pages + 1 if page_known else 0
+        self.seen_ids.update(product_ids)
+        self.seen_names.update(name for name, _ in items)
+
+        if self.known_ids and self.known_pages >= self.stop_pages:
+            self.stopped = True
+        return self.stopped
+
+    def merge_previous(self, csvWriter):
+        """
+        지난 CSV 행 중 이번 실행에서 수집되지 않은 제품을 이어서 기록하고 그 수를 반환하는 메서드
+        """
+        merged = 0
+        for row in self.previous_rows:
+            if row[0] not in self.seen_names:
+                csvWriter.writerow(row)
+                self.seen_names.add(row[0])
+                merged += 1
+        return merged
+
+    def save(self):
+        """
+        지난 실행과 이번 실행에서 본 제품 ID를 상태 파일에 저장하는 메서드 (임시 파일 후 교체)
+        """
+        temp_path = self.state_path + '.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump({'ids': sorted(self.known_ids | self.seen_ids),
+                       'updated': datetime.now().isoformat(timespec='seconds')}, f)
+        os.replace(temp_path, self.state_path)
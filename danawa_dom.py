@@ -0,0 +1,87 @@
+# Selenium 목록 페이지의 제품 정보 추출
+# - 기본 경로: execute_script 한 번으로 페이지의 모든 prod_main_info 블록을 읽어 JSON 배열로 받습니다.
+#   (제품마다 find_element / get_attribute로 여러 번 WebDriver 요청을 보내던 방식 대체)
+# - 스크립트 실행이 실패하면 기존 방식(요소별 WebDriver 요청)으로 대신 추출합니다.
+# - 결과 형식은 HTTP 엔진의 parse_products와 같은 (제품명, 스펙, 이미지 URL, 제품 ID) 리스트입니다.
+
+from selenium.webdriver.common.by import By
+from selenium.common.exceptions import WebDriverException
+
+from danawa_http import PRODUCT_ID_PATTERN
+
+# 페이지의 제품 정보를 한 번에 읽는 스크립트
+# - 기존 요소별 경로와 같은 규칙: 제품명 링크나 썸네일 이미지가 없는 제품은 건너뜀
+# - innerText / img.src / a.href는 WebDriver의 .text / get_attribute('src') / get_attribute('href')와 같은 값
+EXTRACT_PRODUCTS_SCRIPT = """
+var items = document.getElementsByClassName('prod_main_info');
+var products = [];
+for (var i = 0; i < items.length; i++) {
+    var name = items[i].querySelector('p[class="prod_name"] > a');
+    var image = items[i].querySelector('.thumb_image img');
+    if (!name || !image) {
+        continue;
+    }
+    var spec = items[i].querySelector('.spec_list');
+    products.push([
+        name.innerText.trim(),
+        spec ? spec.innerText.trim() : '',
+        image.getAttribute('data-original') || image.src || '',
+        name.href || ''
+    ]);
+}
+return products;
+"""
+
+
+def product_id_from_url(url):
+    match = PRODUCT_ID_PATTERN.search(url or '')
+    return match.group(1) if match else ''
+
+
+def extract_products_script(browser):
+    """
+    execute_script 한 번으로 (제품명, 스펙, 이미지 URL, 제품 ID) 리스트를 추출하는 함수
+    """
+    rows = browser.execute_script(EXTRACT_PRODUCTS_SCRIPT)
+    if not isinstance(rows, list):
+        raise WebDriverException(f"unexpected script result: {type(rows).__name__}")
+    return [(name, spec, image_url, product_id_from_url(href)) for name, spec, image_url, href in rows]
+
+
+def extract_products_elements(browser):
+    """
+    제품마다 WebDriver 요청을 보내 (제품명, 스펙, 이미지 URL, 제품 ID) 리스트를 추출하는 함수 (대체 경로)
+    """
+    products = []
+    for product in browser.find_elements(By.CLASS_NAME, 'prod_main_info'):
+        productName = None
+        try:
+            # 제품명 추출
+            name_element = product.find_element(By.XPATH, './/p[@class="prod_name"]/a')
+            productName = name_element.text.strip()
+
+            # 스펙 정보 추출 (없으면 빈 문자열)
+            spec_elements = product.find_elements(By.CLASS_NAME, 'spec_list')
+            spec_list_text = spec_elements[0].text.strip() if spec_elements else ''
+
+            # 이미지 URL 추출
+            image_element = product.find_element(By.CSS_SELECTOR, '.thumb_image img')
+            image_url = image_element.get_attribute('data-original') or image_element.get_attribute('src')
+
+            products.append((productName, spec_list_text, image_url,
+                             product_id_from_url(name_element.get_attribute('href'))))
+        except Exception as e:
+            print(f"제품 처리 중 오류 발생 ({productName or 'unknown'}): {str(e)}")
+            continue
+    return products
+
+
+def extract_products(browser):
+    """
+    현재 목록 페이지의 제품 정보를 추출하는 함수 (스크립트 실패 시 요소별 추출로 대체)
+    """
+    try:
+        return extract_products_script(browser)
+    except (WebDriverException, ValueError, TypeError) as e:
+        print(f"스크립트 추출 실패, 요소별 추출로 대체: {str(e).strip()}")
+        return extract_products_elements(browser)
@@ -0,0 +1,211 @@
+# 다나와 상품 목록 HTTP 수집 모듈
+# - Selenium(Chrome) 없이 목록 페이지가 내부적으로 호출하는 AJAX 엔드포인트를 직접 요청합니다.
+# - requests 세션의 커넥션 풀을 재사용하고, lxml로 prod_main_info 블록을 파싱합니다.
+# - 엔드포인트는 카테고리 URL 기준 상대 경로로 계산하므로 로컬 테스트 서버에도 그대로 사용할 수 있습니다.
+
+import re
+from math import ceil
+from urllib.parse import urljoin, urlparse, parse_qs
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from lxml import html as lxml_html
+
+# 목록 AJAX 엔드포인트 경로 (카테고리 페이지가 페이지 이동 시 호출하는 주소)
+LIST_AJAX_PATH = '/list/ajax/getProductList.ajax.php'
+
+# 한 페이지에 요청할 제품 수 (Selenium 크롤러의 "90개씩 보기"와 동일)
+LIST_COUNT = 90
+
+# 커넥션 풀 크기 및 요청 타임아웃(초)
+POOL_SIZE = 16
+REQUEST_TIMEOUT = 10
+
+# 제품 ID (목록 li의 id="productItem1234" 또는 상품 링크의 pcode=1234)
+PRODUCT_ID_PATTERN = re.compile(r'(?:productItem|pcode=)(\d+)')
+
+USER_AGENT = ('Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 '
+              '(KHTML, like Gecko) Chrome/126.0.0.0 Safari/537.36')
+
+
+def normalize_text(text):
+    """
+    연속된 공백/줄바꿈을 하나의 공백으로 정리하는 함수 (브라우저의 .text 결과와 맞추기 위함)
+    """
+    return ' '.join(text.split()) if text else ''
+
+
+def create_session(pool_size=POOL_SIZE, max_retries=3):
+    """
+    keep-alive 커넥션 풀을 사용하는 requests 세션을 생성하는 함수
+    """
+    session = requests.Session()
+    retry = Retry(total=max_retries, backoff_factor=0.5,
+                  status_forcelist=(429, 500, 502, 503, 504),
+                  allowed_methods=frozenset(['GET', 'POST']))
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    session.headers.update({
+        'User-Agent': USER_AGENT,
+        'Accept-Language': 'ko-KR,ko;q=0.9',
+    })
+    session.verify = False
+    return session
+
+
+def parse_total_count(document):
+    """
+    목록 페이지의 총 제품 수(list_num)를 추출하는 함수. 찾지 못하면 None을 반환합니다.
+    """
+    nodes = document.xpath('//*[contains(concat(" ", normalize-space(@class), " "), " list_num ")]')
+    for node in nodes:
+        count = normalize_text(node.text_content()).replace(',', '').lstrip('(').rstrip(')')
+        if count.isdigit():
+            return int(count)
+    return None
+
+
+def parse_product_id(product):
+    """
+    prod_main_info 블록의 제품 ID를 추출하는 함수 (목록 항목 id 우선, 없으면 상품 링크의 pcode, 못 찾으면 '')
+    """
+    for item in product.iterancestors('li'):
+        match = PRODUCT_ID_PATTERN.search(item.get('id') or '')
+        if match:
+            return match.group(1)
+        break
+    for link in product.xpath('.//a[@href]'):
+        match = PRODUCT_ID_PATTERN.search(link.get('href'))
+        if match:
+            return match.group(1)
+    return ''
+
+
+def parse_products(page_html):
+    """
+    목록 HTML에서 prod_main_info 블록을 파싱해 (제품명, 스펙, 이미지 URL, 제품 ID) 리스트를 반환하는 함수
+    """
+    if not page_html or not page_html.strip():
+        return []
+
+    document = lxml_html.fromstring(page_html)
+    products = []
+    for product in document.find_class('prod_main_info'):
+        # 제품명 추출
+        name_nodes = product.xpath('.//p[contains(concat(" ", normalize-space(@class), " "), " prod_name ")]/a')
+        if not name_nodes:
+            continue
+        productName = normalize_text(name_nodes[0].text_content())
+
+        # 스펙 정보 추출 (없으면 빈 문자열)
+        spec_nodes = product.find_class('spec_list')
+        spec_list_text = normalize_text(spec_nodes[0].text_content()) if spec_nodes else ''
+
+        # 이미지 URL 추출 (지연 로딩 속성 우선)
+        image_url = ''
+        image_nodes = product.xpath('.//*[contains(concat(" ", normalize-space(@class), " "), " thumb_image ")]//img')
+        if image_nodes:
+            image_url = image_nodes[0].get('data-original') or image_nodes[0].get('src') or ''
+
+        products.append((productName, spec_list_text, image_url, parse_product_id(product)))
+
+    return products
+
+
+class CategoryListing:
+    """
+    카테고리 하나의 AJAX 요청 정보(엔드포인트, 폼 파라미터, 총 제품 수)를 담는 클래스
+    """
+    def __init__(self, url, ajax_url, form, total_count):
+        self.url = url
+        self.ajax_url = ajax_url
+        self.form = form
+        self.total_count = total_count
+
+    @property
+    def page_count(self):
+        """
+        총 페이지 수 (총 제품 수를 모르면 None)
+        """
+        if self.total_count is None:
+            return None
+        return ceil(self.total_count / LIST_COUNT)
+
+
+class DanawaListFetcher:
+    """
+    다나와 목록을 HTTP로 수집하는 클래스
+    - 하나의 세션(커넥션 풀)으로 카테고리 페이지와 AJAX 목록 페이지를 요청합니다.
+    - sort_method를 지정하면 페이지의 기본 정렬 대신 사용합니다 (예: 'NEW' 신상품순).
+    """
+    def __init__(self, session=None, timeout=REQUEST_TIMEOUT, sort_method=None):
+        self.session = session or create_session()
+        self.timeout = timeout
+        self.sort_method = sort_method
+
+    def open_category(self, category_url):
+        """
+        카테고리 페이지를 한 번 요청해 AJAX 폼 파라미터와 총 제품 수를 준비하는 메서드
+        """
+        response = self.session.get(category_url, timeout=self.timeout)
+        response.raise_for_status()
+        document = lxml_html.fromstring(response.content)
+
+        # 페이지에 포함된 hidden input 값을 기본 폼 파라미터로 사용
+        form = {}
+        for element in document.xpath('//input[@type="hidden"]'):
+            key = element.get('name') or element.get('id')
+            if key and key not in form:
+                form[key] = element.get('value') or ''
+
+        # 카테고리 코드는 URL의 cate 파라미터를 우선 사용
+        category_code = parse_qs(urlparse(category_url).query).get('cate', [''])[0]
+        if category_code:
+            form['categoryCode'] = category_code
+            form['listCategoryCode'] = category_code
+        form.setdefault('viewMethod', 'LIST')
+        form.setdefault('sortMethod', 'BEST')
+        if self.sort_method:
+            form['sortMethod'] = self.sort_method
+        form['listCount'] = str(LIST_COUNT)
+
+        return CategoryListing(
+            url=category_url,
+            ajax_url=urljoin(category_url, LIST_AJAX_PATH),
+            form=form,
+            total_count=parse_total_count(document),
+        )
+
+    def fetch_page(self, listing, page):
+        """
+        AJAX 엔드포인트에서 지정한 페이지의 목록 HTML을 가져오는 메서드
+        """
+        form = dict(listing.form)
+        form['page'] = str(page)
+        response = self.session.post(
+            listing.ajax_url,
+            data=form,
+            headers={'Referer': listing.url, 'X-Requested-With': 'XMLHttpRequest'},
+            timeout=self.timeout,
+        )
+        response.raise_for_status()
+        response.encoding = response.encoding or 'utf-8'
+        return response.text
+
+    def iter_pages(self, listing, start_page=1):
+        """
+        페이지 번호와 제품 리스트를 순서대로 반환하는 제너레이터
+        - 총 페이지 수를 알면 그만큼, 모르면 빈 페이지가 나올 때까지 요청합니다.
+        """
+        page = start_page
+        while listing.page_count is None or page <= listing.page_count:
+            products = parse_products(self.fetch_page(listing, page))
+            if not products:
+                break
+            yield page, products
+            page += 1
+
+    def close(self):
+        self.session.close()
@@ -0,0 +1,92 @@
+# 정제 단계(Crawler.DataSort) 보조
+# - ImageRenameBatch: 이미지 파일 이름 변경 (제품명.jpg → 정제된 제품명.jpg)
+#   행마다 os.path.exists / os.rename을 호출하던 방식 대신, 디렉토리마다 os.scandir로 한 번만 목록을 읽고
+#   메모리에서 존재 여부를 판단해 작업(이름 변경 / 중복 삭제)을 계획한 뒤 디렉토리별로 모아서 실행합니다.
+#   계획 순서는 기존 방식과 같아서 결과 경로도 같습니다.
+#   (정제된 이름의 파일이 이미 있으면 원래 파일을 삭제하고 기존 파일을 사용)
+#   이미지 URL 캐시(ImageUrlCache)를 넘기면 바뀐 경로를 캐시에도 기록합니다.
+# - format_sort_stats: 카테고리별 정제 소요 시간 요약
+
+import os
+from collections import defaultdict
+
+RENAME = 'rename'
+REMOVE = 'remove'
+
+
+class ImageRenameBatch:
+    """
+    디렉토리별로 이미지 이름 변경을 모아서 실행하는 클래스
+    - plan(image_path, safe_name): 변경 후 경로를 반환 (파일이 없으면 None)
+    - apply(cache): 계획한 작업을 실행하고 실패한 원래 경로 → 오류 메시지를 반환 (cache가 있으면 캐시 경로도 변경)
+    """
+    def __init__(self):
+        self.listings = dict()  # 디렉토리 → 파일명 집합 (normcase)
+        self.operations = defaultdict(list)  # 디렉토리 → [(작업, 원래 경로, 새 경로)]
+        self.renamed = 0
+        self.removed = 0
+
+    def _listing(self, directory):
+        listing = self.listings.get(directory)
+        if listing is None:
+            try:
+                with os.scandir(directory or '.') as entries:
+                    listing = {os.path.normcase(entry.name) for entry in entries}
+            except OSError:
+                listing = set()
+            self.listings[directory] = listing
+        return listing
+
+    def exists(self, path):
+        directory, name = os.path.split(path)
+        return os.path.normcase(name) in self._listing(directory)
+
+    def plan(self, image_path, safe_name):
+        if not image_path or not self.exists(image_path):
+            return None
+        directory = os.path.dirname(image_path)
+        new_image_path = os.path.join(directory, f"{safe_name}.jpg")
+        listing = self._listing(directory)
+        if self.exists(new_image_path) and image_path != new_image_path:
+            self.operations[directory].append((REMOVE, image_path, new_image_path))
+            listing.discard(os.path.normcase(os.path.basename(image_path)))
+        elif image_path != new_image_path:
+            self.operations[directory].append((RENAME, image_path, new_image_path))
+            listing.discard(os.path.normcase(os.path.basename(image_path)))
+            listing.add(os.path.normcase(os.path.basename(new_image_path)))
+        return new_image_path
+
+    def apply(self, cache=None):
+        failures = dict()
+        moves = []
+        for directory, operations in self.operations.items():
+            for operation, image_path, new_image_path in operations:
+                try:
+                    if operation == REMOVE:
+                        os.remove(image_path)
+                        self.removed += 1
+                    else:
+                        os.rename(image_path, new_image_path)
+                        self.renamed += 1
+                    moves.append((image_path, new_image_path))
+                except OSError as e:
+                    print(f"이미지 이름 변경 실패 ({image_path} -> {new_image_path}): {str(e)}")
+                    failures[image_path] = str(e)
+        self.operations.clear()
+        if cache is not None:
+            cache.relocate(moves)
+        return failures
+
+
+def format_sort_stats(results, elapsed):
+    """
+    카테고리별 정제 결과를 모아 소요 시간이 긴 순서로 요약 문자열을 만드는 함수
+    """
+    lines = [f"데이터 정렬 완료: 카테고리 {len(results)}개, "
+             f"{sum(result['input_rows'] for result in results)}행 → {sum(len(result['rows']) for result in results)}행, "
+             f"{elapsed:.2f}초 (카테고리 합계 {sum(result['elapsed'] for result in results):.2f}초)"]
+    for result in sorted(results, key=lambda result: result['elapsed'], reverse=True):
+        lines.append(f"  {result['name']}: {result['elapsed']:.2f}초, {result['input_rows']}행 → {len(result['rows'])}행 "
+                     f"(카테고리 간 중복 {result.get('cross_removed', 0)}행), "
+                     f"이미지 변경 {result['renamed']}개 / 삭제 {result['removed']}개 / 실패 {result['rename_failed']}개")
+    return '\n'.join(lines)
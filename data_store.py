@@ -0,0 +1,195 @@
+# 제품 데이터 저장 형식 (CSV / Parquet)
+# - Parquet(pyarrow): 열 단위로 저장하므로 필요한 열만 읽고(열 선택), 타입이 유지되며 CSV보다 작습니다.
+#   임베딩은 JSON 문자열 대신 float32 고정 길이 리스트 열(fixed_size_list<float32>)로 저장합니다.
+# - 크롤링 중에는 체크포인트 / 증분 크롤링을 위해 CSV에 기록하고, Parquet 형식이면 카테고리가 끝난 뒤
+#   같은 이름의 .parquet 파일을 만듭니다 (정제 데이터는 바로 Parquet으로 저장).
+# - 적재 스크립트는 data_files()로 입력 파일을 찾고(같은 이름이면 Parquet 우선) read_products()로 읽습니다.
+# - Parquet 파일도 임시 파일에 기록한 뒤 원자적으로 교체하고 매니페스트를 남깁니다.
+
+import hashlib
+import json
+import os
+from glob import glob, escape
+
+import numpy as np
+import pandas as pd
+
+from crawl_output import HASH_CHUNK_SIZE, publish, write_manifest
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # CSV만 사용하는 경우 pyarrow 없이 동작
+    pa = None
+    pq = None
+
+# 저장 형식
+FORMAT_CSV = 'csv'
+FORMAT_PARQUET = 'parquet'
+DATA_FORMATS = (FORMAT_CSV, FORMAT_PARQUET)
+
+# 제품 데이터의 텍스트 열 / 임베딩 열
+TEXT_COLUMNS = ['Name', 'Spec', 'ImageURL']
+EMBEDDING_COLUMN = 'embedding'
+
+# Parquet 압축 방식
+PARQUET_COMPRESSION = 'zstd'
+
+
+def require_pyarrow():
+    if pa is None:
+        raise ImportError("Parquet 형식을 사용하려면 pyarrow가 필요합니다 (pip install pyarrow)")
+
+
+def data_path(folder, name, data_format):
+    return os.path.join(folder, f'{name}.{data_format}')
+
+
+def data_files(folder, prefix=''):
+    """
+    폴더의 제품 데이터 파일 목록을 반환하는 함수 (같은 이름의 CSV와 Parquet이 있으면 Parquet만 반환)
+    """
+    files = {}
+    for data_format in DATA_FORMATS:
+        for path in sorted(glob(os.path.join(escape(str(folder)), f'{escape(prefix)}*.{data_format}'))):
+            files[os.path.splitext(path)[0]] = path  # DATA_FORMATS 순서상 Parquet이 나중에 덮어씀
+    return sorted(files.values())
+
+
+def file_sha256(path):
+    hasher = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b''):
+            hasher.update(chunk)
+    return hasher.hexdigest()
+
+
+def embedding_array(embeddings, dim=None):
+    """
+    임베딩 목록(리스트 / ndarray, 없는 값은 None)을 fixed_size_list<float32> 배열로 변환하는 함수
+    """
+    if isinstance(embeddings, np.ndarray) and embeddings.ndim == 2:
+        matrix = np.ascontiguousarray(embeddings, dtype=np.float32)
+        return pa.FixedSizeListArray.from_arrays(pa.array(matrix.reshape(-1)), matrix.shape[1])
+    embeddings = [embedding_list(value) for value in embeddings]
+    if dim is None:
+        dim = next((len(value) for value in embeddings if value is not None), 0)
+    mask = np.array([value is None or len(value) != dim for value in embeddings], dtype=bool)
+    matrix = np.zeros((len(embeddings), dim), dtype=np.float32)
+    for i, value in enumerate(embeddings):
+        if not mask[i]:
+            matrix[i] = value
+    values = pa.array(matrix.reshape(-1))
+    if mask.any():
+        return pa.FixedSizeListArray.from_arrays(values, dim, mask=pa.array(mask))
+    return pa.FixedSizeListArray.from_arrays(values, dim)
+
+
+def embedding_list(value):
+    """
+    CSV(JSON 문자열) / Parquet(ndarray) 임베딩 값을 float 리스트로 변환하는 함수 (없으면 None)
+    """
+    if value is None:
+        return None
+    if isinstance(value, str):
+        return json.loads(value)
+    if isinstance(value, float) and np.isnan(value):
+        return None
+    return np.asarray(value, dtype=np.float32).tolist()
+
+
+def products_table(df, embeddings=None):
+    """
+    DataFrame(텍스트 열)과 임베딩으로 Arrow 테이블을 만드는 함수
+    """
+    require_pyarrow()
+    columns = [column for column in df.columns if column != EMBEDDING_COLUMN]
+    arrays = [pa.array(df[column].astype(object).where(df[column].notna(), None), type=pa.string())
+              if column in TEXT_COLUMNS else pa.array(df[column])
+              for column in columns]
+    if embeddings is None and EMBEDDING_COLUMN in df.columns:
+        embeddings = df[EMBEDDING_COLUMN].tolist()
+    if embeddings is not None:
+        arrays.append(embedding_array(embeddings))
+        columns.append(EMBEDDING_COLUMN)
+    return pa.Table.from_arrays(arrays, names=columns)
+
+
+def write_products(path, df, embeddings=None, crawled_at=None):
+    """
+    제품 데이터를 Parquet 파일로 저장하는 함수 (임시 파일 → fsync → 원자적 교체 → 매니페스트)
+    """
+    return write_table(path, products_table(df, embeddings), crawled_at)
+
+
+def write_product_rows(path, header, rows, crawled_at=None):
+    """
+    CSV와 같은 (헤더, 행 목록)을 Parquet 파일로 저장하는 함수 (모든 열은 문자열)
+    """
+    require_pyarrow()
+    columns = list(zip(*rows)) if rows else [()] * len(header)
+    table = pa.Table.from_arrays([pa.array(column, type=pa.string()) for column in columns], names=list(header))
+    return write_table(path, table, crawled_at)
+
+
+def write_table(path, table, crawled_at=None):
+    temp_path = path + '.tmp'
+    pq.write_table(table, temp_path, compression=PARQUET_COMPRESSION)
+    with open(temp_path, 'rb') as f:
+        os.fsync(f.fileno())
+    publish(temp_path, path)
+    return write_manifest(path, table.num_rows, os.path.getsize(path), file_sha256(path), crawled_at)
+
+
+def read_products(path, columns=None):
+    """
+    CSV / Parquet 제품 데이터를 DataFrame으로 읽는 함수
+    - columns: 읽을 열 목록 (파일에 없는 열은 무시, None이면 전체)
+    - Parquet 임베딩 열은 행마다 float32 ndarray(없으면 None)입니다.
+    """
+    if path.endswith('.' + FORMAT_PARQUET):
+        require_pyarrow()
+        if columns is not None:
+            names = pq.read_schema(path).names
+            columns = [column for column in columns if column in names]
+        return pq.read_table(path, columns=columns).to_pandas()
+    if columns is None:
+        return pd.read_csv(path, encoding='utf-8-sig')
+    return pd.read_csv(path, encoding='utf-8-sig', usecols=lambda column: column in columns)
+
+
+def read_embeddings(path):
+    """
+    임베딩 열을 (N, dim) float32 행렬과 값 유무 마스크로 읽는 함수 (CSV는 JSON 문자열을 변환)
+    """
+    if path.endswith('.' + FORMAT_PARQUET):
+        require_pyarrow()
+        column = pq.read_table(path, columns=[EMBEDDING_COLUMN]).column(EMBEDDING_COLUMN).combine_chunks()
+        dim = column.type.list_size
+        valid = ~np.asarray(column.is_null().to_numpy(zero_copy_only=False))
+        # 값이 없는 행도 dim개 자리를 차지하므로 values를 그대로 (N, dim)으로 변환
+        values = column.values.slice(column.offset * dim, len(column) * dim)
+        matrix = values.to_numpy(zero_copy_only=False).reshape(-1, dim)
+        if not valid.all():
+            matrix = matrix.copy()
+            matrix[~valid] = 0.0  # 값이 없는 행은 CSV와 같이 0으로 채움
+        return matrix, valid
+    values = [embedding_list(value) for value in read_products(path, [EMBEDDING_COLUMN])[EMBEDDING_COLUMN]]
+    dim = next((len(value) for value in values if value is not None), 0)
+    matrix = np.zeros((len(values), dim), dtype=np.float32)
+    valid = np.zeros(len(values), dtype=bool)
+    for i, value in enumerate(values):
+        if value is not None and len(value) == dim:
+            matrix[i] = value
+            valid[i] = True
+    return matrix, valid
+
+
+def convert_csv(csv_path, crawled_at=None):
+    """
+    CSV 제품 데이터를 같은 이름의 Parquet 파일로 변환하는 함수 (변환한 파일 경로 반환)
+    """
+    df = read_products(csv_path)
+    parquet_path = os.path.splitext(csv_path)[0] + '.' + FORMAT_PARQUET
+    write_products(parquet_path, df, crawled_at=crawled_at)
+    return parquet_path
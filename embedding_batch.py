@@ -0,0 +1,235 @@
+# 배치 / 동시 임베딩 요청 (OpenAI 호환 embeddings API)
+# - 텍스트를 요청당 최대 개수(batch_size)와 추정 토큰 수(batch_tokens) 안에서 묶어 한 번에 요청합니다.
+# - 여러 배치를 asyncio 세마포어(concurrency)로 제한해 동시에 보내고, 결과는 입력 순서대로 돌려줍니다.
+#   (응답의 data[].index로 배치 안의 순서를 맞춤)
+# - 속도 제한(429) / 일시적 오류(5xx, 연결 오류, 타임아웃)는 지수 백오프(+ 지터, Retry-After 헤더 우선)로 재시도합니다.
+# - 400 오류(너무 긴 텍스트 등)는 배치를 반으로 나눠 다시 요청해 문제가 되는 텍스트만 None으로 남깁니다.
+# - 그 밖의 오류(인증 오류, 재시도 횟수 초과 등)로 실패한 행 번호는 last_failed_rows에 남겨
+#   호출한 쪽(EmbeddingJob)이 다음 실행에서 다시 임베딩할 수 있게 합니다.
+# - 빈 텍스트 / None은 요청하지 않고 None을 돌려줍니다 (기존 get_embedding의 오류 시 None과 같은 규칙).
+# - cache(EmbeddingCache)를 넘기면 요청 전에 캐시를 확인하고, 같은 호출 안의 같은 텍스트는 한 번만 요청합니다.
+#   받은 임베딩은 배치마다 캐시에 저장하므로 중간에 중단돼도 다음 실행에서 다시 요청하지 않습니다.
+# - test/embedding_stub_server.py: 같은 API를 흉내 내는 로컬 서버로 확인 / 성능 측정
+
+import asyncio
+import random
+from time import monotonic
+
+import openai
+from openai import AsyncOpenAI
+
+from embedding_cache import cache_key, format_embedding_cache_stats
+
+# 기본 임베딩 모델 / API 주소
+EMBEDDING_MODEL = 'solar-embedding-1-large-passage'
+EMBEDDING_BASE_URL = 'https://api.upstage.ai/v1/solar'
+
+# 요청당 최대 텍스트 수 / 추정 토큰 수
+EMBEDDING_BATCH_SIZE = 100
+EMBEDDING_BATCH_TOKENS = 200000
+
+# 동시에 보내는 배치 수
+EMBEDDING_CONCURRENCY = 4
+
+# 재시도 횟수 / 백오프 시작 대기 시간(초) / 최대 대기 시간(초)
+EMBEDDING_MAX_RETRIES = 6
+EMBEDDING_BACKOFF = 1.0
+EMBEDDING_BACKOFF_MAX = 60.0
+
+# 요청 타임아웃(초)
+EMBEDDING_TIMEOUT = 60.0
+
+# 재시도할 오류
+RETRYABLE_ERRORS = (openai.RateLimitError, openai.APIConnectionError, openai.APITimeoutError,
+                    openai.InternalServerError)
+
+
+def estimate_tokens(text):
+    """
+    텍스트의 토큰 수 추정 (토크나이저 없이 글자 수로 보수적으로 계산, 한글은 대체로 글자당 1토큰 이하)
+    """
+    return len(text)
+
+
+def make_batches(texts, batch_size=EMBEDDING_BATCH_SIZE, batch_tokens=EMBEDDING_BATCH_TOKENS):
+    """
+    요청할 (행 번호, 텍스트) 목록을 개수 / 토큰 한도 안에서 순서대로 묶는 함수
+    """
+    batches = []
+    batch = []
+    tokens = 0
+    for item in texts:
+        item_tokens = estimate_tokens(item[1])
+        if batch and (len(batch) >= batch_size or tokens + item_tokens > batch_tokens):
+            batches.append(batch)
+            batch = []
+            tokens = 0
+        batch.append(item)
+        tokens += item_tokens
+    if batch:
+        batches.append(batch)
+    return batches
+
+
+def retry_delay(error, attempt, backoff=EMBEDDING_BACKOFF, backoff_max=EMBEDDING_BACKOFF_MAX):
+    """
+    재시도 전 대기 시간 (Retry-After 헤더가 있으면 그 값, 없으면 지수 백오프 + 지터)
+    """
+    response = getattr(error, 'response', None)
+    if response is not None:
+        retry_after = response.headers.get('retry-after')
+        try:
+            if retry_after is not None:
+                return min(float(retry_after), backoff_max)
+        except ValueError:
+            pass
+    return min(backoff * (2 ** attempt), backoff_max) * random.uniform(0.5, 1.0)
+
+
+def new_embedding_stats():
+    return {'texts': 0, 'requests': 0, 'retries': 0, 'splits': 0, 'failed': 0, 'elapsed': 0.0,
+            'cache_hits': 0, 'cache_misses': 0, 'duplicates': 0, 'texts_avoided': 0, 'requests_avoided': 0}
+
+
+class BatchEmbeddingClient:
+    """
+    텍스트 목록을 배치로 묶어 동시에 임베딩하는 클라이언트
+    - embed(texts): 입력 순서대로 임베딩(float 리스트, 실패 / 빈 텍스트는 None) 목록을 반환합니다.
+    - stats: 텍스트 / 요청 / 재시도 / 분할 / 실패 수와 소요 시간, 캐시 적중 / 절약한 요청 수 누계
+    - last_failed_rows: 마지막 embed 호출에서 400이 아닌 오류로 실패한(다시 요청할 수 있는) 행 번호 목록
+    """
+    def __init__(self, api_key=None, base_url=EMBEDDING_BASE_URL, model=EMBEDDING_MODEL,
+                 batch_size=EMBEDDING_BATCH_SIZE, batch_tokens=EMBEDDING_BATCH_TOKENS,
+                 concurrency=EMBEDDING_CONCURRENCY, max_retries=EMBEDDING_MAX_RETRIES,
+                 backoff=EMBEDDING_BACKOFF, timeout=EMBEDDING_TIMEOUT, cache=None):
+        if batch_size < 1 or concurrency < 1:
+            raise ValueError("batch_size와 concurrency는 1 이상이어야 합니다.")
+        self.api_key = api_key
+        self.base_url = base_url
+        self.model = model
+        self.batch_size = batch_size
+        self.batch_tokens = batch_tokens
+        self.concurrency = concurrency
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.timeout = timeout
+        self.cache = cache
+        self.stats = new_embedding_stats()
+        self.last_failed_rows = []
+
+    def embed(self, texts):
+        """
+        텍스트 목록을 임베딩하는 메서드 (동기 호출, 내부에서 이벤트 루프 실행)
+        """
+        return asyncio.run(self.embed_async(texts))
+
+    async def embed_async(self, texts):
+        start_time = monotonic()
+        results = [None] * len(texts)
+        self.last_failed_rows = []
+        items = [(index, str(text)) for index, text in enumerate(texts)
+                 if text is not None and not (isinstance(text, float) and text != text) and str(text).strip()]
+        self.stats['texts'] += len(items)
+        pending, followers = self._lookup_cache(items, results)
+
+        # 재시도는 클라이언트 안에서 직접 처리 (openai 라이브러리 자체 재시도는 끔)
+        if pending:
+            async with AsyncOpenAI(api_key=self.api_key or 'EMPTY', base_url=self.base_url,
+                                   max_retries=0, timeout=self.timeout) as client:
+                semaphore = asyncio.Semaphore(self.concurrency)
+                await asyncio.gather(*(self._embed_batch(client, semaphore, batch, results)
+                                       for batch in make_batches(pending, self.batch_size, self.batch_tokens)))
+
+        # 같은 텍스트가 여러 번 나온 행은 처음 나온 행의 결과를 사용
+        failed = set(self.last_failed_rows)
+        for index, first_index in followers:
+            results[index] = results[first_index]
+            if first_index in failed:
+                self.last_failed_rows.append(index)
+        self.stats['elapsed'] += monotonic() - start_time
+        return results
+
+    def _lookup_cache(self, items, results):
+        """
+        캐시에 있는 텍스트는 results에 채우고, 요청할 (행 번호, 텍스트) 목록과 중복 행 목록을 반환하는 메서드
+        - 중복 행: [(행 번호, 같은 텍스트가 처음 나온 행 번호)]
+        """
+        if self.cache is None:
+            return items, []
+        keys = [cache_key(self.model, text) for _, text in items]
+        cached = self.cache.get_many(set(keys))
+        first = dict()  # 캐시 키 → 처음 나온 행 번호
+        pending = []
+        followers = []
+        for (index, text), key in zip(items, keys):
+            vector = cached.get(key)
+            if vector is not None:
+                results[index] = vector.tolist()
+                self.stats['cache_hits'] += 1
+                continue
+            self.stats['cache_misses'] += 1
+            if key in first:
+                followers.append((index, first[key]))
+                self.stats['duplicates'] += 1
+            else:
+                first[key] = index
+                pending.append((index, text))
+        self.stats['texts_avoided'] += len(items) - len(pending)
+        self.stats['requests_avoided'] += (len(make_batches(items, self.batch_size, self.batch_tokens))
+                                           - len(make_batches(pending, self.batch_size, self.batch_tokens)))
+        return pending, followers
+
+    async def _request(self, client, semaphore, batch):
+        """
+        배치 하나를 요청하고 배치 안 순서대로 임베딩 목록을 반환하는 메서드 (재시도할 수 있는 오류는 백오프 후 재시도)
+        """
+        for attempt in range(self.max_retries + 1):
+            try:
+                async with semaphore:
+                    self.stats['requests'] += 1
+                    response = await client.embeddings.create(model=self.model, input=[text for _, text in batch])
+                data = sorted(response.data, key=lambda item: item.index)
+                if len(data) != len(batch):
+                    raise ValueError(f"응답 임베딩 수가 다릅니다 ({len(data)} != {len(batch)})")
+                return [item.embedding for item in data]
+            except RETRYABLE_ERRORS as e:
+                if attempt == self.max_retries:
+                    raise
+                self.stats['retries'] += 1
+                await asyncio.sleep(retry_delay(e, attempt, self.backoff))
+
+    async def _embed_batch(self, client, semaphore, batch, results):
+        try:
+            embeddings = await self._request(client, semaphore, batch)
+        except openai.BadRequestError as e:
+            if len(batch) > 1:
+                # 문제가 되는 텍스트만 찾도록 반으로 나눠 다시 요청
+                self.stats['splits'] += 1
+                middle = len(batch) // 2
+                await asyncio.gather(self._embed_batch(client, semaphore, batch[:middle], results),
+                                     self._embed_batch(client, semaphore, batch[middle:], results))
+                return
+            print(f"임베딩 생성 중 오류 발생 (행 {batch[0][0]}): {e}")
+            self.stats['failed'] += 1
+            return
+        except Exception as e:
+            print(f"임베딩 생성 중 오류 발생 (행 {batch[0][0]}~{batch[-1][0]}, {len(batch)}개): {e}")
+            self.stats['failed'] += len(batch)
+            self.last_failed_rows.extend(index for index, _ in batch)
+            return
+        for (index, _), embedding in zip(batch, embeddings):
+            results[index] = embedding
+        if self.cache is not None:
+            self.cache.put_many(self.model, [(cache_key(self.model, text), embedding)
+                                             for (_, text), embedding in zip(batch, embeddings)])
+
+
+def format_embedding_stats(stats):
+    """
+    임베딩 처리량 요약 문자열을 만드는 함수
+    """
+    elapsed = stats['elapsed'] or 1e-9
+    return (f"임베딩 {stats['texts']}개, 요청 {stats['requests']}회 (재시도 {stats['retries']}회, "
+            f"배치 분할 {stats['splits']}회), 실패 {stats['failed']}개, {stats['elapsed']:.1f}초, "
+            f"{stats['texts'] / elapsed:.1f} texts/sec"
+            + (f", {format_embedding_cache_stats(stats)}" if stats['cache_hits'] + stats['cache_misses'] else ''))
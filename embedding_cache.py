@@ -0,0 +1,108 @@
+# 임베딩 캐시 (파일 / 실행 간 공유)
+# - (모델명 + 정규화한 텍스트)의 SHA-256을 키로 float32 벡터를 SQLite BLOB으로 저장합니다.
+#   정규화: 유니코드 NFC, 연속 공백을 한 칸으로, 앞뒤 공백 제거 (대소문자는 유지)
+# - 여러 카테고리에 같은 Spec이 많으므로 API를 부르기 전에 캐시를 먼저 확인합니다 (BatchEmbeddingClient의 cache).
+# - 여러 프로세스가 같은 파일을 함께 쓸 수 있도록 WAL 모드를 사용합니다 (image_cache와 같은 방식).
+
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+import unicodedata
+from time import time
+
+import numpy as np
+
+# 캐시 파일명 (crawl_data/state 아래에 생성)
+EMBEDDING_CACHE_FILE = 'embedding_cache.sqlite3'
+
+# 한 번에 조회하는 키 수 (SQLite 변수 개수 제한보다 작게)
+LOOKUP_CHUNK_SIZE = 500
+
+WHITESPACE_PATTERN = re.compile(r'\s+')
+
+
+def normalize_text(text):
+    return WHITESPACE_PATTERN.sub(' ', unicodedata.normalize('NFC', str(text))).strip()
+
+
+def cache_key(model, text):
+    """
+    (모델명 + 정규화한 텍스트)의 SHA-256 (32바이트)
+    """
+    return hashlib.sha256(f'{model}\0{normalize_text(text)}'.encode('utf-8')).digest()
+
+
+class EmbeddingCache:
+    """
+    캐시 키 → float32 임베딩 영구 캐시
+    - get_many(keys): 캐시에 있는 키만 {키: float32 ndarray}로 반환
+    - put_many(items): [(키, 벡터)]를 저장하고 커밋
+    """
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.Lock()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute(
+            'CREATE TABLE IF NOT EXISTS embedding_cache ('
+            'key BLOB PRIMARY KEY, model TEXT, dim INTEGER, vector BLOB, created_at REAL) WITHOUT ROWID'
+        )
+        self.conn.commit()
+
+    def __getstate__(self):
+        # 멀티프로세싱으로 전달될 때는 경로만 넘기고 각 프로세스에서 다시 연결
+        return {'path': self.path}
+
+    def __setstate__(self, state):
+        self.__init__(state['path'])
+
+    def get_many(self, keys):
+        found = {}
+        keys = list(keys)
+        with self.lock:
+            for start in range(0, len(keys), LOOKUP_CHUNK_SIZE):
+                chunk = keys[start:start + LOOKUP_CHUNK_SIZE]
+                rows = self.conn.execute(
+                    f'SELECT key, vector FROM embedding_cache WHERE key IN ({",".join("?" * len(chunk))})', chunk
+                ).fetchall()
+                for key, vector in rows:
+                    found[bytes(key)] = np.frombuffer(vector, dtype=np.float32)
+        return found
+
+    def put_many(self, model, items):
+        rows = []
+        now = time()
+        for key, vector in items:
+            vector = np.asarray(vector, dtype=np.float32)
+            rows.append((key, model, len(vector), vector.tobytes(), now))
+        if not rows:
+            return
+        with self.lock:
+            self.conn.executemany(
+                'INSERT OR REPLACE INTO embedding_cache (key, model, dim, vector, created_at) VALUES (?, ?, ?, ?, ?)',
+                rows,
+            )
+            self.conn.commit()
+
+    def count(self):
+        with self.lock:
+            return self.conn.execute('SELECT COUNT(*) FROM embedding_cache').fetchone()[0]
+
+    def close(self):
+        with self.lock:
+            self.conn.commit()
+            self.conn.close()
+
+
+def format_embedding_cache_stats(stats):
+    """
+    임베딩 캐시 적중률과 줄어든 API 요청 수 요약 문자열을 만드는 함수
+    """
+    lookups = stats.get('cache_hits', 0) + stats.get('cache_misses', 0)
+    hit_rate = stats.get('cache_hits', 0) / lookups * 100 if lookups else 0.0
+    return (f"임베딩 캐시 적중 {stats.get('cache_hits', 0)}/{lookups}건 ({hit_rate:.1f}%), "
+            f"같은 텍스트 중복 {stats.get('duplicates', 0)}건, "
+            f"API 요청 {stats.get('requests_avoided', 0)}회 절약 (텍스트 {stats.get('texts_avoided', 0)}개)")
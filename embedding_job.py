@@ -0,0 +1,239 @@
+# 청크 단위 스트리밍 임베딩 작업 (중단 후 이어서 실행)
+# - 데이터 파일(CSV / Parquet)의 Spec 열만 chunk_rows행씩 읽어 임베딩하고, 청크가 끝날 때마다
+#   임베딩 저장소의 .part 파일(행렬: float32 원시 바이트, 인덱스: int32)에 이어 붙인 뒤 fsync하고
+#   진행 기록(state/<이름>.embedding.json: 완료한 청크 / 행 / 파일 크기)을 저장합니다.
+# - 다시 실행하면 진행 기록의 크기로 .part 파일을 자르고 마지막으로 완료한 청크 다음부터 이어서 임베딩합니다.
+# - 청크에 다시 요청할 수 있는 오류(인증 오류, 재시도 횟수 초과 등)로 실패한 행이 있으면 그 청크를 기록하지 않고
+#   멈춥니다 (완료로 기록하지 않으므로 다음 실행에서 그 청크부터 다시 임베딩).
+#   입력 파일(크기 / 수정 시간)이나 청크 크기가 바뀌었으면 처음부터 다시 합니다.
+# - 모든 청크가 끝나면 .part 파일을 블록 단위로 복사해 embedding_store 형식(.npy)으로 만들고 원자적으로 교체합니다.
+# - 메모리에는 청크 하나의 텍스트 / 임베딩만 올리므로 파일 크기와 관계없이 사용량이 일정합니다.
+
+import json
+import os
+import re
+from datetime import datetime
+from time import monotonic
+
+import numpy as np
+import pandas as pd
+
+from crawl_output import publish
+from data_store import FORMAT_PARQUET, require_pyarrow, pq
+from embedding_store import embedding_store_paths, MISSING_ROW
+
+# 청크당 행 수 (배치 크기 x 동시 요청 수보다 크게 잡아 동시 요청을 채움)
+EMBEDDING_CHUNK_ROWS = 1000
+
+# .part 파일을 .npy로 옮길 때 한 번에 복사하는 행 수
+COPY_BLOCK_ROWS = 4096
+
+# 임베딩할 텍스트 열
+SPEC_COLUMN = 'Spec'
+
+PART_SUFFIX = '.part'
+
+
+def ledger_path(state_dir, data_path):
+    name = re.sub(r'[\\/*?:"<>|]', '_', os.path.splitext(os.path.basename(data_path))[0])
+    return os.path.join(state_dir, f'{name}.embedding.json')
+
+
+def source_signature(data_path):
+    """
+    입력 파일이 바뀌었는지 확인하는 (크기, 수정 시간)
+    """
+    stat = os.stat(data_path)
+    return {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+
+
+def iter_spec_chunks(data_path, chunk_rows=EMBEDDING_CHUNK_ROWS):
+    """
+    데이터 파일의 Spec 열을 chunk_rows행씩 [텍스트 또는 None] 목록으로 읽는 제너레이터
+    """
+    if data_path.endswith('.' + FORMAT_PARQUET):
+        require_pyarrow()
+        parquet_file = pq.ParquetFile(data_path)
+        if SPEC_COLUMN not in parquet_file.schema_arrow.names:
+            raise ValueError(f"'{data_path}'에 '{SPEC_COLUMN}' 컬럼이 없습니다.")
+        for batch in parquet_file.iter_batches(batch_size=chunk_rows, columns=[SPEC_COLUMN]):
+            yield batch.column(0).to_pylist()
+        return
+    header = pd.read_csv(data_path, encoding='utf-8-sig', nrows=0).columns
+    if SPEC_COLUMN not in header:
+        raise ValueError(f"'{data_path}'에 '{SPEC_COLUMN}' 컬럼이 없습니다.")
+    for chunk in pd.read_csv(data_path, encoding='utf-8-sig', usecols=[SPEC_COLUMN], dtype=str,
+                             chunksize=chunk_rows):
+        yield [None if pd.isna(spec) else spec for spec in chunk[SPEC_COLUMN]]
+
+
+def new_job_stats():
+    return {'chunks': 0, 'skipped_chunks': 0, 'failed_chunks': 0, 'rows': 0, 'vectors': 0, 'elapsed': 0.0}
+
+
+class EmbeddingJob:
+    """
+    데이터 파일 하나를 청크 단위로 임베딩해 임베딩 저장소(embedding_store)에 기록하는 작업
+    - run(): 남은 청크를 임베딩하고 저장소를 완성 (이미 완료한 파일이면 아무것도 하지 않음,
+      실패한 청크가 있으면 그 앞까지만 기록하고 완료하지 않음)
+    - client: embed(texts)로 입력 순서대로 임베딩(없으면 None) 목록을 돌려주고
+      last_failed_rows에 다시 요청할 행 번호를 남기는 객체 (BatchEmbeddingClient)
+    - stats: 이번 실행에서 처리한 / 건너뛴 / 실패한 청크, 행, 벡터 수와 소요 시간
+    """
+    def __init__(self, data_path, state_dir, client, chunk_rows=EMBEDDING_CHUNK_ROWS):
+        if chunk_rows < 1:
+            raise ValueError("chunk_rows는 1 이상이어야 합니다.")
+        self.data_path = data_path
+        self.client = client
+        self.chunk_rows = chunk_rows
+        self.matrix_path, self.index_path = embedding_store_paths(data_path)
+        self.matrix_part = self.matrix_path + PART_SUFFIX
+        self.index_part = self.index_path + PART_SUFFIX
+        self.ledger_path = ledger_path(state_dir, data_path)
+        self.stats = new_job_stats()
+        os.makedirs(state_dir, exist_ok=True)
+        self.ledger = self._load_ledger()
+
+    def _new_ledger(self):
+        return {'source': os.path.basename(self.data_path), 'signature': source_signature(self.data_path),
+                'chunk_rows': self.chunk_rows, 'chunks': 0, 'rows': 0, 'vectors': 0, 'dim': None,
+                'matrix_size': 0, 'index_size': 0, 'done': False}
+
+    def _load_ledger(self):
+        """
+        진행 기록을 읽고, 같은 입력 / 청크 크기로 진행 중이던 작업이면 .part 파일을 기록 크기로 자르는 메서드
+        """
+        ledger = None
+        if os.path.exists(self.ledger_path):
+            with open(self.ledger_path, 'r', encoding='utf-8') as f:
+                ledger = json.load(f)
+        if ledger is not None and ledger.get('signature') == source_signature(self.data_path) \
+                and ledger.get('chunk_rows') == self.chunk_rows:
+            if ledger['done'] and os.path.exists(self.matrix_path) and os.path.exists(self.index_path):
+                return ledger
+            if not ledger['done'] and os.path.exists(self.matrix_part) and os.path.exists(self.index_part) \
+                    and os.path.getsize(self.matrix_part) >= ledger['matrix_size'] \
+                    and os.path.getsize(self.index_part) >= ledger['index_size']:
+                # 마지막으로 완료한 청크 뒤에 기록된 부분은 버림
+                for path, size in ((self.matrix_part, ledger['matrix_size']), (self.index_part, ledger['index_size'])):
+                    with open(path, 'r+b') as f:
+                        f.truncate(size)
+                return ledger
+        for path in (self.matrix_part, self.index_part):
+            with open(path, 'wb'):
+                pass
+        ledger = self._new_ledger()
+        self._save_ledger(ledger)
+        return ledger
+
+    def _save_ledger(self, ledger):
+        ledger['updated'] = datetime.now().isoformat(timespec='seconds')
+        temp_path = self.ledger_path + '.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(ledger, f, ensure_ascii=False)
+        os.replace(temp_path, self.ledger_path)
+
+    @property
+    def done(self):
+        return self.ledger['done']
+
+    @property
+    def resumed_chunks(self):
+        return self.ledger['chunks'] if not self.ledger['done'] else 0
+
+    def run(self):
+        """
+        남은 청크를 임베딩하고 저장소를 완성하는 메서드 (저장소 행렬 행 수 반환)
+        - 실패한 청크가 있으면 진행 기록을 그 앞 청크에서 멈추고 저장소를 완성하지 않습니다 (done이 False로 남음).
+        """
+        if self.ledger['done']:
+            return self.ledger['vectors']
+        start_time = monotonic()
+        failed = False
+        for number, texts in enumerate(iter_spec_chunks(self.data_path, self.chunk_rows)):
+            if number < self.ledger['chunks']:
+                self.stats['skipped_chunks'] += 1
+                continue
+            embeddings = self.client.embed(texts)
+            if self.client.last_failed_rows:
+                # .part 파일은 이어 붙이기만 하므로 이 청크부터 다음 실행에서 다시 임베딩
+                print(f"청크 {number} 임베딩 실패 ({len(self.client.last_failed_rows)}행), "
+                      f"다음 실행에서 이 청크부터 다시 진행")
+                self.stats['failed_chunks'] += 1
+                failed = True
+                break
+            self._append_chunk(embeddings)
+            self.stats['chunks'] += 1
+            self.stats['rows'] += len(texts)
+        if not failed:
+            self._finalize()
+        self.stats['elapsed'] += monotonic() - start_time
+        return self.ledger['vectors']
+
+    def _append_chunk(self, embeddings):
+        """
+        청크의 임베딩을 .part 파일에 이어 붙이고 fsync한 뒤 진행 기록을 저장하는 메서드
+        """
+        ledger = self.ledger
+        if ledger['dim'] is None:
+            ledger['dim'] = next((len(value) for value in embeddings if value is not None), None)
+        dim = ledger['dim']
+        index = np.full(len(embeddings), MISSING_ROW, dtype=np.int32)
+        vectors = []
+        for i, value in enumerate(embeddings):
+            if value is not None and len(value) == dim:
+                index[i] = ledger['vectors'] + len(vectors)
+                vectors.append(np.asarray(value, dtype=np.float32))
+        matrix = np.stack(vectors) if vectors else np.zeros((0, dim or 0), dtype=np.float32)
+
+        for path, data in ((self.matrix_part, matrix), (self.index_part, index)):
+            with open(path, 'ab') as f:
+                f.write(data.tobytes())
+                f.flush()
+                os.fsync(f.fileno())
+        ledger['chunks'] += 1
+        ledger['rows'] += len(embeddings)
+        ledger['vectors'] += len(vectors)
+        ledger['matrix_size'] += matrix.nbytes
+        ledger['index_size'] += index.nbytes
+        self.stats['vectors'] += len(vectors)
+        self._save_ledger(ledger)
+
+    def _finalize(self):
+        """
+        .part 파일을 .npy 형식으로 블록 단위 복사해 저장소를 교체하고 완료를 기록하는 메서드
+        (행렬을 먼저, 인덱스를 나중에 교체해 has_embedding_store가 완성된 저장소만 사용하도록 함)
+        """
+        ledger = self.ledger
+        dim = ledger['dim'] or 0
+        for part_path, final_path, dtype, shape in (
+                (self.matrix_part, self.matrix_path, np.float32, (ledger['vectors'], dim)),
+                (self.index_part, self.index_path, np.int32, (ledger['rows'],))):
+            temp_path = final_path + '.tmp'
+            target = np.lib.format.open_memmap(temp_path, mode='w+', dtype=dtype, shape=shape)
+            row_size = int(np.prod(shape[1:], dtype=np.int64)) if len(shape) > 1 else 1
+            with open(part_path, 'rb') as f:
+                for start in range(0, shape[0], COPY_BLOCK_ROWS):
+                    count = min(COPY_BLOCK_ROWS, shape[0] - start)
+                    block = np.fromfile(f, dtype=dtype, count=count * row_size)
+                    target[start:start + count] = block.reshape((count,) + shape[1:])
+            target.flush()
+            del target
+            with open(temp_path, 'rb+') as f:
+                os.fsync(f.fileno())
+            publish(temp_path, final_path)
+        ledger['done'] = True
+        self._save_ledger(ledger)
+        for path in (self.matrix_part, self.index_part):
+            os.remove(path)
+
+
+def format_job_stats(stats):
+    """
+    스트리밍 임베딩 작업 요약 문자열을 만드는 함수
+    """
+    elapsed = stats['elapsed'] or 1e-9
+    return (f"청크 {stats['chunks']}개 처리 (이어서 실행으로 건너뛴 청크 {stats['skipped_chunks']}개, "
+            f"실패한 청크 {stats['failed_chunks']}개), "
+            f"{stats['rows']}행, 임베딩 {stats['vectors']}개, {stats['elapsed']:.1f}초, "
+            f"{stats['rows'] / elapsed:.1f} rows/sec")
@@ -0,0 +1,253 @@
+# 임베딩 차원 축소 / 스칼라 양자화 (오프라인 단계)
+# - 임베딩 저장소(embedding_store)에서 표본을 뽑아 PCA(공분산 고유값 분해) 또는 랜덤 직교 투영을 학습하고,
+#   저장소의 벡터를 블록 단위로 축소해 <이름>.embeddings.<설정>.npy로 저장합니다 (행 번호 인덱스는 원본과 공유).
+# - 양자화: float16(그대로 변환) / int8(전체 공통 배율 하나로 대칭 양자화, 거리 순서가 배율에 영향받지 않음)
+#   OpenSearch 인덱스는 create_index(dimension, quantization)으로 같은 설정의 knn_vector를 만듭니다.
+# - recall@k 평가: 전체 차원 float32 완전 탐색(L2) 결과를 정답으로, 축소 / 양자화한 벡터의 완전 탐색 결과가
+#   상위 k개 중 몇 개를 찾는지 계산합니다. 기준(threshold) 이상인 설정 중 벡터 크기가 가장 작은 설정을 고릅니다.
+# - test/reduce_embeddings.py: 평가 / 적용 명령
+
+import os
+
+import numpy as np
+
+from crawl_output import publish
+from embedding_store import EmbeddingStore, embedding_store_paths
+from vector_search import ExactIndex, METRIC_L2
+
+# 축소 방식
+REDUCE_PCA = 'pca'
+REDUCE_RANDOM = 'random'
+REDUCE_METHODS = (REDUCE_PCA, REDUCE_RANDOM)
+
+# 양자화 방식 (None: float32 그대로)
+QUANT_FLOAT16 = 'float16'
+QUANT_INT8 = 'int8'
+QUANTIZATIONS = (None, QUANT_FLOAT16, QUANT_INT8)
+QUANT_DTYPES = {None: np.float32, QUANT_FLOAT16: np.float16, QUANT_INT8: np.int8}
+
+# 학습에 사용하는 최대 행 수 / 블록 단위 처리 행 수
+FIT_SAMPLE_ROWS = 50000
+BLOCK_ROWS = 8192
+
+# int8 배율을 정할 때 사용하는 절댓값 분위수 (드문 큰 값은 잘라냄)
+INT8_CLIP_QUANTILE = 0.9995
+
+# recall@k 평가 기본값
+RECALL_K = 10
+RECALL_QUERIES = 1000
+RECALL_THRESHOLD = 0.9
+
+# 학습한 축소 설정 파일명 (crawl_data/state 아래에 저장)
+REDUCER_FILE = 'embedding_reducer.npz'
+
+
+def sample_rows(matrix, count, seed=0):
+    """
+    행렬에서 최대 count개 행을 무작위로 뽑아 float32로 복사하는 함수 (memmap은 정렬된 순서로 읽음)
+    """
+    if len(matrix) <= count:
+        return np.asarray(matrix, dtype=np.float32)
+    rows = np.sort(np.random.default_rng(seed).choice(len(matrix), count, replace=False))
+    return np.asarray(matrix[rows], dtype=np.float32)
+
+
+class EmbeddingReducer:
+    """
+    학습한 차원 축소 + 양자화 설정
+    - fit(matrix): 표본으로 평균 / 투영 행렬 / int8 배율 학습
+    - encode(matrix): 축소 후 양자화한 벡터 (저장 / 색인용 dtype)
+    - decode(codes): 양자화를 되돌린 float32 축소 벡터 (recall 평가 / 거리 계산용)
+    - save(path) / load(path): .npz 파일로 저장 / 읽기 (질의 벡터도 같은 설정으로 encode해야 함)
+    """
+    def __init__(self, dim, method=REDUCE_PCA, quantization=None):
+        if method not in REDUCE_METHODS:
+            raise ValueError(f"지원하지 않는 축소 방식입니다: {method}")
+        if quantization not in QUANTIZATIONS:
+            raise ValueError(f"지원하지 않는 양자화 방식입니다: {quantization}")
+        self.dim = dim
+        self.method = method
+        self.quantization = quantization
+        self.mean = None
+        self.components = None  # (입력 차원, dim) float32
+        self.scale = 1.0
+        self.explained = None  # PCA: 남긴 성분의 분산 비율
+
+    @property
+    def name(self):
+        """
+        저장소 / 인덱스 설정 이름 (예: pca256, pca256-int8)
+        """
+        return f'{self.method}{self.dim}' + (f'-{self.quantization}' if self.quantization else '')
+
+    @property
+    def dtype(self):
+        return QUANT_DTYPES[self.quantization]
+
+    @property
+    def bytes_per_vector(self):
+        return self.dim * np.dtype(self.dtype).itemsize
+
+    def fit(self, matrix, sample=FIT_SAMPLE_ROWS, seed=0):
+        data = sample_rows(matrix, sample, seed)
+        input_dim = data.shape[1]
+        if not 0 < self.dim <= input_dim:
+            raise ValueError(f"축소 차원은 1~{input_dim} 사이여야 합니다: {self.dim}")
+        if self.method == REDUCE_PCA:
+            self.mean = data.mean(axis=0, dtype=np.float64).astype(np.float32)
+            covariance = np.zeros((input_dim, input_dim), dtype=np.float64)
+            for start in range(0, len(data), BLOCK_ROWS):
+                block = (data[start:start + BLOCK_ROWS] - self.mean).astype(np.float64)
+                covariance += block.T @ block
+            eigenvalues, eigenvectors = np.linalg.eigh(covariance)  # 오름차순
+            order = np.argsort(eigenvalues)[::-1][:self.dim]
+            self.components = np.ascontiguousarray(eigenvectors[:, order], dtype=np.float32)
+            total = eigenvalues.clip(min=0).sum()
+            self.explained = float(eigenvalues[order].clip(min=0).sum() / total) if total else 1.0
+        else:
+            # 가우스 행렬을 QR 분해한 직교 투영 (평균은 빼지 않음)
+            self.mean = np.zeros(input_dim, dtype=np.float32)
+            gaussian = np.random.default_rng(seed).standard_normal((input_dim, self.dim))
+            self.components = np.ascontiguousarray(np.linalg.qr(gaussian)[0], dtype=np.float32)
+        if self.quantization == QUANT_INT8:
+            self.fit_scale(data)
+        return self
+
+    def fit_scale(self, matrix, sample=FIT_SAMPLE_ROWS, seed=0):
+        """
+        int8 배율 학습 (축소한 값의 절댓값 분위수가 127이 되도록, 투영은 이미 학습된 상태)
+        """
+        reduced = self._project(sample_rows(matrix, sample, seed))
+        limit = float(np.quantile(np.abs(reduced), INT8_CLIP_QUANTILE))
+        self.scale = limit / 127 if limit > 0 else 1.0
+        return self
+
+    def _project(self, matrix):
+        return (np.asarray(matrix, dtype=np.float32) - self.mean) @ self.components
+
+    def encode(self, matrix):
+        reduced = self._project(matrix)
+        if self.quantization == QUANT_INT8:
+            return np.clip(np.rint(reduced / self.scale), -127, 127).astype(np.int8)
+        return reduced.astype(self.dtype)
+
+    def decode(self, codes):
+        if self.quantization == QUANT_INT8:
+            return codes.astype(np.float32) * np.float32(self.scale)
+        return codes.astype(np.float32)
+
+    def save(self, path):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        temp_path = path + '.tmp.npz'
+        np.savez(temp_path, dim=self.dim, method=self.method, quantization=self.quantization or '',
+                 mean=self.mean, components=self.components, scale=self.scale,
+                 explained=np.nan if self.explained is None else self.explained)
+        os.replace(temp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            reducer = cls(int(data['dim']), str(data['method']), str(data['quantization']) or None)
+            reducer.mean = data['mean']
+            reducer.components = data['components']
+            reducer.scale = float(data['scale'])
+            explained = float(data['explained'])
+            reducer.explained = None if np.isnan(explained) else explained
+        return reducer
+
+
+def reduced_store_path(data_path, reducer):
+    """
+    축소 벡터 행렬 경로 (<이름>.embeddings.<설정 이름>.npy)
+    """
+    return embedding_store_paths(data_path, reducer.name)[0]
+
+
+def write_reduced_store(data_path, reducer, block_rows=BLOCK_ROWS):
+    """
+    데이터 파일의 임베딩 저장소를 블록 단위로 축소 / 양자화해 저장하는 함수 (저장한 행 수 반환)
+    """
+    store = EmbeddingStore(data_path)
+    path = reduced_store_path(data_path, reducer)
+    temp_path = path + '.tmp'
+    target = np.lib.format.open_memmap(temp_path, mode='w+', dtype=reducer.dtype,
+                                       shape=(len(store.matrix), reducer.dim))
+    for start in range(0, len(store.matrix), block_rows):
+        target[start:start + block_rows] = reducer.encode(store.matrix[start:start + block_rows])
+    target.flush()
+    del target
+    with open(temp_path, 'rb+') as f:
+        os.fsync(f.fileno())
+    publish(temp_path, path)
+    # 인덱스가 변형 행렬보다 새로워야 has_embedding_store(variant)가 사용할 수 있는 저장소로 판단
+    _, index_path = embedding_store_paths(data_path)
+    os.utime(index_path)
+    return len(store.matrix)
+
+
+def exact_neighbors(queries, matrix, k, exclude=None, block_rows=BLOCK_ROWS):
+    """
+    L2 거리 완전 탐색(vector_search.ExactIndex)으로 질의마다 가장 가까운 k개 행 번호를 반환하는 함수
+    - exclude: 질의마다 제외할 행 번호 (질의가 matrix의 행일 때 자기 자신 제외)
+    """
+    return ExactIndex(matrix, METRIC_L2, block_rows).search(queries, k, exclude)[0]
+
+
+def recall_at_k(truth, found):
+    """
+    정답 이웃(truth) 중 찾은 이웃(found)에 포함된 비율의 평균
+    """
+    hits = sum(len(set(expected) & set(result)) for expected, result in zip(truth.tolist(), found.tolist()))
+    return hits / truth.size if truth.size else 1.0
+
+
+def evaluate_reductions(matrix, dims, methods=(REDUCE_PCA,), quantizations=QUANTIZATIONS, k=RECALL_K,
+                        queries=RECALL_QUERIES, sample=FIT_SAMPLE_ROWS, seed=0):
+    """
+    (축소 방식, 차원, 양자화) 조합마다 recall@k를 계산하는 함수
+    - 질의는 matrix에서 뽑은 행(자기 자신은 제외)이며, 정답은 전체 차원 float32 완전 탐색 결과입니다.
+    - 결과: [{'method', 'dim', 'quantization', 'name', 'bytes', 'recall', 'explained'}] (벡터 크기 순)
+    """
+    rng = np.random.default_rng(seed)
+    query_rows = np.sort(rng.choice(len(matrix), min(queries, len(matrix)), replace=False))
+    query_vectors = np.asarray(matrix[query_rows], dtype=np.float32)
+    truth = exact_neighbors(query_vectors, matrix, k, exclude=query_rows)
+    results = [{'method': None, 'dim': matrix.shape[1], 'quantization': None, 'name': 'full',
+                'bytes': matrix.shape[1] * 4, 'recall': 1.0, 'explained': 1.0}]
+    for method in methods:
+        for dim in dims:
+            base = EmbeddingReducer(dim, method).fit(matrix, sample, seed)
+            for quantization in quantizations:
+                reducer = EmbeddingReducer(dim, method, quantization)
+                reducer.mean, reducer.components, reducer.explained = base.mean, base.components, base.explained
+                if quantization == QUANT_INT8:
+                    reducer.fit_scale(matrix, sample, seed)  # 투영은 같은 차원끼리 공유하고 배율만 학습
+                codes = np.concatenate([reducer.encode(matrix[start:start + BLOCK_ROWS])
+                                        for start in range(0, len(matrix), BLOCK_ROWS)])
+                found = exact_neighbors(reducer.decode(codes[query_rows]), reducer.decode(codes), k, exclude=query_rows)
+                results.append({'method': method, 'dim': dim, 'quantization': quantization, 'name': reducer.name,
+                                'bytes': reducer.bytes_per_vector, 'recall': recall_at_k(truth, found),
+                                'explained': reducer.explained})
+    return sorted(results, key=lambda result: (result['bytes'], -result['recall']))
+
+
+def choose_reduction(results, threshold=RECALL_THRESHOLD):
+    """
+    recall이 threshold 이상인 설정 중 벡터 크기가 가장 작은 설정 (없으면 None)
+    """
+    passing = [result for result in results if result['recall'] >= threshold]
+    return min(passing, key=lambda result: (result['bytes'], -result['recall'])) if passing else None
+
+
+def format_reduction_results(results, k=RECALL_K, threshold=RECALL_THRESHOLD):
+    """
+    recall@k 평가 결과 표 문자열을 만드는 함수 (기준 이상인 가장 작은 설정에 * 표시)
+    """
+    chosen = choose_reduction(results, threshold)
+    lines = [f"{'설정':<20}{'벡터 크기':>10}{f'recall@{k}':>12}{'분산 비율':>10}"]
+    for result in results:
+        explained = f"{result['explained']:.3f}" if result['explained'] is not None else '-'
+        mark = ' *' if result is chosen else ''
+        lines.append(f"{result['name']:<20}{result['bytes']:>9}B{result['recall']:>12.3f}{explained:>10}{mark}")
+    lines.append(f"* recall {threshold:.2f} 이상인 가장 작은 설정: {chosen['name'] if chosen else '없음'}")
+    return '\n'.join(lines)
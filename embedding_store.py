@@ -0,0 +1,176 @@
+# 데이터 파일별 임베딩 저장소 (float32 .npy 행렬 + 행 번호 인덱스)
+# - 임베딩을 CSV의 JSON 문자열 대신 데이터 파일 옆의 두 .npy 파일로 저장합니다.
+#   <이름>.embeddings.npy        : 임베딩이 있는 행만 모은 (M, dim) float32 행렬
+#   <이름>.embeddings.index.npy  : 데이터 파일의 행 번호 → 행렬 행 번호 (int32, 길이 N, 임베딩이 없으면 -1)
+#   <이름>.embeddings.<설정>.npy : 같은 인덱스를 쓰는 변형 행렬 (embedding_reduce의 축소 / 양자화 벡터)
+# - 읽을 때는 numpy.memmap(np.load(mmap_mode='r'))으로 열어 파싱 / 복사 없이 필요한 행만 디스크에서 읽습니다.
+# - 임시 파일에 기록한 뒤 원자적으로 교체하며, 행렬을 먼저 교체하고 인덱스를 나중에 교체합니다.
+#   (인덱스가 행렬보다 오래됐거나 데이터 파일보다 오래된 저장소는 사용하지 않음)
+# - load_embeddings(): 저장소가 있으면 저장소, 없으면 데이터 파일의 임베딩 열(read_embeddings)을 읽습니다.
+
+import os
+
+import numpy as np
+
+from crawl_output import AtomicCsvFile, publish
+from data_store import (EMBEDDING_COLUMN, FORMAT_PARQUET, embedding_list, read_embeddings, read_products,
+                        write_products)
+
+# 저장소 파일 이름 (데이터 파일 확장자 대신 붙임)
+EMBEDDING_STORE_SUFFIX = '.embeddings.npy'
+EMBEDDING_INDEX_SUFFIX = '.embeddings.index.npy'
+
+# 임베딩이 없는 행의 인덱스 값
+MISSING_ROW = -1
+
+# 행렬에 허용하는 dtype (원본은 float32, 변형은 축소 / 양자화 결과)
+VARIANT_DTYPES = (np.float32, np.float16, np.int8)
+
+
+def embedding_store_paths(data_path, variant=None):
+    """
+    데이터 파일의 (임베딩 행렬 경로, 행 번호 인덱스 경로) (variant: 변형 행렬 이름)
+    """
+    base = os.path.splitext(data_path)[0]
+    matrix_path = base + EMBEDDING_STORE_SUFFIX
+    if variant:
+        matrix_path = base + EMBEDDING_STORE_SUFFIX.replace('.npy', f'.{variant}.npy')
+    return matrix_path, base + EMBEDDING_INDEX_SUFFIX
+
+
+def has_embedding_store(data_path, variant=None):
+    """
+    데이터 파일보다 새로운 임베딩 저장소가 있는지 확인하는 함수
+    """
+    matrix_path, index_path = embedding_store_paths(data_path, variant)
+    if not (os.path.exists(matrix_path) and os.path.exists(index_path)):
+        return False
+    index_mtime = os.path.getmtime(index_path)
+    if index_mtime < os.path.getmtime(matrix_path):
+        return False
+    return not os.path.exists(data_path) or index_mtime >= os.path.getmtime(data_path)
+
+
+def write_npy(path, array):
+    temp_path = path + '.tmp'
+    with open(temp_path, 'wb') as f:
+        np.lib.format.write_array(f, np.ascontiguousarray(array), allow_pickle=False)
+        f.flush()
+        os.fsync(f.fileno())
+    publish(temp_path, path)
+
+
+def write_embedding_store(data_path, embeddings, valid=None, dim=None):
+    """
+    데이터 파일의 임베딩을 저장소에 기록하는 함수 (행렬 행 수 반환)
+    - embeddings: 행마다 임베딩 목록(리스트 / ndarray / JSON 문자열, 없으면 None) 또는 (N, dim) 행렬
+    - valid: (N, dim) 행렬을 넘길 때 임베딩이 있는 행 마스크 (None이면 모든 행)
+    """
+    if isinstance(embeddings, np.ndarray) and embeddings.ndim == 2:
+        matrix = np.asarray(embeddings, dtype=np.float32)
+        valid = np.ones(len(matrix), dtype=bool) if valid is None else np.asarray(valid, dtype=bool)
+        rows = np.flatnonzero(valid)
+        if not valid.all():
+            matrix = matrix[rows]
+    else:
+        embeddings = [embedding_list(value) for value in embeddings]
+        if dim is None:
+            dim = next((len(value) for value in embeddings if value is not None), 0)
+        rows = np.array([i for i, value in enumerate(embeddings) if value is not None and len(value) == dim],
+                        dtype=np.int64)
+        matrix = np.zeros((len(rows), dim), dtype=np.float32)
+        for position, row in enumerate(rows):
+            matrix[position] = embeddings[row]
+        valid = np.zeros(len(embeddings), dtype=bool)
+        valid[rows] = True
+
+    index = np.full(len(valid), MISSING_ROW, dtype=np.int32)
+    index[rows] = np.arange(len(rows), dtype=np.int32)
+    matrix_path, index_path = embedding_store_paths(data_path)
+    write_npy(matrix_path, matrix)
+    write_npy(index_path, index)
+    return len(rows)
+
+
+class EmbeddingStore:
+    """
+    memmap으로 연 데이터 파일 하나의 임베딩 저장소
+    - matrix: (M, dim) float32 memmap (임베딩이 있는 행만), index: 데이터 행 번호 → 행렬 행 번호
+    - get(row): 데이터 행의 임베딩 (memmap 뷰, 없으면 None)
+    - dense(): read_embeddings와 같은 (N, dim) 행렬과 값 유무 마스크 (없는 행은 0, 복사본)
+    - variant: 변형 행렬 이름 (예: pca256-int8, 인덱스는 원본과 같은 파일)
+    """
+    def __init__(self, data_path, variant=None):
+        self.data_path = data_path
+        matrix_path, index_path = embedding_store_paths(data_path, variant)
+        self.matrix = np.load(matrix_path, mmap_mode='r')
+        self.index = np.load(index_path, mmap_mode='r')
+        dtypes = VARIANT_DTYPES if variant else (np.float32,)
+        if self.matrix.dtype not in dtypes or self.matrix.ndim != 2 \
+                or self.index.max(initial=MISSING_ROW) >= len(self.matrix):
+            raise ValueError(f"임베딩 저장소 형식이 올바르지 않습니다: {matrix_path}")
+
+    def __len__(self):
+        return len(self.index)
+
+    @property
+    def dim(self):
+        return self.matrix.shape[1]
+
+    @property
+    def valid(self):
+        return np.asarray(self.index) != MISSING_ROW
+
+    def get(self, row):
+        position = self.index[row]
+        return None if position == MISSING_ROW else self.matrix[position]
+
+    def dense(self):
+        valid = self.valid
+        if valid.all() and np.array_equal(self.index, np.arange(len(self.index))):
+            return np.array(self.matrix), valid
+        matrix = np.zeros((len(self.index), self.dim), dtype=self.matrix.dtype)
+        matrix[valid] = self.matrix[np.asarray(self.index)[valid]]
+        return matrix, valid
+
+
+def load_embeddings(data_path):
+    """
+    데이터 파일의 임베딩을 (N, dim) float32 행렬과 값 유무 마스크로 읽는 함수
+    - 저장소가 있고 모든 행에 임베딩이 있으면 memmap을 그대로 반환 (복사 없음)
+    - 저장소가 없으면 데이터 파일의 임베딩 열을 읽음 (CSV는 JSON 문자열 파싱)
+    """
+    if not has_embedding_store(data_path):
+        return read_embeddings(data_path)
+    store = EmbeddingStore(data_path)
+    valid = store.valid
+    if valid.all() and len(store.matrix) == len(store.index):
+        return store.matrix, valid
+    return store.dense()
+
+
+def convert_embedding_column(data_path):
+    """
+    데이터 파일의 임베딩 열을 저장소로 옮기는 함수 (저장소에 기록한 행렬 행 수 반환, 열이 없으면 None)
+    - 저장소를 먼저 기록하고, 데이터 파일에서 임베딩 열을 뺀 뒤 인덱스 수정 시간을 갱신 (데이터 파일보다 새롭게 유지)
+    """
+    df = read_products(data_path)
+    if EMBEDDING_COLUMN not in df.columns:
+        return None
+    matrix, valid = read_embeddings(data_path)
+    count = write_embedding_store(data_path, matrix, valid)
+    df = df.drop(columns=[EMBEDDING_COLUMN])
+    if data_path.endswith('.' + FORMAT_PARQUET):
+        write_products(data_path, df)
+    else:
+        writer = AtomicCsvFile(data_path)
+        try:
+            writer.writerow(list(df.columns))
+            writer.writerows(df.astype(object).where(df.notna(), '').values.tolist())
+        except Exception:
+            writer.discard()
+            raise
+        writer.commit()
+    _, index_path = embedding_store_paths(data_path)
+    os.utime(index_path)
+    return count
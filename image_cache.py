@@ -0,0 +1,123 @@
+# 이미지 URL 캐시 (크롤링 실행 간 유지)
+# - 이미지 URL별로 ETag / Last-Modified / 로컬 파일 경로 / 크기를 SQLite에 저장합니다.
+# - 다음 크롤링에서 If-None-Match / If-Modified-Since 조건부 요청을 보내고,
+#   304 응답이면 저장된 파일을 재사용합니다 (제품명이 바뀌어도 같은 URL이면 다시 받지 않음).
+# - DataSort가 이미지 파일 이름을 정제된 제품명으로 바꾸면 relocate()로 캐시의 경로도 함께 옮깁니다.
+#   (옮기지 않으면 저장된 경로의 파일이 없어 다음 크롤링에서 모든 이미지를 다시 받음)
+# - 여러 프로세스(멀티프로세싱 풀)가 같은 파일을 함께 쓸 수 있도록 WAL 모드를 사용합니다.
+
+import os
+import sqlite3
+import threading
+from time import time
+
+# 마지막 확인 후 이 시간(초) 이내면 요청 없이 재사용 (0이면 항상 조건부 요청으로 재검증)
+IMAGE_CACHE_MAX_AGE = 0
+
+# 이 개수만큼 갱신이 쌓이면 커밋
+COMMIT_EVERY = 100
+
+
+class ImageUrlCache:
+    """
+    이미지 URL → (ETag, Last-Modified, 로컬 경로, 크기, 마지막 확인 시각) 영구 캐시
+    """
+    def __init__(self, path, max_age=IMAGE_CACHE_MAX_AGE):
+        self.path = path
+        self.max_age = max_age
+        self.lock = threading.Lock()
+        self.pending = 0
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute(
+            'CREATE TABLE IF NOT EXISTS image_cache ('
+            'url TEXT PRIMARY KEY, etag TEXT, last_modified TEXT, path TEXT, size INTEGER, checked_at REAL)'
+        )
+        self.conn.commit()
+
+    def __getstate__(self):
+        # 멀티프로세싱으로 전달될 때는 경로만 넘기고 각 프로세스에서 다시 연결
+        return {'path': self.path, 'max_age': self.max_age}
+
+    def __setstate__(self, state):
+        self.__init__(state['path'], state['max_age'])
+
+    def get(self, url):
+        """
+        URL의 캐시 항목을 반환하는 메서드 (로컬 파일이 없으면 None)
+        """
+        with self.lock:
+            row = self.conn.execute(
+                'SELECT etag, last_modified, path, size, checked_at FROM image_cache WHERE url = ?', (url,)
+            ).fetchone()
+        if row is None or not row[2] or not os.path.exists(row[2]):
+            return None
+        return {'etag': row[0], 'last_modified': row[1], 'path': row[2], 'size': row[3] or 0, 'checked_at': row[4] or 0}
+
+    def is_fresh(self, entry):
+        """
+        마지막 확인 후 max_age가 지나지 않아 요청 없이 재사용할 수 있는지 확인하는 메서드
+        """
+        return self.max_age > 0 and time() - entry['checked_at'] < self.max_age
+
+    def conditional_headers(self, entry):
+        """
+        조건부 요청 헤더를 만드는 메서드
+        """
+        headers = {}
+        if entry.get('etag'):
+            headers['If-None-Match'] = entry['etag']
+        if entry.get('last_modified'):
+            headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    def remember(self, url, job_stats, path):
+        """
+        다운로드 결과(job_stats의 ETag/Last-Modified)와 최종 경로를 캐시에 기록하는 메서드
+        """
+        if not path:
+            return
+        with self.lock:
+            self.conn.execute(
+                'INSERT OR REPLACE INTO image_cache (url, etag, last_modified, path, size, checked_at) '
+                'VALUES (?, ?, ?, ?, ?, ?)',
+                (url, job_stats.get('etag'), job_stats.get('last_modified'), path,
+                 job_stats.get('bytes_saved') or job_stats.get('bytes', 0), time()),
+            )
+            self.pending += 1
+            if self.pending >= COMMIT_EVERY:
+                self.conn.commit()
+                self.pending = 0
+
+    def relocate(self, moves):
+        """
+        (원래 경로, 새 경로) 목록대로 캐시 항목의 로컬 경로를 바꾸는 메서드 (이미지 이름 변경 / 중복 삭제 후 호출)
+        """
+        moves = list(moves)
+        if not moves:
+            return
+        with self.lock:
+            self.conn.executemany('UPDATE image_cache SET path = ? WHERE path = ?',
+                                  [(new_path, old_path) for old_path, new_path in moves])
+            self.conn.commit()
+            self.pending = 0
+
+    def flush(self):
+        with self.lock:
+            self.conn.commit()
+            self.pending = 0
+
+    def close(self):
+        self.flush()
+        self.conn.close()
+
+
+def format_cache_stats(stats):
+    """
+    캐시 적중률과 절약한 전송량 요약 문자열을 만드는 함수
+    """
+    requests_count = stats.get('cache_hits', 0) + stats.get('cache_misses', 0)
+    hit_rate = stats.get('cache_hits', 0) / requests_count * 100 if requests_count else 0.0
+    return (f"이미지 캐시 적중 {stats.get('cache_hits', 0)}/{requests_count}건 ({hit_rate:.1f}%), "
+            f"절약 {stats.get('bytes_saved', 0) / 1024 / 1024:.1f}MB")
@@ -0,0 +1,523 @@
+# 이미지 디렉토리 정리 (CSV에서 참조하지 않는 이미지 삭제 + 지각 해시 기반 중복 이미지 정리)
+# - 이미지 디렉토리는 os.scandir로 하위 디렉토리까지 스트리밍해서 읽고(파일 목록을 한 번에 만들지 않음),
+#   제품 데이터 파일(CSV / Parquet)의 ImageURL 열에서 참조하는 이미지가 아니면 고아(orphan) 이미지로 봅니다.
+#   참조 비교는 파일명만이 아니라 이미지 디렉토리 기준 상대 경로(카테고리/제품명.jpg)의 끝 부분으로 합니다.
+# - 참조되는 이미지는 프로세스 풀에서 지각 해시(pHash: 32x32 DCT 저주파 8x8, dHash: 9x8 밝기 차이)를 계산합니다.
+#   JPEG는 draft 모드로 축소 디코딩하므로 원본 크기로 디코딩하지 않습니다.
+# - 해밍 거리가 threshold 이하인 이미지를 다중 인덱스 해싱(64비트를 threshold + 1개 조각으로 나누면
+#   거리가 threshold 이하인 두 해시는 적어도 한 조각이 같음)으로 후보로 찾습니다.
+#   같은 틀의 사진에 라벨만 다른 제품(맛 / 용량 / 개수 변형)도 해시가 거의 같으므로, 후보 쌍은 64x64 썸네일의
+#   픽셀 차이로 한 번 더 확인하고 확인된 쌍으로 연결된 이미지를 한 그룹으로 묶습니다.
+# - 그룹마다 대표 이미지(가장 큰 파일, 같으면 경로 순)를 남기고 나머지는
+#   link: 대표 파일의 하드 링크로 교체 (CSV 참조는 그대로, 디스크 공간만 회수)
+#   collapse: 삭제하고 제품 데이터 파일의 ImageURL을 대표 이미지 경로로 변경
+# - 기본은 dry-run(계획만 보고서로 저장)이고 apply=True일 때만 파일을 변경합니다.
+
+import os
+import re
+import csv
+from functools import lru_cache
+from multiprocessing import Pool
+from time import monotonic
+
+import numpy as np
+from PIL import Image, ImageFilter
+
+from crawl_output import AtomicCsvFile, load_manifest
+from data_store import DATA_FORMATS, FORMAT_PARQUET, read_products, write_table, require_pyarrow, pq, pa
+from near_duplicates import connected_labels
+
+# 정리 대상 이미지 확장자
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.webp', '.gif')
+
+# 지각 해시 방식 (phash: DCT 기반, dhash: 인접 픽셀 밝기 차이)
+HASH_PHASH = 'phash'
+HASH_DHASH = 'dhash'
+HASH_METHOD = HASH_PHASH
+
+# 해시 크기 (8x8 = 64비트) / pHash DCT 입력 크기
+HASH_SIZE = 8
+PHASH_INPUT_SIZE = 32
+
+# 중복 후보로 볼 해밍 거리 (64비트 중 다른 비트 수)
+HAMMING_THRESHOLD = 4
+
+# 후보 쌍의 픽셀 확인: THUMBNAIL_SIZE 썸네일의 픽셀 차이(0~255)가 모두 이 값 이하여야 같은 이미지로 봄
+THUMBNAIL_SIZE = 64
+PIXEL_TOLERANCE = 24
+
+# 중복 이미지 처리 방식
+MODE_LINK = 'link'
+MODE_COLLAPSE = 'collapse'
+
+# 해시 계산 워커 수 / 워커에 한 번에 넘기는 이미지 수
+HASH_WORKERS = os.cpu_count() or 1
+HASH_CHUNK_SIZE = 64
+
+# 참조 비교에 사용하는 경로 끝 부분의 최대 깊이 (카테고리/제품명.jpg = 2, 해시 저장소 store/ab/cd/<해시>.jpg = 4)
+REFERENCE_DEPTH = 4
+
+# 보고서 작업 종류
+ACTION_ORPHAN = 'orphan'
+ACTION_LINK = 'link'
+ACTION_COLLAPSE = 'collapse'
+ACTION_UNREADABLE = 'unreadable'
+
+PATH_SEPARATOR_PATTERN = re.compile(r'[\\/]+')
+
+
+def scan_images(image_dir):
+    """
+    이미지 디렉토리를 하위 디렉토리까지 순회하며 (경로, 상대 경로 깊이, 크기, 장치, inode)를 반환하는 제너레이터
+    """
+    stack = [(image_dir, 1)]
+    while stack:
+        directory, depth = stack.pop()
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append((entry.path, depth + 1))
+                    elif entry.is_file(follow_symlinks=False) and entry.name.lower().endswith(IMAGE_EXTENSIONS):
+                        stat = entry.stat(follow_symlinks=False)
+                        yield entry.path, depth, stat.st_size, stat.st_dev, stat.st_ino
+        except OSError as e:
+            print(f"디렉토리를 읽을 수 없음 ({directory}): {str(e)}")
+
+
+def reference_key(path, depth):
+    """
+    경로의 끝 depth개 부분으로 참조 비교 키를 만드는 함수 (Windows / POSIX 구분자 모두 처리)
+    """
+    parts = PATH_SEPARATOR_PATTERN.split(str(path).strip())
+    return '/'.join(os.path.normcase(part) for part in parts[-depth:])
+
+
+def product_data_files(data_dir):
+    """
+    데이터 디렉토리의 모든 제품 데이터 파일 (CSV와 Parquet 모두, 작성 중인 임시 파일 제외)
+    """
+    files = []
+    with os.scandir(data_dir) as entries:
+        for entry in entries:
+            if entry.is_file() and entry.name.lower().endswith(tuple('.' + fmt for fmt in DATA_FORMATS)):
+                files.append(entry.path)
+    return sorted(files)
+
+
+def image_references(path):
+    """
+    제품 데이터 파일의 ImageURL 값 목록 (열이 없으면 빈 목록, 읽을 수 없으면 예외)
+    """
+    df = read_products(path, columns=['ImageURL'])
+    if 'ImageURL' not in df.columns:
+        return []
+    return [value for value in df['ImageURL'].tolist() if isinstance(value, str) and value]
+
+
+def referenced_keys(data_dir):
+    """
+    제품 데이터 파일에서 참조하는 이미지의 비교 키를 모으는 함수
+    - 반환: (깊이 1 ~ REFERENCE_DEPTH의 경로 끝 부분 키 집합, 디렉토리 없이 파일명만 적힌 참조 집합, 데이터 파일 수,
+      읽지 못한 데이터 파일 목록)
+    """
+    keys = set()
+    bare_names = set()
+    failed_files = []
+    files = product_data_files(data_dir)
+    for path in files:
+        try:
+            references = image_references(path)
+        except Exception as e:
+            print(f"제품 데이터를 읽을 수 없음 ({path}): {str(e)}")
+            failed_files.append(path)
+            continue
+        for value in references:
+            parts = len(PATH_SEPARATOR_PATTERN.split(value.strip()))
+            if parts == 1:
+                bare_names.add(reference_key(value, 1))
+            for depth in range(1, min(parts, REFERENCE_DEPTH) + 1):
+                keys.add(reference_key(value, depth))
+    return keys, bare_names, len(files), failed_files
+
+
+def is_referenced(path, depth, keys, bare_names):
+    """
+    이미지 디렉토리 기준 깊이 depth에 있는 이미지가 참조되는지 확인하는 함수
+    """
+    return reference_key(path, min(depth, REFERENCE_DEPTH)) in keys or reference_key(path, 1) in bare_names
+
+
+def popcount(values):
+    """
+    uint64 배열의 비트 수
+    """
+    if hasattr(np, 'bitwise_count'):
+        return np.bitwise_count(values)
+    return np.unpackbits(values.view(np.uint8).reshape(-1, 8), axis=1).sum(axis=1)
+
+
+def pack_bits(bits):
+    return int.from_bytes(np.packbits(bits.reshape(-1)).tobytes(), 'big')
+
+
+@lru_cache(maxsize=None)
+def dct_matrix(size):
+    """
+    size x size DCT-II 변환 행렬 (정규직교)
+    """
+    k = np.arange(size).reshape(-1, 1)
+    n = np.arange(size).reshape(1, -1)
+    matrix = np.cos(np.pi * (2 * n + 1) * k / (2 * size)) * np.sqrt(2.0 / size)
+    matrix[0] /= np.sqrt(2.0)
+    return matrix
+
+
+def image_hash(path, method=HASH_METHOD):
+    """
+    이미지 파일의 64비트 지각 해시를 계산하는 함수 (읽을 수 없으면 None)
+    """
+    try:
+        with Image.open(path) as img:
+            size = PHASH_INPUT_SIZE if method == HASH_PHASH else HASH_SIZE + 1
+            img.draft('L', (size * 2, size * 2))  # JPEG는 필요한 크기 근처로 축소 디코딩
+            gray = img.convert('L')
+        if method == HASH_DHASH:
+            pixels = np.asarray(gray.resize((HASH_SIZE + 1, HASH_SIZE), Image.Resampling.LANCZOS), dtype=np.int16)
+            return pack_bits(pixels[:, 1:] > pixels[:, :-1])
+        pixels = np.asarray(gray.resize((PHASH_INPUT_SIZE, PHASH_INPUT_SIZE), Image.Resampling.LANCZOS),
+                            dtype=np.float64)
+        matrix = dct_matrix(PHASH_INPUT_SIZE)
+        low = (matrix @ pixels @ matrix.T)[:HASH_SIZE, :HASH_SIZE]
+        return pack_bits(low > np.median(low.reshape(-1)[1:]))  # 직류 성분(0, 0)은 기준값에서 제외
+    except Exception:
+        return None
+
+
+def _hash_job(job):
+    path, method = job
+    return image_hash(path, method)
+
+
+def image_hashes(paths, method=HASH_METHOD, workers=HASH_WORKERS):
+    """
+    이미지 목록의 지각 해시를 프로세스 풀에서 계산하는 함수
+    - 반환: (uint64 해시 배열, 읽을 수 있는지 여부 배열), 입력 순서 유지
+    """
+    jobs = ((path, method) for path in paths)
+    if workers > 1 and len(paths) > HASH_CHUNK_SIZE:
+        with Pool(workers) as pool:
+            results = list(pool.imap(_hash_job, jobs, chunksize=HASH_CHUNK_SIZE))
+    else:
+        results = [_hash_job(job) for job in jobs]
+    valid = np.fromiter((value is not None for value in results), dtype=bool, count=len(results))
+    hashes = np.fromiter((value or 0 for value in results), dtype=np.uint64, count=len(results))
+    return hashes, valid
+
+
+def hash_chunks(threshold):
+    """
+    64비트를 threshold + 1개 조각으로 나눈 (시작 비트, 비트 수) 목록
+    """
+    count = min(threshold + 1, 64)
+    widths = [64 // count + (1 if i < 64 % count else 0) for i in range(count)]
+    starts = np.concatenate(([0], np.cumsum(widths)[:-1]))
+    return list(zip(starts.tolist(), widths))
+
+
+def near_hash_pairs(hashes, threshold=HAMMING_THRESHOLD):
+    """
+    서로 다른 해시 값 사이에서 해밍 거리가 threshold 이하인 (i, j) 쌍을 찾는 함수 (다중 인덱스 해싱)
+    - 같은 조각 값을 가진 해시끼리만 비교하며, 정렬된 조각 값에서 k칸 떨어진 위치를 한 번에 비교합니다.
+    """
+    pairs = []
+    for start, width in hash_chunks(threshold):
+        keys = (hashes >> np.uint64(start)) & np.uint64((1 << width) - 1)
+        order = np.argsort(keys, kind='stable')
+        sorted_keys = keys[order]
+        active = np.arange(len(order) - 1)
+        offset = 1
+        while len(active):
+            # 같은 조각 값이 offset칸 뒤까지 이어지는 위치만 남김 (구간이 연속이므로 한 번 빠지면 다시 들어오지 않음)
+            active = active[active + offset < len(order)]
+            active = active[sorted_keys[active] == sorted_keys[active + offset]]
+            if not len(active):
+                break
+            left, right = order[active], order[active + offset]
+            close = popcount(hashes[left] ^ hashes[right]) <= threshold
+            if close.any():
+                pairs.append(np.stack([left[close], right[close]], axis=1))
+            offset += 1
+    if not pairs:
+        return np.zeros((0, 2), dtype=np.int64)
+    pairs = np.sort(np.concatenate(pairs), axis=1)
+    codes = np.unique(pairs[:, 0] * len(hashes) + pairs[:, 1])
+    return np.stack([codes // len(hashes), codes % len(hashes)], axis=1)
+
+
+def candidate_pairs(hashes, threshold=HAMMING_THRESHOLD):
+    """
+    해시가 같거나 해밍 거리가 threshold 이하인 이미지 쌍 (행 번호)을 찾는 함수
+    - 같은 해시 값은 먼저 하나로 합친 뒤 서로 다른 값 사이만 비교합니다.
+    - 같은 해시 값의 이미지는 그 값의 첫 이미지와, 가까운 해시 값끼리는 각 값의 첫 이미지끼리 짝짓습니다.
+    """
+    if not len(hashes):
+        return np.zeros((0, 2), dtype=np.int64)
+    unique, first, inverse = np.unique(hashes, return_index=True, return_inverse=True)
+    inverse = inverse.reshape(-1)
+    rows = np.arange(len(hashes))
+    same = first[inverse] != rows
+    pairs = np.concatenate([np.stack([first[inverse[same]], rows[same]], axis=1),
+                            first[near_hash_pairs(unique, threshold)].reshape(-1, 2)])
+    return pairs.astype(np.int64)
+
+
+def group_rows(count, pairs):
+    """
+    쌍으로 연결된 행을 묶어 그룹(행 번호 배열 목록, 2개 이상인 그룹만)을 반환하는 함수
+    """
+    labels = connected_labels(count, pairs)
+    order = np.argsort(labels, kind='stable')
+    sorted_labels = labels[order]
+    boundaries = np.nonzero(sorted_labels[1:] != sorted_labels[:-1])[0] + 1
+    return [group for group in np.split(order, boundaries) if len(group) > 1]
+
+
+def duplicate_groups(hashes, threshold=HAMMING_THRESHOLD):
+    """
+    해시만으로 중복 후보 그룹을 찾는 함수 (픽셀 확인 없음)
+    """
+    return group_rows(len(hashes), candidate_pairs(hashes, threshold))
+
+
+def image_thumbnail(path):
+    """
+    픽셀 확인용 THUMBNAIL_SIZE x THUMBNAIL_SIZE RGB 썸네일 (흐림 처리로 JPEG 재압축 잡음을 줄임, 읽을 수 없으면 None)
+    """
+    try:
+        with Image.open(path) as img:
+            img.draft('RGB', (THUMBNAIL_SIZE * 2, THUMBNAIL_SIZE * 2))
+            thumbnail = img.convert('RGB').resize((THUMBNAIL_SIZE, THUMBNAIL_SIZE), Image.Resampling.BOX)
+        return np.asarray(thumbnail.filter(ImageFilter.BoxBlur(1)), dtype=np.uint8)
+    except Exception:
+        return None
+
+
+def image_thumbnails(paths, workers=HASH_WORKERS):
+    """
+    이미지 목록의 픽셀 확인용 썸네일을 프로세스 풀에서 만드는 함수 (입력 순서 유지)
+    """
+    if workers > 1 and len(paths) > HASH_CHUNK_SIZE:
+        with Pool(workers) as pool:
+            return list(pool.imap(image_thumbnail, paths, chunksize=HASH_CHUNK_SIZE))
+    return [image_thumbnail(path) for path in paths]
+
+
+def thumbnails_match(first, second, tolerance=PIXEL_TOLERANCE):
+    """
+    두 썸네일의 픽셀 차이가 모두 tolerance 이하인지 확인하는 함수
+    - 같은 틀의 사진에 라벨(용량 / 맛 / 개수)만 다른 제품은 지각 해시가 거의 같으므로 국소적인 차이로 구분합니다.
+    """
+    if first is None or second is None:
+        return False
+    return int(np.abs(first.astype(np.int16) - second).max()) <= tolerance
+
+
+def replace_with_link(target, path):
+    """
+    path를 target의 하드 링크로 교체하는 함수 (임시 링크를 만든 뒤 원자적으로 교체)
+    """
+    temp_path = path + '.link'
+    os.link(target, temp_path)
+    try:
+        os.replace(temp_path, path)
+    except OSError:
+        os.remove(temp_path)
+        raise
+
+
+def relocate_reference(value, replacement_parts, depth):
+    """
+    ImageURL 값의 끝 depth개 부분(이미지 디렉토리 기준 상대 경로)을 대표 이미지의 상대 경로로 바꾸는 함수
+    (원래 값의 앞부분 / 구분자 유지)
+    """
+    separator = '\\' if '\\' in value and '/' not in value else '/'
+    tokens = re.split(r'([\\/]+)', value)  # 경로 부분과 구분자가 번갈아 나옴
+    prefix = ''.join(tokens[:max(len(tokens) - (2 * depth - 1), 0)])
+    return prefix + separator.join(replacement_parts)
+
+
+def rewrite_references(data_dir, replacements, apply=True):
+    """
+    제품 데이터 파일의 ImageURL에서 삭제할 이미지를 대표 이미지로 바꾸는 함수
+    - replacements: {(깊이, 비교 키): (삭제할 이미지의 상대 경로 깊이, 대표 이미지 상대 경로 부분 목록)}
+    - 반환: 변경한 값 수 (apply가 False이면 변경할 값 수만 계산)
+    """
+    depths = sorted({depth for depth, _ in replacements}, reverse=True)
+    changed = 0
+    for path in product_data_files(data_dir):
+        references = image_references(path)
+        if not any((depth, reference_key(value, depth)) in replacements for value in references for depth in depths):
+            continue
+
+        def replace(value):
+            if not isinstance(value, str) or not value:
+                return value
+            for depth in depths:
+                replacement = replacements.get((depth, reference_key(value, depth)))
+                if replacement is not None:
+                    return relocate_reference(value, replacement[1], replacement[0])
+            return value
+
+        manifest = load_manifest(path)
+        crawled_at = manifest['crawled_at'] if manifest else None
+        if path.endswith('.' + FORMAT_PARQUET):
+            require_pyarrow()
+            table = pq.read_table(path)
+            index = table.schema.get_field_index('ImageURL')
+            values = table.column(index).to_pylist()
+            new_values = [replace(value) for value in values]
+            changed += sum(old != new for old, new in zip(values, new_values))
+            if apply:
+                write_table(path, table.set_column(index, 'ImageURL', pa.array(new_values, type=pa.string())),
+                            crawled_at)
+        else:
+            with open(path, 'r', newline='', encoding='utf-8-sig') as f:
+                rows = list(csv.reader(f))
+            index = rows[0].index('ImageURL')
+            for row in rows[1:]:
+                if len(row) > index:
+                    new_value = replace(row[index])
+                    if new_value != row[index]:
+                        row[index] = new_value
+                        changed += 1
+            if apply:
+                writer = AtomicCsvFile(path)
+                try:
+                    writer.writerows(rows)
+                except Exception:
+                    writer.discard()
+                    raise
+                writer.commit(crawled_at)
+    return changed
+
+
+def clean_images(data_dir, image_dir, apply=False, mode=MODE_LINK, method=HASH_METHOD,
+                 threshold=HAMMING_THRESHOLD, tolerance=PIXEL_TOLERANCE, workers=HASH_WORKERS, report_path=None):
+    """
+    고아 이미지를 삭제하고 중복 이미지를 정리하는 함수 (apply가 False이면 보고서만 작성)
+    - 반환: 통계 딕셔너리 (이미지 수, 고아 / 중복 이미지 수와 바이트, 해시 계산 시간 등)
+    """
+    if mode not in (MODE_LINK, MODE_COLLAPSE):
+        raise ValueError(f"지원하지 않는 중복 처리 방식: {mode}")
+    if method not in (HASH_PHASH, HASH_DHASH):
+        raise ValueError(f"지원하지 않는 해시 방식: {method}")
+
+    stats = {'images': 0, 'orphans': 0, 'orphan_bytes': 0, 'groups': 0, 'duplicates': 0, 'duplicate_bytes': 0,
+             'rejected': 0, 'unreadable': 0, 'references_changed': 0, 'failed': 0, 'hash_time': 0.0}
+    report = []  # (작업, 경로, 대상, 해밍 거리, 바이트)
+
+    keys, bare_names, data_file_count, failed_files = referenced_keys(data_dir)
+    if failed_files:
+        # 읽지 못한 파일이 참조하는 이미지가 고아로 보이므로 고아 이미지 정리를 하지 않음 (중복 정리는 계속)
+        print(f"오류: 제품 데이터 파일 {len(failed_files)}개를 읽지 못해 고아 이미지 정리를 건너뜁니다 "
+              f"({', '.join(os.path.basename(path) for path in failed_files)})")
+        keys = set()
+    elif not keys:
+        # 참조 목록이 비어 있으면 모든 이미지가 고아로 보이므로 삭제하지 않음
+        print(f"참조하는 이미지가 없어 고아 이미지 정리를 건너뜁니다 (제품 데이터 파일 {data_file_count}개)")
+
+    image_root = os.path.abspath(image_dir)
+    referenced = []  # (경로, 크기, 장치, inode, 상대 경로 깊이)
+    for path, depth, size, dev, ino in scan_images(image_root):
+        stats['images'] += 1
+        if keys and not is_referenced(path, depth, keys, bare_names):
+            stats['orphans'] += 1
+            stats['orphan_bytes'] += size
+            report.append([ACTION_ORPHAN, path, '', '', size])
+            if apply:
+                try:
+                    os.remove(path)
+                except OSError as e:
+                    stats['failed'] += 1
+                    print(f"이미지 삭제 실패 ({path}): {str(e)}")
+            continue
+        referenced.append((path, size, dev, ino, depth))
+
+    start_time = monotonic()
+    hashes, valid = image_hashes([item[0] for item in referenced], method, workers)
+    stats['hash_time'] = monotonic() - start_time
+    for index in np.nonzero(~valid)[0]:
+        stats['unreadable'] += 1
+        report.append([ACTION_UNREADABLE, referenced[index][0], '', '', referenced[index][1]])
+
+    # 해시 후보 쌍을 썸네일 픽셀 차이로 확인
+    readable = np.nonzero(valid)[0]
+    pairs = readable[candidate_pairs(hashes[readable], threshold)]
+    involved = np.unique(pairs).tolist()
+    thumbnails = dict(zip(involved, image_thumbnails([referenced[index][0] for index in involved], workers)))
+    confirmed = np.fromiter((thumbnails_match(thumbnails[a], thumbnails[b], tolerance) for a, b in pairs.tolist()),
+                            dtype=bool, count=len(pairs))
+    stats['rejected'] = int((~confirmed).sum())
+
+    replacements = dict()
+    for group in group_rows(len(referenced), pairs[confirmed]):
+        members = sorted(group.tolist(), key=lambda index: (-referenced[index][1], referenced[index][0]))
+        keep = referenced[members[0]]
+        stats['groups'] += 1
+        for index in members[1:]:
+            path, size, dev, ino, depth = referenced[index]
+            if (dev, ino) == (keep[2], keep[3]):
+                continue  # 이미 같은 파일 (하드 링크)
+            if not thumbnails_match(thumbnails[index], thumbnails[members[0]], tolerance):
+                continue  # 다른 이미지를 거쳐서만 연결된 경우 대표 이미지와 직접 비교해 다르면 그대로 둠
+            distance = int(popcount(np.array([hashes[index] ^ hashes[members[0]]], dtype=np.uint64))[0])
+            stats['duplicates'] += 1
+            stats['duplicate_bytes'] += size
+            if mode == MODE_LINK:
+                report.append([ACTION_LINK, path, keep[0], distance, size])
+                if apply:
+                    try:
+                        replace_with_link(keep[0], path)
+                    except OSError as e:
+                        stats['failed'] += 1
+                        print(f"하드 링크 교체 실패 ({path} -> {keep[0]}): {str(e)}")
+            else:
+                report.append([ACTION_COLLAPSE, path, keep[0], distance, size])
+                key_depth = min(depth, REFERENCE_DEPTH)
+                keep_parts = PATH_SEPARATOR_PATTERN.split(os.path.relpath(keep[0], image_root))
+                replacements[(key_depth, reference_key(path, key_depth))] = (depth, keep_parts)
+
+    if replacements:
+        # 참조를 먼저 바꾼 뒤 파일을 삭제 (중간에 실패해도 없는 파일을 가리키는 행이 생기지 않음)
+        stats['references_changed'] = rewrite_references(data_dir, replacements, apply)
+        if apply:
+            for action, path, _, _, _ in report:
+                if action == ACTION_COLLAPSE:
+                    try:
+                        os.remove(path)
+                    except OSError as e:
+                        stats['failed'] += 1
+                        print(f"이미지 삭제 실패 ({path}): {str(e)}")
+
+    if report_path:
+        os.makedirs(os.path.dirname(os.path.abspath(report_path)), exist_ok=True)
+        writer = AtomicCsvFile(report_path)
+        writer.writerow(['Action', 'Path', 'Target', 'Distance', 'Bytes'])
+        writer.writerows(report)
+        writer.commit()
+    return stats
+
+
+def format_clean_stats(stats, apply):
+    """
+    이미지 정리 결과 요약 문자열을 만드는 함수
+    """
+    hash_rate = (stats['images'] - stats['orphans']) / (stats['hash_time'] or 1e-9)
+    prefix = '' if apply else '(dry-run) '
+    return (f"{prefix}이미지 {stats['images']}개: 고아 이미지 {stats['orphans']}개 "
+            f"({stats['orphan_bytes'] / 1024 / 1024:.1f}MB), 중복 그룹 {stats['groups']}개 / 중복 이미지 "
+            f"{stats['duplicates']}개 ({stats['duplicate_bytes'] / 1024 / 1024:.1f}MB), "
+            f"픽셀 확인에서 제외된 후보 쌍 {stats['rejected']}개, 읽을 수 없음 {stats['unreadable']}개, "
+            f"참조 변경 {stats['references_changed']}개, 실패 {stats['failed']}개, "
+            f"해시 계산 {stats['hash_time']:.1f}초 ({hash_rate:.0f} images/sec)")
@@ -0,0 +1,367 @@
+# 이미지 다운로드 파이프라인
+# - 목록 파싱과 이미지 다운로드를 분리해, 크롤러는 작업만 넣고 다음 제품으로 넘어갑니다.
+# - 제한된 크기의 작업 큐(back-pressure)와 워커 스레드, 공유 keep-alive 세션을 사용합니다.
+# - 실패 시 고정 sleep 대신 지수 백오프로 재시도합니다.
+# - ImageRowWriter는 다운로드가 끝난 순서와 관계없이 CSV 행을 원래 순서대로 기록합니다.
+# - 이미 JPEG인 응답은 디코딩/재인코딩 없이 스트리밍으로 바로 저장합니다 (PNG/WebP/GIF 등만 변환).
+
+import itertools
+import os
+import queue
+import threading
+from collections import deque
+from concurrent.futures import Future
+from io import BytesIO
+from time import sleep, monotonic
+
+from PIL import Image
+
+from danawa_http import create_session
+
+# 이미지 다운로드 워커 수 (0이면 크롤링 스레드에서 바로 다운로드)
+IMAGE_WORKERS = 8
+
+# 대기 중인 다운로드 작업 최대 개수 (가득 차면 크롤러가 대기)
+IMAGE_QUEUE_SIZE = 256
+
+# 재시도 횟수와 백오프 기본 대기 시간(초)
+IMAGE_MAX_RETRIES = 3
+IMAGE_BACKOFF = 0.5
+
+# 재시도할 HTTP 상태 코드
+RETRY_STATUS = (429, 500, 502, 503, 504)
+
+# 스트리밍 저장 시 한 번에 읽을 크기(바이트)
+IMAGE_CHUNK_SIZE = 64 * 1024
+
+# 변환 없이 저장해도 되는 Content-Type (비어 있거나 불명확한 경우는 매직 바이트로 판단)
+JPEG_CONTENT_TYPES = ('', 'image/jpeg', 'image/jpg', 'image/pjpeg', 'application/octet-stream')
+
+
+def sniff_image_format(head):
+    """
+    파일 앞부분의 매직 바이트로 이미지 형식을 판별하는 함수 (알 수 없으면 None)
+    """
+    if head.startswith(b'\xff\xd8\xff'):
+        return 'jpeg'
+    if head.startswith(b'\x89PNG\r\n\x1a\n'):
+        return 'png'
+    if head[:4] == b'RIFF' and head[8:12] == b'WEBP':
+        return 'webp'
+    if head[:6] in (b'GIF87a', b'GIF89a'):
+        return 'gif'
+    return None
+
+
+def store_image_stream(chunks, content_type, save_path, hasher=None):
+    """
+    응답 본문 조각(chunks)을 save_path에 JPEG로 저장하고 (변환 여부, 바이트 수)를 반환하는 함수
+    - 매직 바이트와 Content-Type이 모두 JPEG를 가리키면 받은 바이트를 그대로 스트리밍 저장합니다.
+    - 그 외(PNG/WebP/GIF 등)는 PIL로 디코딩해 RGB JPEG로 변환합니다.
+    - 임시 파일에 쓴 뒤 교체하므로 중간에 실패해도 불완전한 파일이 남지 않습니다.
+    - hasher(hashlib 객체)를 넘기면 실제로 저장된 바이트로 갱신합니다.
+    """
+    chunks = iter(chunks)
+    head = b''
+    for chunk in chunks:
+        head += chunk
+        if len(head) >= 12:
+            break
+
+    media_type = (content_type or '').split(';')[0].strip().lower()
+    temp_path = save_path + '.part'
+    try:
+        if sniff_image_format(head) == 'jpeg' and media_type in JPEG_CONTENT_TYPES:
+            size = 0
+            with open(temp_path, 'wb') as f:
+                for chunk in itertools.chain((head,), chunks):
+                    f.write(chunk)
+                    size += len(chunk)
+                    if hasher is not None:
+                        hasher.update(chunk)
+            os.replace(temp_path, save_path)
+            return False, size
+
+        data = head + b''.join(chunks)
+        img = Image.open(BytesIO(data))
+        img = img.convert('RGB')  # PNG 등의 형식을 JPG로 변환
+        if hasher is None:
+            img.save(temp_path, 'JPEG')
+        else:
+            buffer = BytesIO()
+            img.save(buffer, 'JPEG')
+            hasher.update(buffer.getvalue())
+            with open(temp_path, 'wb') as f:
+                f.write(buffer.getvalue())
+        os.replace(temp_path, save_path)
+        return True, len(data)
+
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+
+
+def new_job_stats():
+    """
+    이미지 한 개 처리 통계를 담을 딕셔너리를 만드는 함수
+    """
+    return {'bytes': 0, 'converted': 0, 'cache_hits': 0, 'cache_misses': 0, 'bytes_saved': 0}
+
+
+def reuse_cached_image(cached_path, save_path, hasher=None):
+    """
+    캐시된 로컬 파일을 save_path 위치에서 재사용하는 함수 (경로가 다르면 복사)
+    """
+    if cached_path == save_path and hasher is None:
+        return
+    with open(cached_path, 'rb') as f:
+        data = f.read()
+    if hasher is not None:
+        hasher.update(data)
+    if cached_path != save_path:
+        temp_path = save_path + '.part'
+        with open(temp_path, 'wb') as f:
+            f.write(data)
+        os.replace(temp_path, save_path)
+
+
+def download_image(session, image_url, save_path, max_retries=IMAGE_MAX_RETRIES, backoff=IMAGE_BACKOFF, stats=None,
+                   hasher_factory=None, cache=None):
+    """
+    이미지를 내려받아 JPEG로 저장하고 저장 경로를 반환하는 함수 (실패 시 '')
+    - hasher_factory(예: hashlib.sha256)를 넘기면 저장된 바이트의 해시를 stats['digest']에 기록합니다.
+    - cache(ImageUrlCache)를 넘기면 조건부 요청을 보내고, 304 응답이면 캐시된 파일을 재사용합니다.
+      응답의 ETag / Last-Modified는 stats에 기록되며 캐시 저장은 호출한 쪽에서 cache.remember로 합니다.
+    """
+    stats = stats if stats is not None else new_job_stats()
+    cached = cache.get(image_url) if cache is not None else None
+    headers = cache.conditional_headers(cached) if cached else None
+
+    for attempt in range(max_retries):
+        hasher = hasher_factory() if hasher_factory else None
+        try:
+            if cached and cache.is_fresh(cached):
+                response = None
+            else:
+                response = session.get(image_url, verify=False, timeout=10, stream=True, headers=headers)
+
+            if response is None or (response.status_code == 304 and cached):
+                # 변경되지 않은 이미지: 저장된 파일 재사용
+                if response is not None:
+                    response.close()
+                reuse_cached_image(cached['path'], save_path, hasher)
+                stats['cache_hits'] += 1
+                stats['bytes_saved'] += cached['size']
+                stats['etag'], stats['last_modified'] = cached['etag'], cached['last_modified']
+                if hasher is not None:
+                    stats['digest'] = hasher.hexdigest()
+                return save_path
+
+            with response:
+                if response.status_code in RETRY_STATUS and attempt < max_retries - 1:
+                    raise IOError(f"status code: {response.status_code}")
+                if response.status_code != 200:
+                    print(f"이미지 다운로드 실패 (status code: {response.status_code}): {image_url}")
+                    return ''
+
+                # 이미지 처리 및 저장 (JPEG는 그대로, 그 외 형식만 변환)
+                converted, size = store_image_stream(response.iter_content(IMAGE_CHUNK_SIZE),
+                                                     response.headers.get('Content-Type'), save_path, hasher)
+                stats['etag'] = response.headers.get('ETag')
+                stats['last_modified'] = response.headers.get('Last-Modified')
+
+            stats['bytes'] += size
+            stats['converted'] += int(converted)
+            if cache is not None:
+                stats['cache_misses'] += 1
+            if hasher is not None:
+                stats['digest'] = hasher.hexdigest()
+            return save_path
+
+        except Exception as e:
+            if attempt == max_retries - 1:
+                print(f"이미지 저장 실패 ({os.path.basename(save_path)}): {str(e)}")
+                return ''
+            print(f"이미지 다운로드 재시도 중... ({attempt + 1}/{max_retries})")
+            sleep(backoff * (2 ** attempt))
+
+    return ''
+
+
+class ImageDownloader:
+    """
+    제한된 작업 큐와 워커 스레드로 이미지를 병렬 다운로드하는 클래스
+    - submit()은 Future를 반환하며, 결과는 저장 경로(실패 시 '')입니다.
+    - image_store(ContentImageStore)를 넘기면 store_key=(카테고리, 제품명)으로 해시 저장소에 저장합니다.
+    - image_cache(ImageUrlCache)를 넘기면 이미 있는 파일도 건너뛰지 않고 조건부 요청으로 재검증합니다.
+    """
+    def __init__(self, workers=IMAGE_WORKERS, queue_size=IMAGE_QUEUE_SIZE, max_retries=IMAGE_MAX_RETRIES,
+                 image_store=None, image_cache=None):
+        self.session = create_session(pool_size=workers, max_retries=0)
+        self.max_retries = max_retries
+        self.image_store = image_store
+        self.image_cache = image_cache
+        self.jobs = queue.Queue(maxsize=queue_size)
+        self.lock = threading.Lock()
+        self.stats = {'downloaded': 0, 'cached': 0, 'skipped': 0, 'failed': 0, 'converted': 0, 'bytes': 0,
+                      'cache_hits': 0, 'cache_misses': 0, 'bytes_saved': 0}
+        self.inflight = {}  # 저장 경로 -> Future (같은 파일을 동시에 두 번 받지 않도록)
+        self.start_time = monotonic()
+        self.threads = [threading.Thread(target=self._worker, daemon=True) for _ in range(workers)]
+        for thread in self.threads:
+            thread.start()
+
+    def submit(self, image_url, save_path=None, store_key=None):
+        """
+        다운로드 작업을 큐에 넣는 메서드 (큐가 가득 차면 빈자리가 생길 때까지 대기)
+        """
+        job_key = store_key or save_path
+        with self.lock:
+            if job_key in self.inflight:
+                return self.inflight[job_key]
+            future = Future()
+            existing_path = ''
+            if self.image_cache is None:
+                existing_path = self.image_store.lookup(*store_key) if store_key else \
+                    (save_path if os.path.exists(save_path) else '')
+            if existing_path:
+                self.stats['skipped'] += 1
+                future.set_result(existing_path)
+                return future
+            self.inflight[job_key] = future
+        self.jobs.put((image_url, save_path, store_key, future))
+        return future
+
+    def _worker(self):
+        while True:
+            job = self.jobs.get()
+            if job is None:
+                self.jobs.task_done()
+                return
+            image_url, save_path, store_key, future = job
+            try:
+                job_stats = new_job_stats()
+                if store_key:
+                    result = self.image_store.download(self.session, image_url, *store_key,
+                                                      max_retries=self.max_retries, stats=job_stats,
+                                                      cache=self.image_cache)
+                else:
+                    result = download_image(self.session, image_url, save_path, self.max_retries, stats=job_stats,
+                                            cache=self.image_cache)
+                if self.image_cache is not None:
+                    self.image_cache.remember(image_url, job_stats, result)
+                with self.lock:
+                    # 캐시 적중(304 / 재검증 생략)은 다운로드 처리량에서 빼고 따로 셈
+                    if not result:
+                        self.stats['failed'] += 1
+                    else:
+                        self.stats['cached' if job_stats['cache_hits'] else 'downloaded'] += 1
+                    for key in ('bytes', 'converted', 'cache_hits', 'cache_misses', 'bytes_saved'):
+                        self.stats[key] += job_stats[key]
+                future.set_result(result)
+            except Exception as e:
+                future.set_exception(e)
+            finally:
+                with self.lock:
+                    self.inflight.pop(store_key or save_path, None)
+                self.jobs.task_done()
+
+    def close(self):
+        """
+        남은 작업을 모두 처리한 뒤 워커를 종료하고 통계를 반환하는 메서드
+        """
+        for _ in self.threads:
+            self.jobs.put(None)
+        for thread in self.threads:
+            thread.join()
+        self.session.close()
+        if self.image_cache is not None:
+            self.image_cache.flush()
+        stats = dict(self.stats)
+        stats['elapsed'] = monotonic() - self.start_time
+        return stats
+
+
+def merge_image_stats(stats_list):
+    """
+    여러 다운로드 통계를 합산하는 함수
+    """
+    total = {'downloaded': 0, 'cached': 0, 'skipped': 0, 'failed': 0, 'converted': 0, 'bytes': 0,
+             'cache_hits': 0, 'cache_misses': 0, 'bytes_saved': 0}
+    for stats in stats_list:
+        if stats:
+            for key in total:
+                total[key] += stats.get(key, 0)
+    return total
+
+
+def format_image_stats(stats, elapsed):
+    """
+    이미지 처리량(images/sec, MB/sec) 요약 문자열을 만드는 함수 (캐시에서 재사용한 이미지는 처리량에서 제외)
+    """
+    elapsed = elapsed or 1e-9
+    megabytes = stats['bytes'] / 1024 / 1024
+    return (f"이미지 다운로드 {stats['downloaded']}개 (변환 {stats['converted']}개), "
+            f"캐시 재사용 {stats.get('cached', 0)}개, 기존 파일 {stats['skipped']}개, 실패 {stats['failed']}개, "
+            f"{megabytes:.1f}MB, {stats['downloaded'] / elapsed:.2f} images/sec, {megabytes / elapsed:.2f} MB/sec")
+
+
+class ImageRowWriter:
+    """
+    이미지 다운로드 결과를 기다렸다가 CSV 행을 원래 순서대로 기록하는 writer
+    - writerow(row, future): future가 끝나면 row[2]를 최종 저장 경로로 바꿔 기록합니다.
+    - 대기 중인 행이 max_pending개를 넘으면 가장 앞의 행이 끝날 때까지 기다립니다.
+    - when_written(callback): 지금까지 넣은 행이 모두 기록되면 callback을 호출합니다 (페이지 체크포인트용).
+    - close(): 남은 다운로드를 기다려 행과 체크포인트를 모두 기록합니다 (with 문으로 쓰면 어떤 경로로 나가도 호출됨).
+    """
+    def __init__(self, csvWriter, max_pending=IMAGE_QUEUE_SIZE):
+        self.csvWriter = csvWriter
+        self.max_pending = max_pending
+        self.pending = deque()
+
+    def writerow(self, row, future=None):
+        if future is None and not self.pending:
+            self.csvWriter.writerow(row)
+            return
+        self.pending.append((row, future))
+        self._flush(block=len(self.pending) > self.max_pending)
+
+    def when_written(self, callback):
+        if not self.pending:
+            callback()
+            return
+        self.pending.append((None, callback))
+
+    def _flush(self, block=False):
+        while self.pending:
+            row, future = self.pending[0]
+            if row is None:
+                # 체크포인트 표시: 앞선 행이 모두 기록됨
+                self.pending.popleft()
+                future()
+                continue
+            if future is not None:
+                if not block and not future.done():
+                    return
+                try:
+                    row[2] = future.result()
+                except Exception as e:
+                    # 다운로드 워커 오류는 이미지 없음('')으로 기록해 뒤의 행과 체크포인트가 막히지 않게 함
+                    print(f"이미지 다운로드 중 오류 발생 ({row[0]}): {str(e)}")
+                    row[2] = ''
+                block = False
+            self.pending.popleft()
+            self.csvWriter.writerow(row)
+
+    def close(self):
+        """
+        남은 행을 모두 기록하는 메서드 (여러 번 호출해도 됨)
+        """
+        while self.pending:
+            self._flush(block=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
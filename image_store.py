@@ -0,0 +1,170 @@
+# 콘텐츠 주소 기반(content-addressed) 이미지 저장소
+# - 이미지 파일을 저장된 바이트의 SHA-256 해시로 이름 지어 store/ab/cd/<해시>.jpg 형태로 나눠 저장합니다.
+# - 같은 썸네일을 쓰는 제품(용량/구성만 다른 변형 등)은 파일 하나만 저장됩니다.
+# - 카테고리별 인덱스(index/<카테고리>.csv, Name,Hash)가 제품명 → 해시를 기록하므로
+#   제품명 정제에 따른 "이미지 이름 변경"은 파일 시스템 작업이 아니라 인덱스 갱신입니다.
+
+import csv
+import hashlib
+import os
+import re
+import threading
+import uuid
+
+from image_pipeline import download_image, new_job_stats, IMAGE_MAX_RETRIES
+
+# 저장소 하위 디렉토리 이름
+STORE_DIR_NAME = 'store'
+INDEX_DIR_NAME = 'index'
+TEMP_DIR_NAME = 'tmp'
+
+# 해시 파일명 형식 (SHA-256 16진수 64자)
+HASH_PATTERN = re.compile(r'^[0-9a-f]{64}$')
+
+
+def index_key(product_name):
+    """
+    인덱스에서 사용하는 제품명 키 (이미지 파일명과 같은 규칙으로 '/'만 치환)
+    """
+    return product_name.replace('/', '_')
+
+
+class ContentImageStore:
+    """
+    SHA-256 해시로 이미지를 한 번만 저장하고, 카테고리별 인덱스로 제품명과 연결하는 저장소
+    """
+    def __init__(self, root):
+        self.root = root
+        self.store_dir = os.path.join(root, STORE_DIR_NAME)
+        self.index_dir = os.path.join(root, INDEX_DIR_NAME)
+        self.temp_dir = os.path.join(self.store_dir, TEMP_DIR_NAME)
+        os.makedirs(self.temp_dir, exist_ok=True)
+        os.makedirs(self.index_dir, exist_ok=True)
+        self.indexes = {}  # 카테고리 -> {제품명: 해시}
+        self.dirty = set()  # 저장이 필요한 카테고리
+        self.lock = threading.RLock()
+
+    def __getstate__(self):
+        # 멀티프로세싱으로 전달될 때는 경로만 넘기고, 인덱스는 각 프로세스에서 다시 읽음
+        return {'root': self.root}
+
+    def __setstate__(self, state):
+        self.__init__(state['root'])
+
+    def blob_path(self, digest):
+        """
+        해시에 해당하는 파일 경로 (앞 2자/다음 2자로 두 단계 샤딩)
+        """
+        return os.path.join(self.store_dir, digest[:2], digest[2:4], f'{digest}.jpg')
+
+    def is_blob_path(self, path):
+        """
+        경로가 이 저장소의 해시 파일인지 문자열만으로 판단하는 메서드 (파일 시스템 접근 없음)
+        """
+        if not path:
+            return False
+        stem, ext = os.path.splitext(os.path.basename(path))
+        return ext == '.jpg' and HASH_PATTERN.match(stem) is not None \
+            and os.path.normpath(path).startswith(os.path.normpath(self.store_dir))
+
+    def index_path(self, category):
+        safe_category = re.sub(r'[\\/*?:"<>|]', '_', category)
+        return os.path.join(self.index_dir, f'{safe_category}.csv')
+
+    def load_index(self, category):
+        """
+        카테고리 인덱스를 (처음 한 번) 읽어 {제품명: 해시} 딕셔너리로 반환하는 메서드
+        """
+        with self.lock:
+            if category not in self.indexes:
+                index = {}
+                index_path = self.index_path(category)
+                if os.path.exists(index_path):
+                    with open(index_path, 'r', newline='', encoding='utf-8-sig') as f:
+                        reader = csv.reader(f)
+                        next(reader, None)
+                        for row in reader:
+                            if len(row) >= 2 and HASH_PATTERN.match(row[1]):
+                                index[row[0]] = row[1]
+                self.indexes[category] = index
+            return self.indexes[category]
+
+    def lookup(self, category, product_name):
+        """
+        제품의 이미지 경로를 반환하는 메서드 (인덱스에 없거나 파일이 없으면 '')
+        """
+        digest = self.load_index(category).get(index_key(product_name))
+        if digest:
+            path = self.blob_path(digest)
+            if os.path.exists(path):
+                return path
+        return ''
+
+    def link(self, category, product_name, digest):
+        """
+        제품명을 해시에 연결하는 메서드
+        """
+        with self.lock:
+            self.load_index(category)[index_key(product_name)] = digest
+            self.dirty.add(category)
+
+    def rename(self, category, old_name, new_name):
+        """
+        제품명 변경을 인덱스에만 반영하고 새 이름의 이미지 경로를 반환하는 메서드
+        - 새 이름이 이미 있으면 기존 연결을 유지합니다 (파일 이름 변경 방식과 같은 동작).
+        """
+        with self.lock:
+            index = self.load_index(category)
+            old_key, new_key = index_key(old_name), index_key(new_name)
+            digest = index.get(new_key)
+            if old_key != new_key and old_key in index:
+                if digest is None:
+                    digest = index[old_key]
+                    index[new_key] = digest
+                del index[old_key]
+                self.dirty.add(category)
+            return self.blob_path(digest) if digest else ''
+
+    def commit(self, temp_path, digest, category, product_name):
+        """
+        임시 파일을 해시 경로로 옮기고(이미 있으면 버림) 제품명을 연결하는 메서드
+        """
+        target = self.blob_path(digest)
+        if os.path.exists(target):
+            os.remove(temp_path)
+        else:
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            os.replace(temp_path, target)
+        self.link(category, product_name, digest)
+        return target
+
+    def download(self, session, image_url, category, product_name, max_retries=IMAGE_MAX_RETRIES, stats=None,
+                 cache=None):
+        """
+        이미지를 내려받아 저장소에 넣고 해시 경로를 반환하는 메서드 (실패 시 '')
+        - stats에는 download_image의 처리 통계(전송량, 캐시 적중, ETag 등)가 그대로 기록됩니다.
+        """
+        stats = stats if stats is not None else new_job_stats()
+        temp_path = os.path.join(self.temp_dir, f'{uuid.uuid4().hex}.jpg')
+        if not download_image(session, image_url, temp_path, max_retries, stats=stats,
+                              hasher_factory=hashlib.sha256, cache=cache):
+            return ''
+        return self.commit(temp_path, stats['digest'], category, product_name)
+
+    def save_index(self, category=None):
+        """
+        변경된 인덱스를 임시 파일에 쓴 뒤 교체해 저장하는 메서드 (category가 None이면 전체)
+        """
+        with self.lock:
+            categories = [category] if category is not None else list(self.dirty)
+            for name in categories:
+                if name not in self.dirty:
+                    continue
+                index_path = self.index_path(name)
+                temp_path = index_path + '.tmp'
+                with open(temp_path, 'w', newline='', encoding='utf-8-sig') as f:
+                    writer = csv.writer(f)
+                    writer.writerow(['Name', 'Hash'])
+                    writer.writerows(sorted(self.indexes[name].items()))
+                os.replace(temp_path, index_path)
+                self.dirty.discard(name)
@@ -0,0 +1,61 @@
+# 제품명 정제 (단위 / 수량 / 괄호 제거)
+# - Crawler.clean_product_name과 같은 결과를 내도록 같은 정규식을 미리 컴파일해 사용합니다.
+#   (단위 패턴 → 괄호 패턴 → strip을 더 이상 바뀌지 않을 때까지 반복)
+# - 숫자가 없으면 단위 패턴을, '('가 없으면 괄호 패턴을 건너뛰어 대부분의 제품명은 한 번에 끝납니다.
+# - 같은 제품명이 여러 번 나오므로 normalize_product_name의 결과를 LRU 캐시에 보관합니다.
+# - test/fixtures/names/golden_names.csv: 기존 함수의 결과와 같은지 확인하는 골든 데이터
+#   (test/bench_name_normalizer.py로 확인 / 성능 측정)
+
+import re
+from functools import lru_cache
+
+# 끝 부분의 숫자와 단위를 제거하는 패턴 (T, P 등의 단위 추가)
+UNIT_PATTERN = re.compile(
+    r'\s*\d+(?:\.\d+)?\s*(?:ml|정|포|l|g|kg|mg|개|can|캔|팩|페트|병|입|박스|캡슐|스틱|매|베지캡슐|분|da|달톤|mgα-te|mgne|㎍re|㎍|μg|T|P|세트)'
+    r'(?:\s*x\s*\d+(?:개|팩|병|캔|박스|정|포|매|스틱)?)?\s*', re.IGNORECASE)
+
+# 괄호 안 내용을 제거하는 패턴
+BRACKET_PATTERN = re.compile(r'\s*\([^)]*\)\s*')
+
+# 단위 패턴이 일치하려면 숫자가 있어야 함
+DIGIT_PATTERN = re.compile(r'\d')
+
+# 파일명에 사용할 수 없는 문자
+UNSAFE_FILENAME_PATTERN = re.compile(r'[\\/*?:"<>|]')
+
+# 정제 결과를 보관할 제품명 수
+NAME_CACHE_SIZE = 65536
+
+
+def clean_product_name(name):
+    """
+    제품 이름에서 단위와 괄호 내용을 제거하는 함수 (Crawler.clean_product_name과 같은 결과)
+    """
+    cleaned = name
+    while True:
+        result = cleaned
+        if DIGIT_PATTERN.search(result):
+            result = UNIT_PATTERN.sub('', result)
+        if '(' in result:
+            result = BRACKET_PATTERN.sub('', result)
+        result = result.strip()
+        if result == cleaned:  # 더 이상 변화가 없으면 종료
+            return result
+        cleaned = result
+
+
+def safe_file_name(name):
+    """
+    파일명에 사용할 수 없는 문자를 '_'로 바꾸는 함수
+    """
+    return UNSAFE_FILENAME_PATTERN.sub('_', name)
+
+
+@lru_cache(maxsize=NAME_CACHE_SIZE)
+def normalize_product_name(name):
+    """
+    정제 / 중복 제거에 쓰는 (정제된 제품명, 이미지 파일명, 중복 판단 키)를 반환하는 함수
+    """
+    cleaned_name = clean_product_name(name)
+    safe_name = safe_file_name(cleaned_name).replace('  ', ' ').strip()
+    return cleaned_name, safe_name, cleaned_name.split(',')[0]
@@ -0,0 +1,193 @@
+# 유사 제품명 클러스터링 (문자 n-gram MinHash + LSH 밴딩)
+# - 제품명을 정규화(소문자, 공백 / 특수문자 제거)한 뒤 문자 n-gram 집합의 MinHash 서명을 NumPy로 한 번에 계산합니다.
+#   (n-gram 해시는 전체 문자열을 이어 붙인 코드포인트 배열에서 계산하므로 제품명마다 파이썬 루프를 돌지 않음)
+# - 서명을 밴드로 나눠 같은 밴드 값을 가진 제품명만 후보로 비교하므로 제품 수에 거의 비례하는 시간에 끝납니다.
+# - 후보 쌍은 서명 일치 비율(추정 자카드 유사도)이 threshold 이상이고, 제품명에 들어 있는 숫자가 같을 때만
+#   같은 클러스터로 묶습니다 ('선물세트 1호' / '선물세트 2호'처럼 숫자만 다른 제품은 다른 제품으로 봄).
+# - 결과: 행마다 클러스터 ID (처음 나온 순서대로 0, 1, 2, ...)와 클러스터별 대표 행 (스펙이 가장 긴 행)
+# - Crawler(new_copy.py)는 --dedup minhash일 때만 사용합니다. 이때 정제 파일에 ClusterID 열이 추가되고
+#   남는 행이 key 방식과 달라집니다. test/bench_near_duplicates.py의 변형 제품명 재현율이 낮아 기본값은 key입니다.
+
+import re
+
+import numpy as np
+
+# 유사도 기준 (추정 자카드 유사도가 이 값 이상이면 같은 제품으로 봄)
+NEAR_DUPLICATE_THRESHOLD = 0.8
+
+# 문자 n-gram 길이 (한글은 음절 하나가 한 글자라 2-gram이 띄어쓰기 / 접두어 차이에 덜 민감) / MinHash 해시 함수 수
+NGRAM_SIZE = 2
+NUM_PERM = 64
+
+# 정규화에서 제거할 문자 (공백, 괄호, 구두점)
+NORMALIZE_PATTERN = re.compile(r'[\s\[\]{}()<>.,·/\\|_\-+*~!?:;\'"`]+')
+
+# 제품명의 숫자 (숫자가 다른 제품명은 묶지 않음)
+NUMBER_PATTERN = re.compile(r'\d+(?:\.\d+)?')
+
+
+def normalize_for_shingles(name):
+    return NORMALIZE_PATTERN.sub('', str(name).lower())
+
+
+def lsh_params(threshold, num_perm=NUM_PERM):
+    """
+    threshold 근처에서 거짓 양성 / 거짓 음성 확률의 합이 가장 작은 (밴드 수, 밴드당 행 수)를 고르는 함수
+    """
+    s = np.linspace(0.0, 1.0, 201)
+    best = None
+    for rows in range(1, num_perm + 1):
+        bands = num_perm // rows
+        probability = 1.0 - (1.0 - s ** rows) ** bands  # 유사도 s인 쌍이 후보가 될 확률
+        error = probability[s < threshold].sum() + (1.0 - probability[s >= threshold]).sum()
+        if best is None or error < best[0]:
+            best = (error, bands, rows)
+    return best[1], best[2]
+
+
+def shingle_hashes(names, ngram=NGRAM_SIZE):
+    """
+    모든 제품명의 n-gram 해시(uint64)와 제품명별 시작 위치를 반환하는 함수
+    - ngram보다 짧은 제품명은 뒤를 채워 n-gram 하나로 만듭니다.
+    """
+    texts = [normalize_for_shingles(name) for name in names]
+    texts = [text if len(text) >= ngram else text + '\0' * (ngram - len(text)) for text in texts]
+    lengths = np.fromiter((len(text) for text in texts), dtype=np.int64, count=len(texts))
+    codes = np.frombuffer(''.join(texts).encode('utf-32-le'), dtype=np.uint32).astype(np.uint64)
+
+    # 위치 i의 n-gram 해시: 코드포인트의 다항식 해시 (2^64에서 자연스럽게 순환)
+    base = np.uint64(0x100000001B3)
+    total = len(codes) - ngram + 1
+    hashes = np.zeros(max(total, 0), dtype=np.uint64)
+    with np.errstate(over='ignore'):
+        for offset in range(ngram):
+            hashes = hashes * base + codes[offset:offset + total]
+
+    # 제품명 경계를 넘는 n-gram 제외 (각 제품명의 마지막 ngram - 1개 위치)
+    ends = np.cumsum(lengths)
+    gram_counts = lengths - ngram + 1
+    keep = np.ones(len(hashes), dtype=bool)
+    for offset in range(1, ngram):
+        boundary = ends - offset
+        keep[boundary[boundary < len(hashes)]] = False
+    hashes = hashes[keep]
+    gram_starts = np.concatenate(([0], np.cumsum(gram_counts)[:-1])) if len(names) else np.zeros(0, np.int64)
+    return hashes, gram_starts
+
+
+def minhash_signatures(names, ngram=NGRAM_SIZE, num_perm=NUM_PERM, seed=1):
+    """
+    제품명별 MinHash 서명 (N x num_perm, uint32)을 계산하는 함수
+    - 해시 함수: (a * x + b) mod 2^64의 상위 32비트 (a는 홀수 난수)
+    """
+    hashes, gram_starts = shingle_hashes(names, ngram)
+    rng = np.random.default_rng(seed)
+    a = rng.integers(1, 1 << 63, size=num_perm, dtype=np.uint64) | np.uint64(1)
+    b = rng.integers(0, 1 << 63, size=num_perm, dtype=np.uint64)
+    signatures = np.empty((len(names), num_perm), dtype=np.uint32)
+    if not len(names):
+        return signatures
+    shift = np.uint64(32)
+    permuted = np.empty_like(hashes)
+    with np.errstate(over='ignore'):
+        for k in range(num_perm):
+            np.multiply(hashes, a[k], out=permuted)
+            np.add(permuted, b[k], out=permuted)
+            np.right_shift(permuted, shift, out=permuted)
+            signatures[:, k] = np.minimum.reduceat(permuted, gram_starts)
+    return signatures
+
+
+def candidate_pairs(signatures, bands, rows, seed=2):
+    """
+    같은 밴드 값을 가진 제품명 쌍을 (대표, 구성원) 배열로 반환하는 함수 (버킷마다 첫 제품과 나머지를 짝지음)
+    """
+    rng = np.random.default_rng(seed)
+    pairs = []
+    for band in range(bands):
+        columns = signatures[:, band * rows:(band + 1) * rows].astype(np.uint64)
+        multipliers = rng.integers(1, 1 << 63, size=rows, dtype=np.uint64) | np.uint64(1)
+        with np.errstate(over='ignore'):
+            keys = (columns * multipliers).sum(axis=1, dtype=np.uint64)
+        order = np.argsort(keys, kind='stable')
+        sorted_keys = keys[order]
+        same = sorted_keys[1:] == sorted_keys[:-1]
+        if not same.any():
+            continue
+        # 버킷(같은 키가 연속된 구간)의 첫 위치
+        run_start = np.concatenate(([True], ~same))
+        anchor_position = np.maximum.accumulate(np.where(run_start, np.arange(len(order)), 0))
+        members = np.nonzero(~run_start)[0]
+        pairs.append(np.stack([order[anchor_position[members]], order[members]], axis=1))
+    if not pairs:
+        return np.zeros((0, 2), dtype=np.int64)
+    pairs = np.sort(np.concatenate(pairs), axis=1)
+    # 여러 밴드에서 나온 같은 쌍 제거
+    codes = np.unique(pairs[:, 0] * len(signatures) + pairs[:, 1])
+    return np.stack([codes // len(signatures), codes % len(signatures)], axis=1)
+
+
+def connected_labels(count, pairs):
+    """
+    간선 목록으로 연결 요소를 찾아 노드별 대표(가장 작은 번호)를 반환하는 함수 (NumPy 포인터 점프)
+    """
+    labels = np.arange(count)
+    if not len(pairs):
+        return labels
+    left, right = pairs[:, 0], pairs[:, 1]
+    while True:
+        low = np.minimum(labels[left], labels[right])
+        updated = labels.copy()
+        np.minimum.at(updated, labels[left], low)
+        np.minimum.at(updated, labels[right], low)
+        while True:
+            jumped = updated[updated]
+            if np.array_equal(jumped, updated):
+                break
+            updated = jumped
+        if np.array_equal(updated, labels):
+            return labels
+        labels = updated
+
+
+def number_keys(names):
+    """
+    제품명마다 들어 있는 숫자 목록의 해시 (같은 실행 안에서만 비교)
+    """
+    return np.fromiter((hash(tuple(NUMBER_PATTERN.findall(str(name)))) for name in names),
+                       dtype=np.int64, count=len(names))
+
+
+def cluster_names(names, threshold=NEAR_DUPLICATE_THRESHOLD, ngram=NGRAM_SIZE, num_perm=NUM_PERM, match_numbers=True):
+    """
+    제품명 목록을 유사 제품 클러스터로 묶어 행별 클러스터 ID 배열을 반환하는 함수
+    - 클러스터 ID는 클러스터의 첫 행이 나온 순서대로 0부터 매깁니다.
+    - match_numbers가 True이면 숫자가 다른 제품명은 유사도와 관계없이 묶지 않습니다.
+    """
+    signatures = minhash_signatures(names, ngram, num_perm)
+    bands, rows = lsh_params(threshold, num_perm)
+    pairs = candidate_pairs(signatures, bands, rows)
+    if len(pairs):
+        similarity = (signatures[pairs[:, 0]] == signatures[pairs[:, 1]]).mean(axis=1)
+        pairs = pairs[similarity >= threshold]
+    if len(pairs) and match_numbers:
+        keys = number_keys(names)
+        pairs = pairs[keys[pairs[:, 0]] == keys[pairs[:, 1]]]
+    labels = connected_labels(len(names), pairs)
+    # 대표 번호(클러스터에서 가장 앞 행)를 등장 순서의 연속 번호로 변환
+    _, cluster_ids = np.unique(labels, return_inverse=True)
+    return cluster_ids.reshape(-1)
+
+
+def canonical_rows(cluster_ids, scores):
+    """
+    클러스터별 대표 행 번호를 클러스터 ID 순서로 반환하는 함수 (score가 가장 큰 행, 같으면 앞 행)
+    """
+    cluster_ids = np.asarray(cluster_ids)
+    scores = np.asarray(scores)
+    # 클러스터 ID 오름차순, 점수 내림차순, 행 번호 오름차순으로 정렬해 클러스터마다 첫 행 선택
+    order = np.lexsort((np.arange(len(cluster_ids)), -scores, cluster_ids))
+    sorted_ids = cluster_ids[order]
+    first = np.ones(len(order), dtype=bool)
+    first[1:] = sorted_ids[1:] != sorted_ids[:-1]
+    return order[first]
@@ -1,10 +1,6 @@
 # Selenium 관련 라이브러리 임포트
 from selenium import webdriver
 from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.chrome.service import Service
-from selenium.common.exceptions import TimeoutException
 
 # 날짜 및 시간 관련 라이브러리 임포트
 from datetime import datetime
@@ -36,15 +32,51 @@ import os.path
 import shutil
 import traceback
 from math import ceil
-from time import sleep
+from time import monotonic
 
 from multiprocessing import Pool
-import requests
-from PIL import Image
-from io import BytesIO
 import re
 from collections import defaultdict
-import psutil
+import argparse
+
+# HTTP 목록 수집 엔진 (Selenium 대체)
+from danawa_http import DanawaListFetcher
+
+# Selenium 목록 페이지 제품 추출 (페이지당 execute_script 한 번)
+from danawa_dom import extract_products
+from crawl_scheduler import CrawlScheduler, GLOBAL_CONCURRENCY, PER_HOST_CONCURRENCY, PER_HOST_RATE
+
+# 브라우저 세션 풀 (프로세스마다 Chrome 세션 하나를 여러 카테고리에서 재사용)
+from browser_pool import acquire_browser_session, format_browser_stats, BROWSER_MAX_PAGES, BROWSER_MAX_RSS_MB
+from page_readiness import PageReadiness
+
+# 이미지 다운로드 파이프라인 (목록 파싱과 분리된 병렬 다운로드)
+from image_pipeline import (ImageDownloader, ImageRowWriter, IMAGE_WORKERS, download_image, new_job_stats,
+                            merge_image_stats, format_image_stats)
+from danawa_http import create_session
+from image_store import ContentImageStore
+from image_cache import ImageUrlCache, format_cache_stats, IMAGE_CACHE_MAX_AGE
+
+# 증분 크롤링 (신상품순으로 정렬해 이미 아는 제품이 나오면 중단)
+from crawl_state import IncrementalState, INCREMENTAL_STOP_PAGES, INCREMENTAL_SORT_METHOD
+
+# 페이지 단위 체크포인트 (중단된 카테고리를 --resume으로 이어서 크롤링)
+from crawl_checkpoint import CheckpointedCsv, load_checkpoint, CSV_HEADER
+
+# 정제 CSV 원자적 게시 + 매니페스트 (행 수, SHA-256, 크롤링 시각)
+from crawl_output import AtomicCsvFile, load_manifest
+
+# 제품명 정제 (미리 컴파일한 정규식 + LRU 캐시)
+from name_normalizer import clean_product_name, normalize_product_name
+
+# 유사 제품명 클러스터링 (문자 n-gram MinHash + LSH)
+from near_duplicates import cluster_names, canonical_rows, NEAR_DUPLICATE_THRESHOLD
+
+# 정제 단계 보조 (디렉토리별 이미지 이름 변경 일괄 실행, 카테고리별 소요 시간 요약)
+from data_sort import ImageRenameBatch, format_sort_stats
+
+# 제품 데이터 저장 형식 (csv / parquet: 열 단위 저장, 임베딩은 float32 고정 길이 리스트 열)
+from data_store import FORMAT_CSV, FORMAT_PARQUET, DATA_FORMATS, data_path, convert_csv, write_product_rows
 
 # SSL 경고 메시지 비활성화 (선택사항)
 import urllib3
@@ -57,6 +89,43 @@ urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 # 멀티프로세싱에서 사용할 프로세스 수 설정
 PROCESS_COUNT = 12
 
+# 목록 수집 엔진 설정 (selenium: Chrome 브라우저, http: AJAX 목록 직접 요청)
+ENGINE_SELENIUM = 'selenium'
+ENGINE_HTTP = 'http'
+FETCH_ENGINE = ENGINE_SELENIUM
+
+# 크롤링 스케줄러 설정 (pool: 카테고리당 프로세스 1개, async: (카테고리, 페이지) 작업 큐)
+SCHEDULER_POOL = 'pool'
+SCHEDULER_ASYNC = 'async'
+CRAWL_SCHEDULER = SCHEDULER_POOL
+
+# 이미지 저장 방식 (named: 제품명.jpg, content: SHA-256 해시 기반 저장소 + 제품명 인덱스)
+IMAGE_STORE_NAMED = 'named'
+IMAGE_STORE_CONTENT = 'content'
+IMAGE_STORE = IMAGE_STORE_NAMED
+
+# 이미지 URL 캐시 (ETag / Last-Modified 조건부 요청으로 바뀌지 않은 이미지는 다시 받지 않음)
+USE_IMAGE_CACHE = False
+IMAGE_CACHE_FILE = 'url_cache.sqlite3'  # 이미지 디렉토리 아래에 생성
+
+# 증분 크롤링 설정 (False이면 매번 전체 페이지 크롤링)
+INCREMENTAL_CRAWL = False
+
+# 중복 제거 방식 (key: 쉼표 앞 제품명이 같으면 중복, minhash: 유사 제품명 클러스터)
+# minhash는 남기는 행이 달라지고 정제 파일에 ClusterID 열이 추가되므로(Name, Spec, ImageURL, ClusterID)
+# 정제 파일을 읽는 적재 스크립트를 확인한 뒤 --dedup minhash로 사용 (기본값은 기존과 같은 key)
+DEDUP_KEY = 'key'
+DEDUP_MINHASH = 'minhash'
+DEDUP_METHOD = DEDUP_KEY
+
+# 카테고리 간 중복 제거 (카테고리별 정제가 끝난 뒤 같은 제품이 여러 카테고리에 있으면 한 곳에만 남김)
+# 다른 카테고리의 정제 파일에서 행을 지우므로 기본값은 False (--cross-dedup으로 사용)
+# 지운 행은 카테고리별로 출력하고 state/cross_category_duplicates.csv에 기록
+CROSS_CATEGORY_DEDUP = False
+
+# 제품 데이터 저장 형식 (parquet이면 크롤링 CSV 옆에 .parquet 파일을 만들고 정제 데이터는 Parquet으로 저장)
+OUTPUT_FORMAT = FORMAT_CSV
+
 # GitHub 관련 설정 (현재 주석 처리됨)
 # GITHUB_TOKEN_KEY = 'MY_GITHUB_TOKEN'
 # GITHUB_REPOSITORY_NAME = 'SSSSSSSSSSSSSSSSSSSSSSSSSSSSSSSSSSSSSun/Danawa-Crawler'
@@ -71,6 +140,7 @@ CRAWLING_DATA_CSV_FILE = 'categories.csv'
 # 크롤링된 데이터를 저장할 디렉토리 설정
 DATA_PATH = r'C:\dev\ZeroMoa\ZeroMoa\crawl_data'  # 절대 경로로 수정
 DATA_REFRESH_PATH = f'{DATA_PATH}/Last_Data'
+DATA_STATE_PATH = f'{DATA_PATH}/state'  # 증분 크롤링 상태 / 체크포인트 파일 디렉토리
 
 # 시간대 설정
 TIMEZONE = 'Asia/Seoul'
@@ -93,12 +163,59 @@ STR_URL = 'url'
 STR_CRAWLING_PAGE_SIZE = 'crawlingPageSize'
 
 class Crawler:
-    def __init__(self):
+    def __init__(self, engine=FETCH_ENGINE, scheduler=CRAWL_SCHEDULER, image_workers=IMAGE_WORKERS, image_store=IMAGE_STORE,
+                 image_cache=USE_IMAGE_CACHE, image_cache_max_age=IMAGE_CACHE_MAX_AGE,
+                 incremental=INCREMENTAL_CRAWL, stop_pages=INCREMENTAL_STOP_PAGES, resume=False,
+                 browser_max_pages=BROWSER_MAX_PAGES, browser_max_rss_mb=BROWSER_MAX_RSS_MB,
+                 output_format=OUTPUT_FORMAT, dedup=DEDUP_METHOD, dedup_threshold=NEAR_DUPLICATE_THRESHOLD,
+                 cross_dedup=CROSS_CATEGORY_DEDUP):
         """
         초기화 메서드.
         - 오류 목록과 크롤링할 카테고리 목록을 초기화합니다.
         - categories.csv 파일을 읽어 카테고리 이름과 URL을 로드합니다.
+        - engine으로 목록 수집 방식(selenium / http)을, scheduler로 작업 분배 방식(pool / async)을 선택합니다.
+        - image_workers가 0보다 크면 이미지를 별도 워커 스레드에서 내려받습니다.
+        - image_store가 content이면 이미지를 해시 기반 저장소에 한 번만 저장합니다.
+        - image_cache가 True이면 이미지 URL 캐시로 조건부 요청을 보내 바뀐 이미지만 다시 받습니다.
+        - incremental이 True이면 신상품순으로 크롤링하다가 이미 아는 제품만 있는 페이지가
+          stop_pages번 연속되면 멈추고, 지난 CSV의 나머지 행을 이어 붙입니다.
+        - resume이 True이면 지난 실행의 체크포인트에서 이어서 크롤링합니다 (완료된 카테고리는 건너뜀).
+        - Selenium 엔진은 프로세스마다 브라우저 세션을 재사용하고, browser_max_pages 페이지 이상 사용했거나
+          메모리가 browser_max_rss_mb(MB)를 넘으면 카테고리 사이에서 새 세션으로 교체합니다.
+        - output_format이 parquet이면 완료된 카테고리 CSV를 Parquet으로도 저장하고, 정제 데이터는 Parquet으로 저장합니다.
+        - dedup이 minhash이면 정제 단계에서 유사도가 dedup_threshold 이상인 제품명을 한 제품으로 묶습니다.
+          (정제 파일에 ClusterID 열이 추가되고 남는 행이 key 방식과 달라짐)
+        - cross_dedup이 True이면 정제 단계 마지막에 여러 카테고리에 있는 같은 제품을 한 카테고리에만 남깁니다.
         """
+        if engine not in (ENGINE_SELENIUM, ENGINE_HTTP):
+            raise ValueError(f"지원하지 않는 수집 엔진: {engine}")
+        if scheduler not in (SCHEDULER_POOL, SCHEDULER_ASYNC):
+            raise ValueError(f"지원하지 않는 스케줄러: {scheduler}")
+        if image_store not in (IMAGE_STORE_NAMED, IMAGE_STORE_CONTENT):
+            raise ValueError(f"지원하지 않는 이미지 저장 방식: {image_store}")
+        if output_format not in DATA_FORMATS:
+            raise ValueError(f"지원하지 않는 저장 형식: {output_format}")
+        if dedup not in (DEDUP_KEY, DEDUP_MINHASH):
+            raise ValueError(f"지원하지 않는 중복 제거 방식: {dedup}")
+        if scheduler == SCHEDULER_ASYNC and engine != ENGINE_HTTP:
+            raise ValueError("async 스케줄러는 http 엔진에서만 사용할 수 있습니다.")
+        self.engine = engine
+        self.scheduler = scheduler
+        self.asyncFiles = dict()  # async 스케줄러 사용 시 카테고리별 (파일, csv writer)
+        self.incremental = incremental
+        self.stop_pages = stop_pages
+        self.incrementalStates = dict()  # async 스케줄러 사용 시 카테고리별 증분 크롤링 상태
+        self.resume = resume
+        self.browser_max_pages = browser_max_pages
+        self.browser_max_rss_mb = browser_max_rss_mb
+        self.output_format = output_format
+        self.dedup = dedup
+        self.dedup_threshold = dedup_threshold
+        self.cross_dedup = cross_dedup
+        self.image_workers = image_workers
+        self.image_downloader = None  # 이미지 다운로드 파이프라인 (실행 중에만 생성)
+        self.image_session = None  # 동기 다운로드용 keep-alive 세션
+        self.http_fetcher = None  # HTTP 엔진 사용 시 프로세스별로 생성
         self.errorList = list()  # 크롤링 중 발생한 오류를 저장할 리스트
         self.crawlingCategory = list()  # 크롤링할 카테고리 정보를 저장할 리스트
         
@@ -118,7 +235,17 @@ class Crawler:
         if not os.path.exists(self.image_path):
             os.makedirs(self.image_path)
 
+        # 해시 기반 이미지 저장소 (content 방식일 때만 사용)
+        self.image_store = ContentImageStore(self.image_path) if image_store == IMAGE_STORE_CONTENT else None
+
+        # 이미지 URL 캐시 (실행 간 유지)
+        self.image_cache = ImageUrlCache(os.path.join(self.image_path, IMAGE_CACHE_FILE),
+                                         image_cache_max_age) if image_cache else None
+
     def StartCrawling(self):
+        if self.scheduler == SCHEDULER_ASYNC:
+            return self.StartCrawlingAsync()
+
         self.chrome_option = webdriver.ChromeOptions()
 
         # 크롤링 옵션 설정
@@ -132,49 +259,265 @@ class Crawler:
         self.chrome_option.add_experimental_option('excludeSwitches', ['enable-automation'])
         self.chrome_option.add_experimental_option('useAutomationExtension', False)
 
-        # 멀티프로세싱 풀 생성
+        # 멀티프로세싱 풀 생성 (워커마다 브라우저 세션을 재사용하므로 카테고리를 하나씩 나눠 줌)
+        start_time = monotonic()
         pool = Pool(PROCESS_COUNT)
-        pool.map(self.CrawlingCategory, self.crawlingCategory)
+        categoryStats = list(pool.imap_unordered(self.CrawlingCategory, self.crawlingCategory, chunksize=1))
         pool.close()
         pool.join()
 
+        browserStats = format_browser_stats([stats['browser'] for stats in categoryStats if stats])
+        if browserStats:
+            print(browserStats)
+        imageStats = merge_image_stats([stats['image'] for stats in categoryStats if stats])
+        print(format_image_stats(imageStats, monotonic() - start_time))
+        if self.image_cache is not None:
+            print(format_cache_stats(imageStats))
+
+    def StartCrawlingAsync(self, concurrency=GLOBAL_CONCURRENCY, per_host=PER_HOST_CONCURRENCY, rate=PER_HOST_RATE):
+        """
+        모든 카테고리를 (카테고리, 페이지) 작업으로 펼쳐 asyncio 스케줄러로 크롤링하는 메서드
+        - 큰 카테고리 하나가 워커 하나를 오래 점유하지 않도록 페이지 단위로 작업을 분배합니다.
+        """
+        if not os.path.exists(DATA_PATH):
+            os.makedirs(DATA_PATH)
+
+        self.OpenListFetcher()
+        self.OpenImageDownloader()
+
+        categories = [(crawlingData[STR_NAME].replace('/', '_'), crawlingData[STR_URL]) for crawlingData in self.crawlingCategory]
+        categories = [(name, url) for name, url in categories if not self.CategoryFinished(name)]
+
+        try:
+            # 카테고리 CSV를 미리 열어 체크포인트의 시작 페이지를 확인
+            start_pages = {name: self.OpenCategoryCsv(name)[0].start_page for name, _ in categories}
+            scheduler = CrawlScheduler(self.http_fetcher, concurrency=concurrency, per_host=per_host, rate=rate,
+                                       chain_pages=self.incremental)
+            stats = scheduler.run(categories, self.OnCrawledPage, self.OnCrawledCategory, start_pages)
+        finally:
+            # 스케줄러가 중단되어 마무리하지 못한 카테고리 파일도 남은 행 / 체크포인트를 기록하고 닫음
+            try:
+                while self.asyncFiles:
+                    crawlingName, (crawlingFile, crawlingData_csvWriter) = self.asyncFiles.popitem()
+                    self.incrementalStates.pop(crawlingName, None)
+                    self.ReleaseCategoryFiles(crawlingFile, crawlingData_csvWriter)
+            finally:
+                imageStats = self.CloseImageDownloader()
+
+        elapsed = stats['elapsed'] or 1e-9
+        print(f"전체 크롤링 완료: {len(categories)}개 카테고리, {stats['pages']}페이지, {stats['products']}개 제품, "
+              f"오류 {stats['errors']}건, {elapsed:.1f}초 ({stats['pages'] / elapsed:.2f} 페이지/초)")
+        if imageStats:
+            print(format_image_stats(imageStats, imageStats['elapsed']))
+            if self.image_cache is not None:
+                print(format_cache_stats(imageStats))
+
+    def OpenListFetcher(self):
+        """
+        HTTP 목록 수집기를 (프로세스마다 한 번) 생성하는 메서드 (증분 크롤링이면 신상품순 정렬)
+        """
+        if self.http_fetcher is None:
+            self.http_fetcher = DanawaListFetcher(sort_method=INCREMENTAL_SORT_METHOD if self.incremental else None)
+
+    def OpenIncrementalState(self, crawlingName, crawlingDataPath):
+        """
+        증분 크롤링 상태를 불러오는 메서드 (지난 CSV를 덮어쓰기 전에 호출, 증분 크롤링이 아니면 None)
+        """
+        if not self.incremental:
+            return None
+        return IncrementalState(DATA_STATE_PATH, crawlingName, crawlingDataPath, self.stop_pages)
+
+    def CloseIncrementalState(self, incrementalState, crawlingName, csvWriter):
+        """
+        지난 CSV의 나머지 행을 이어 붙이고 본 제품 ID를 저장하는 메서드
+        """
+        if incrementalState is None:
+            return
+        merged = incrementalState.merge_previous(csvWriter)
+        incrementalState.save()
+        print(f"{crawlingName} 증분 크롤링: 새로 본 제품 {len(incrementalState.seen_ids - incrementalState.known_ids)}개, "
+              f"지난 행 {merged}개 병합{' (아는 페이지에서 중단)' if incrementalState.stopped else ''}")
+
+    def CategoryFinished(self, crawlingName):
+        """
+        resume 모드에서 지난 실행에 이미 완료된 카테고리인지 확인하는 메서드
+        """
+        if not self.resume:
+            return False
+        checkpoint = load_checkpoint(DATA_STATE_PATH, crawlingName)
+        if checkpoint is not None and checkpoint.get('done'):
+            print(f"이미 완료된 카테고리 - {crawlingName}")
+            return True
+        return False
+
+    def OpenCategoryFiles(self, crawlingName):
+        """
+        카테고리의 체크포인트 CSV(.part)와 증분 크롤링 상태를 여는 메서드
+        """
+        crawlingDataPath = os.path.join(DATA_PATH, f'{crawlingName}.csv')
+        incrementalState = self.OpenIncrementalState(crawlingName, crawlingDataPath)
+        crawlingFile = CheckpointedCsv(crawlingDataPath, DATA_STATE_PATH, crawlingName, resume=self.resume)
+        if crawlingFile.resumed:
+            print(f"{crawlingName} 카테고리 {crawlingFile.start_page}페이지부터 이어서 크롤링 (기록된 행 {crawlingFile.rows}개)")
+            if incrementalState is not None:
+                incrementalState.seen_names.update(crawlingFile.read_names())
+        return crawlingFile, incrementalState
+
+    def CloseCategoryFiles(self, crawlingFile, incrementalState, crawlingName, csvWriter, failed):
+        """
+        카테고리 CSV를 마무리하는 메서드
+        - 성공하면 지난 행을 병합(증분 크롤링)하고 .part 파일을 최종 CSV로 교체합니다 (parquet 형식이면 Parquet도 저장).
+        - 실패하면 .part 파일과 체크포인트를 남겨 --resume으로 이어서 크롤링할 수 있게 합니다.
+        """
+        if not failed:
+            self.CloseIncrementalState(incrementalState, crawlingName, csvWriter)
+        csvWriter.close()  # 이미지 다운로드를 기다리며 남은 행 기록
+        if failed:
+            crawlingFile.close()
+            print(f"{crawlingName} 체크포인트 유지 ({crawlingFile.page}페이지까지 기록, --resume으로 이어서 크롤링)")
+        else:
+            crawlingFile.finalize()
+            if self.output_format == FORMAT_PARQUET:
+                manifest = load_manifest(crawlingFile.csv_path)
+                convert_csv(crawlingFile.csv_path, manifest['crawled_at'] if manifest else None)
+
+    def ReleaseCategoryFiles(self, crawlingFile, csvWriter):
+        """
+        어떤 경로로 끝나든 남은 이미지 행과 페이지 체크포인트를 기록하고 카테고리 파일을 닫는 메서드
+        - 이미 CloseCategoryFiles로 마무리했다면 아무 일도 하지 않습니다 (.part 파일은 --resume용으로 남음).
+        """
+        try:
+            csvWriter.close()
+        finally:
+            crawlingFile.close()
+
+    def OpenImageDownloader(self):
+        """
+        이미지 다운로드 워커를 시작하는 메서드 (image_workers가 0이면 동기 다운로드 사용)
+        """
+        if self.image_workers > 0 and self.image_downloader is None:
+            self.image_downloader = ImageDownloader(workers=self.image_workers, image_store=self.image_store,
+                                                    image_cache=self.image_cache)
+
+    def CloseImageDownloader(self):
+        """
+        남은 이미지 다운로드를 마치고 워커를 종료한 뒤 통계를 반환하는 메서드
+        """
+        if self.image_downloader is None:
+            return None
+        imageStats = self.image_downloader.close()
+        self.image_downloader = None
+        return imageStats
+
+    def SaveImageState(self, crawlingName):
+        """
+        카테고리의 이미지 관련 상태(해시 저장소 인덱스, 이미지 URL 캐시)를 저장하는 메서드
+        """
+        if self.image_store is not None:
+            self.image_store.save_index(crawlingName)
+        if self.image_cache is not None:
+            self.image_cache.flush()
+
+    def OpenCategoryCsv(self, crawlingName):
+        """
+        async 스케줄러용 카테고리 CSV 파일을 (처음 한 번) 열고 (파일, csv writer)를 반환하는 메서드
+        """
+        if crawlingName not in self.asyncFiles:
+            crawlingFile, self.incrementalStates[crawlingName] = self.OpenCategoryFiles(crawlingName)
+            crawlingData_csvWriter = ImageRowWriter(crawlingFile)
+            self.asyncFiles[crawlingName] = (crawlingFile, crawlingData_csvWriter)
+        return self.asyncFiles[crawlingName]
+
+    def OnCrawledPage(self, crawlingName, page, products):
+        """
+        스케줄러가 페이지 순서대로 전달한 제품들을 CSV에 기록하는 콜백
+        - 증분 크롤링에서 남은 페이지를 요청하지 않아도 되면 True를 반환합니다.
+        """
+        print(f"{crawlingName} 카테고리 {page}페이지 저장 ({len(products)}개)")
+        crawlingFile, crawlingData_csvWriter = self.OpenCategoryCsv(crawlingName)
+        for productName, spec_list_text, image_url, productId in products:
+            try:
+                self.write_product_row(crawlingData_csvWriter, crawlingName, productName, spec_list_text, image_url)
+            except Exception as e:
+                print(f"제품 처리 중 오류 발생 ({productName}): {str(e)}")
+                continue
+        crawlingData_csvWriter.when_written(lambda: crawlingFile.commit_page(page))
+
+        incrementalState = self.incrementalStates.get(crawlingName)
+        if incrementalState is not None:
+            return incrementalState.observe_page([(product[0], product[3]) for product in products])
+        return False
+
+    def OnCrawledCategory(self, crawlingName, error):
+        """
+        카테고리 처리가 끝났을 때 CSV를 마무리하고 오류를 기록하는 콜백
+        """
+        self.OpenCategoryCsv(crawlingName)
+        crawlingFile, crawlingData_csvWriter = self.asyncFiles.pop(crawlingName)
+        try:
+            self.CloseCategoryFiles(crawlingFile, self.incrementalStates.pop(crawlingName), crawlingName,
+                                    crawlingData_csvWriter, failed=bool(error))
+            self.SaveImageState(crawlingName)
+        finally:
+            self.ReleaseCategoryFiles(crawlingFile, crawlingData_csvWriter)
+
+        if error:
+            print('Error - ' + crawlingName + ' ->')
+            print(error)
+            self.errorList.append(crawlingName)
+        print('Crawling Finish : ' + crawlingName)
+
     def CrawlingCategory(self, crawlingData):
         """
         각 카테고리를 크롤링하는 메서드
+        - {'image': 이미지 다운로드 통계, 'browser': 브라우저 세션 통계}를 반환합니다.
         """
+        if self.engine == ENGINE_HTTP:
+            return self.CrawlingCategoryHttp(crawlingData)
+
         crawlingName = crawlingData[STR_NAME].replace('/', '_')
-        browser = None
+        session = None
+        readiness = None
+        extractTime = 0.0  # 제품 추출에 쓴 시간 (대기 시간은 readiness에 기록)
+        imageStats = None
+        browserStats = None
+        self.OpenImageDownloader()
         
         try:
             # 저장 경로 확인 및 생성
             if not os.path.exists(DATA_PATH):
                 os.makedirs(DATA_PATH)
             
-            # CSV 파일 경로 설정
-            crawlingDataPath = os.path.join(DATA_PATH, f'{crawlingName}.csv')
+            # 이미 완료된 카테고리는 건너뛰기 (resume)
+            if self.CategoryFinished(crawlingName):
+                return None
             
-            # CSV 파일 열기 및 헤더 수정
-            with open(crawlingDataPath, 'w', newline='', encoding='utf-8-sig') as crawlingFile:
-                crawlingData_csvWriter = csv.writer(crawlingFile)
-                crawlingData_csvWriter.writerow(['Name', 'Spec', 'ImageURL'])
-
+            # CSV 파일 열기 (체크포인트 .part 파일에 기록, 완료 후 최종 CSV로 교체)
+            crawlingFile, incrementalState = self.OpenCategoryFiles(crawlingName)
+            startPage = crawlingFile.start_page
+            failed = False
+            crawlingData_csvWriter = ImageRowWriter(crawlingFile)
+            try:
                 try:
-                    # Chrome 브라우저 초기화
-                    browser = webdriver.Chrome(service=Service(CHROMEDRIVER_PATH), options=self.chrome_option)
-                    browser.implicitly_wait(10)
+                    # 브라우저 세션 가져오기 (프로세스마다 재사용, 필요하면 새로 띄우거나 교체)
+                    session = acquire_browser_session(self.chrome_option, CHROMEDRIVER_PATH,
+                                                      self.browser_max_pages, self.browser_max_rss_mb)
+                    browser = session.acquire()
+                    readiness = PageReadiness(browser, session.list_timeout)  # 목록 갱신 감지 (고정 대기 없음)
                     browser.get(crawlingData[STR_URL])  # 크롤링할 카테고리 페이지로 이동
 
-                    # 페이지 제품 수를 90개로 정
-                    browser.find_element(By.XPATH,'//option[@value="90"]').click()
-                    wait = WebDriverWait(browser, 10)  # 명시적 대기 시간 증가
-                    
-                    try:
-                        # 제품 목록 로딩 대기
-                        wait.until(EC.invisibility_of_element((By.CLASS_NAME, 'product_list_cover')))
-                    except TimeoutException:
-                        # 타임아웃 발생 시 잠시 대기 후 계속 진행
-                        sleep(5)
+                    # 페이지 제품 수를 90개로 정하고 목록이 다시 그려질 때까지 대기
+                    listState = readiness.state()
+                    readiness.wait_for_element(By.XPATH, '//option[@value="90"]').click()
+                    if not readiness.wait_for_change(listState):
                         print(f"페이지 로딩 지연 발생 - {crawlingName}")
+
+                    # 증분 크롤링이면 신상품순으로 정렬
+                    if incrementalState is not None:
+                        listState = readiness.state()
+                        readiness.wait_for_element(By.XPATH, f'//*[@data-sort-method="{INCREMENTAL_SORT_METHOD}"]').click()
+                        if not readiness.wait_for_change(listState):
+                            print(f"페이지 로딩 지연 발생 - {crawlingName}")
                     
                     # 총 제품 수 추출
                     crawlingSize = browser.find_element(By.CLASS_NAME,'list_num').text.strip()
@@ -186,41 +529,35 @@ class Crawler:
                     while True:
                         try:
                             print(f"{crawlingName} 카테고리 {page}/{crawlingSize} 페이지 크롤링 시작")  # 페이지 시작 알림
+                            session.count_page()
                             
-                            # 페이지 로딩 대기
-                            wait = WebDriverWait(browser, 10)
-                            wait.until(EC.presence_of_all_elements_located((By.CLASS_NAME, 'prod_main_info')))
+                            # 페이지 로딩 대기 (제품 목록이 있고 로딩 커버가 사라질 때까지)
+                            readiness.wait_for_list()
                             
-                            # 현재 페이지의 제품들 처리
-                            products = browser.find_elements(By.CLASS_NAME, 'prod_main_info')
+                            # 현재 페이지의 제품들 처리 (이어서 크롤링하는 경우 기록된 페이지는 이동만 함)
+                            # 스크립트 한 번으로 모든 제품의 (제품명, 스펙, 이미지 URL, 제품 ID)를 추출
+                            extractStart = monotonic()
+                            products = extract_products(browser) if page >= startPage else []
+                            extractTime += monotonic() - extractStart
                             
-                            for product in products:
+                            for productName, spec_list_text, image_url, productId in products:
                                 try:
-                                    # 제품명 추출
-                                    productName = product.find_element(By.XPATH, './/p[@class="prod_name"]/a').text.strip()
-                                    
-                                    # 스펙 정보 추출 추가
-                                    try:
-                                        spec_element = product.find_element(By.CLASS_NAME, 'spec_list')
-                                        spec_list_text = spec_element.text.strip()
-                                    except:
-                                        spec_list_text = ""  # 스펙 정보가 없는 경우 빈 문자열로 설정
-                                    
-                                    # 이미지 URL 추출
-                                    image_element = product.find_element(By.CSS_SELECTOR, '.thumb_image img')
-                                    image_url = image_element.get_attribute('data-original') or image_element.get_attribute('src')
-                                    if image_url.startswith('//'):
-                                        image_url = 'https:' + image_url
-                                        
-                                    # 이미지 저장 시 파일명을 제품명으로 정확히 지정
-                                    local_image_path = self.save_image(image_url, productName.replace('/', '_'), crawlingName)
-                                    
-                                    # CSV에 저장
-                                    crawlingData_csvWriter.writerow([productName, spec_list_text, local_image_path])
+                                    # 이미지 저장 및 CSV에 저장
+                                    self.write_product_row(crawlingData_csvWriter, crawlingName, productName, spec_list_text, image_url)
                                     
                                 except Exception as e:
-                                    print(f"제품 처리 중 오류 발생 ({productName if 'productName' in locals() else 'unknown'}): {str(e)}")
+                                    print(f"제품 처리 중 오류 발생 ({productName}): {str(e)}")
                                     continue
+
+                            # 페이지 체크포인트 (이 페이지의 행이 모두 기록되면 저장)
+                            if page >= startPage:
+                                crawlingData_csvWriter.when_written(lambda page=page: crawlingFile.commit_page(page))
+
+                            # 증분 크롤링: 이미 아는 제품만 있는 페이지가 이어지면 중단
+                            if page >= startPage and incrementalState is not None and \
+                                    incrementalState.observe_page([(product[0], product[3]) for product in products]):
+                                print(f"이미 수집한 제품에 도달 - {crawlingName} ({page}페이지)")
+                                break
                             
                             # 다음 페이지로 이동
                             try:
@@ -232,14 +569,14 @@ class Crawler:
                                     print(f"더 이상 페이지가 없음 - {crawlingName}")
                                     break
                                 
-                                # 다음 페이지 번호 찾기
+                                # 다음 페이지 번호 찾기 (클릭 전 목록 상태를 기록해 갱신 완료를 감지)
+                                listState = readiness.state()
                                 next_page_found = False
                                 for page_element in page_numbers:
                                     if page_element.text.strip() == str(page + 1):
                                         page_element.click()
                                         next_page_found = True
                                         page += 1
-                                        sleep(2)  # 페이지 로딩 대기
                                         break
                                 
                                 # 다음 페이지를 찾지 못했다면
@@ -249,7 +586,6 @@ class Crawler:
                                         next_group = browser.find_element(By.XPATH, '//a[@class="edge_nav nav_next"]')
                                         if 'nav_edge' not in next_group.get_attribute('class'):  # 비활성화 상태 체크
                                             next_group.click()
-                                            sleep(2)
                                             page += 1
                                         else:
                                             print(f"마지막 페이지 도달 - {crawlingName}")
@@ -258,9 +594,9 @@ class Crawler:
                                         print(f"마지막 페이지 도달 - {crawlingName}")
                                         break
                                 
-                                # 새 페이지 로딩 대기
-                                wait = WebDriverWait(browser, 10)
-                                wait.until(EC.invisibility_of_element((By.CLASS_NAME, 'product_list_cover')))
+                                # 새 페이지 로딩 대기 (첫 제품이 바뀌거나 로딩 커버가 나타났다 사라질 때까지)
+                                if not readiness.wait_for_change(listState):
+                                    print(f"페이지 로딩 지연 발생 - {crawlingName} ({page}페이지)")
                                 
                             except Exception as e:
                                 print(f"페이지 이동 중 오류 발생 - {crawlingName}: {str(e)}")
@@ -268,20 +604,28 @@ class Crawler:
                                 
                         except Exception as e:
                             print(f"{crawlingName} 카테고리 {page}페이지 처리 중 오류 발생: {str(e)}")
+                            self.errorList.append(crawlingName)
+                            failed = True
                             break
 
                 except Exception as e:
                     print('Error - ' + crawlingName + ' ->')
                     print(traceback.format_exc())
                     self.errorList.append(crawlingName)
+                    failed = True
                     
-                    # 라우저 세션 정리
-                    try:
-                        browser.quit()
-                    except:
-                        pass
+                    # 오류가 난 브라우저 세션은 종료하고 다음 카테고리에서 새로 띄움
+                    if session is not None:
+                        session.discard()
 
+                self.CloseCategoryFiles(crawlingFile, incrementalState, crawlingName, crawlingData_csvWriter, failed)
+                self.SaveImageState(crawlingName)
+                if readiness is not None:
+                    print(f"{crawlingName} 목록 대기 {readiness.wait_time:.1f}초 ({readiness.waits}회, 타임아웃 {readiness.timeouts}회), "
+                          f"제품 추출 {extractTime:.1f}초")
                 print('Crawling Finish : ' + crawlingName)
+            finally:
+                self.ReleaseCategoryFiles(crawlingFile, crawlingData_csvWriter)
 
         except FileNotFoundError as e:
             print(f"Error: {e}")
@@ -292,61 +636,206 @@ class Crawler:
             self.errorList.append(crawlingName)  # 오류 목록에 추가
 
         finally:
-            # 브라우저와 드이버 정리
-            if browser:
-                try:
-                    # 열려있는 모든 창 닫기
-                    for handle in browser.window_handles:
-                        browser.switch_to.window(handle)
-                        browser.close()
-                except:
-                    pass
-                
-                try:
-                    # 브라우저 종료
-                    browser.quit()
-                    sleep(1)  # 브라우저 종료 후 잠시 대기
-                except:
-                    pass
-                
-                try:
-                    # 프로세스 강제 종료
-                    
-                    process = psutil.Process(browser.service.process.pid)
-                    for proc in process.children(recursive=True):
-                        proc.kill()
-                    process.kill()
-                except:
-                    pass
+            imageStats = self.CloseImageDownloader()
+
+            # 브라우저 세션은 종료하지 않고 다음 카테고리에서 재사용 (프로세스 종료 시 정리)
+            if session is not None:
+                browserStats = session.category_stats(readiness, extractTime)
 
-    def DataSort(self):
+        return {'image': imageStats, 'browser': browserStats}
+
+    def CrawlingCategoryHttp(self, crawlingData):
+        """
+        각 카테고리를 브라우저 없이 HTTP(AJAX 목록 요청)로 크롤링하는 메서드
+        - Selenium 경로와 같은 Name,Spec,ImageURL 형식의 CSV를 생성합니다.
+        - CrawlingCategory와 같은 형식의 통계를 반환합니다 (브라우저 통계는 None).
+        """
+        crawlingName = crawlingData[STR_NAME].replace('/', '_')
+        self.OpenImageDownloader()
+
+        try:
+            # 저장 경로 확인 및 생성
+            if not os.path.exists(DATA_PATH):
+                os.makedirs(DATA_PATH)
+
+            # 프로세스마다 하나의 세션(커넥션 풀)을 재사용
+            self.OpenListFetcher()
+
+            # 이미 완료된 카테고리는 건너뛰기 (resume)
+            if self.CategoryFinished(crawlingName):
+                return None
+
+            # 체크포인트 .part 파일에 기록하고, 실패하면 남겨 두어 --resume으로 이어서 크롤링
+            crawlingFile, incrementalState = self.OpenCategoryFiles(crawlingName)
+            crawlingData_csvWriter = ImageRowWriter(crawlingFile)
+            try:
+                listing = self.http_fetcher.open_category(crawlingData[STR_URL])
+                crawlingSize = listing.page_count or '?'
+
+                for page, products in self.http_fetcher.iter_pages(listing, crawlingFile.start_page):
+                    print(f"{crawlingName} 카테고리 {page}/{crawlingSize} 페이지 크롤링 시작")
+                    for productName, spec_list_text, image_url, productId in products:
+                        try:
+                            self.write_product_row(crawlingData_csvWriter, crawlingName, productName, spec_list_text, image_url)
+                        except Exception as e:
+                            print(f"제품 처리 중 오류 발생 ({productName}): {str(e)}")
+                            continue
+                    crawlingData_csvWriter.when_written(lambda page=page: crawlingFile.commit_page(page))
+
+                    # 증분 크롤링: 이미 아는 제품만 있는 페이지가 이어지면 중단
+                    if incrementalState is not None and \
+                            incrementalState.observe_page([(product[0], product[3]) for product in products]):
+                        print(f"이미 수집한 제품에 도달 - {crawlingName} ({page}페이지)")
+                        break
+
+                self.CloseCategoryFiles(crawlingFile, incrementalState, crawlingName, crawlingData_csvWriter, False)
+                self.SaveImageState(crawlingName)
+            finally:
+                self.ReleaseCategoryFiles(crawlingFile, crawlingData_csvWriter)
+
+            print('Crawling Finish : ' + crawlingName)
+
+        except Exception as e:
+            print('Error - ' + crawlingName + ' ->')
+            print(traceback.format_exc())
+            self.errorList.append(crawlingName)
+
+        finally:
+            imageStats = self.CloseImageDownloader()
+
+        return {'image': imageStats, 'browser': None}
+
+    def write_product_row(self, csvWriter, crawlingName, productName, spec_list_text, image_url):
+        """
+        제품 한 개의 이미지를 저장하고 CSV에 한 줄을 기록하는 메서드 (Selenium/HTTP 엔진 공용)
+        - 다운로드 파이프라인이 켜져 있으면 다운로드를 큐에 넣고, 행은 결과가 나오는 대로 순서대로 기록됩니다.
+        """
+        if image_url.startswith('//'):
+            image_url = 'https:' + image_url
+
+        if self.image_downloader is None:
+            # 이미지 저장 시 파일명을 제품명으로 정확히 지정
+            local_image_path = self.save_image(image_url, productName.replace('/', '_'), crawlingName)
+
+            # CSV에 저장
+            csvWriter.writerow([productName, spec_list_text, local_image_path])
+            return
+
+        if self.image_excluded(image_url, productName):
+            csvWriter.writerow([productName, spec_list_text, ''])
+            return
+
+        if self.image_store is not None:
+            future = self.image_downloader.submit(image_url, store_key=(crawlingName, productName))
+        else:
+            save_path = self.image_save_path(image_url, productName.replace('/', '_'), crawlingName)
+            future = self.image_downloader.submit(image_url, save_path)
+        csvWriter.writerow([productName, spec_list_text, ''], future)
+
+    def DataSort(self, processes=PROCESS_COUNT):
         """
         크롤링된 데이터를 정렬하고, 정제하며, 중복을 제거는 메서드
+        - 카테고리마다 프로세스 풀에서 병렬로 정제 / 중복 제거를 하고 카테고리별 소요 시간을 출력합니다.
+        - cross_dedup이 True이면 마지막에 카테고리 사이의 중복 제품을 한 카테고리에만 남깁니다.
         """
         print('데이터 정렬 시작')
+        start_time = monotonic()
 
-        for crawlingValue in self.crawlingCategory:
-            dataName = crawlingValue[STR_NAME].replace('/', '_')
-            crawlingDataPath = os.path.join(DATA_PATH, f'{dataName}.csv')
-            
-            # 정된 데이터를 저장할 경로
-            cleaned_data_path = os.path.join(DATA_PATH, f"정제_중복제거_{dataName}.csv")
-            
-            if not os.path.exists(crawlingDataPath):
-                print(f"파일을 찾을 수 없음: {crawlingDataPath}")
-                continue
+        categories = list(enumerate(self.crawlingCategory))
+        results = []
+        if processes > 1 and len(categories) > 1:
+            with Pool(min(processes, len(categories))) as pool:
+                for result in pool.imap_unordered(self.SortCategory, categories, chunksize=1):
+                    results.append(result)
+        else:
+            results = [self.SortCategory(category) for category in categories]
+        results = sorted((result for result in results if result), key=lambda result: result['index'])
 
-            try:
-                # 데이터 정제 및 중복 제거 수행
-                self.remove_duplicates_and_units(crawlingDataPath, cleaned_data_path)
-                print(f"정제 및 중복 제거 완료: {dataName}")
-                
-                # 원본 파일 삭제 (선택사항)
-                # os.remove(crawlingDataPath)
+        if self.cross_dedup:
+            self.MergeCrossCategory(results)
 
-            except Exception as e:
-                print(f"오류 발생 - {dataName}: {str(e)}")
-                traceback.print_exc()
+        print(format_sort_stats(results, monotonic() - start_time))
+
+    def SortCategory(self, category):
+        """
+        카테고리 하나를 정제 / 중복 제거하는 메서드 (DataSort의 워커에서 실행)
+        - 반환: 카테고리 순서, 이름, 출력 경로, 헤더, 남긴 행, 소요 시간 등 (파일이 없으면 None)
+        """
+        index, crawlingValue = category
+        dataName = crawlingValue[STR_NAME].replace('/', '_')
+        crawlingDataPath = os.path.join(DATA_PATH, f'{dataName}.csv')
+
+        # 정제된 데이터를 저장할 경로
+        cleaned_data_path = data_path(DATA_PATH, f"정제_중복제거_{dataName}", self.output_format)
+
+        if not os.path.exists(crawlingDataPath):
+            print(f"파일을 찾을 수 없음: {crawlingDataPath}")
+            return None
+
+        start_time = monotonic()
+        try:
+            # 데이터 정제 및 중복 제거 수행
+            result = self.remove_duplicates_and_units(crawlingDataPath, cleaned_data_path, dataName)
+            result.update(index=index, name=dataName, output_file=cleaned_data_path, elapsed=monotonic() - start_time)
+            print(f"정제 및 중복 제거 완료: {dataName} ({result['input_rows']}행 → {len(result['rows'])}행, "
+                  f"{result['elapsed']:.2f}초)")
+
+            # 원본 파일 삭제 (선택사항)
+            # os.remove(crawlingDataPath)
+            return result
+
+        except Exception as e:
+            print(f"오류 발생 - {dataName}: {str(e)}")
+            traceback.print_exc()
+            return None
+
+    def MergeCrossCategory(self, results):
+        """
+        카테고리 사이의 중복 제품을 찾아 한 카테고리(스펙이 가장 긴 행, 같으면 앞 카테고리)에만 남기는 메서드
+        - 중복 판단은 카테고리 안과 같은 방식(minhash / key)을 사용합니다.
+        - 행이 빠진 정제 파일만 다시 저장하고, 제거한 행은 상태 디렉토리의 cross_category_duplicates.csv에 기록합니다.
+        """
+        owners = [(position, row_index) for position, result in enumerate(results) for row_index in range(len(result['rows']))]
+        if not owners:
+            return
+        rows = [results[position]['rows'][row_index] for position, row_index in owners]
+        if self.dedup == DEDUP_MINHASH:
+            cluster_ids = cluster_names([row[0] for row in rows], threshold=self.dedup_threshold)
+        else:
+            keys = dict()
+            cluster_ids = [keys.setdefault(row[0].split(',')[0], len(keys)) for row in rows]
+        canonical = canonical_rows(cluster_ids, [len(row[1]) for row in rows])
+        kept = {int(cluster_ids[index]): int(index) for index in canonical}
+
+        removed = defaultdict(set)  # 결과 위치 → 제거할 행 번호
+        report = []
+        for index, (position, row_index) in enumerate(owners):
+            keep_index = kept[int(cluster_ids[index])]
+            keep_position = owners[keep_index][0]
+            if keep_index != index and keep_position != position:
+                removed[position].add(row_index)
+                report.append([results[position]['name'], rows[index][0],
+                               results[keep_position]['name'], rows[keep_index][0]])
+
+        for position, row_indexes in removed.items():
+            result = results[position]
+            result['rows'] = [row for row_index, row in enumerate(result['rows']) if row_index not in row_indexes]
+            result['cross_removed'] = len(row_indexes)
+            self.write_cleaned_rows(result['output_file'], result['header'], result['rows'], result['crawled_at'])
+
+        os.makedirs(DATA_STATE_PATH, exist_ok=True)
+        report_path = os.path.join(DATA_STATE_PATH, 'cross_category_duplicates.csv')
+        report_file = AtomicCsvFile(report_path)
+        report_file.writerow(['Category', 'Name', 'KeptCategory', 'KeptName'])
+        report_file.writerows(report)
+        report_file.commit()
+
+        # 어느 카테고리에서 어떤 행을 지웠는지 출력
+        for category, name, kept_category, kept_name in report:
+            print(f"카테고리 간 중복 제거 ({category}): {name} → {kept_category}의 {kept_name}만 남김")
+        for position in sorted(removed):
+            print(f"  {results[position]['name']}: {len(removed[position])}행 제거 → {results[position]['output_file']}")
+        print(f"카테고리 간 중복 제거: {len(report)}행 ({len(removed)}개 카테고리 파일 갱신, 목록: {report_path})")
 
     def ResetCsv(self, crawlingDataPath):
         """
@@ -365,29 +854,23 @@ class Crawler:
 
     def clean_product_name(self, name):
         """
-        제품 이름에서 단위와 괄호 내용을 제거하는 메서드
+        제품 이름에서 단위와 괄호 내용을 제거하는 메서드 (미리 컴파일한 패턴 + LRU 캐시, name_normalizer 참고)
         """
-        # 끝 부분의 숫자와 단위를 제거하는 패턴 (T, P 등의 단위 추가)
-        pattern = r'\s*\d+(?:\.\d+)?\s*(?:ml|정|포|l|g|kg|mg|개|can|캔|팩|페트|병|입|박스|캡슐|스틱|매|베지캡슐|분|da|달톤|mgα-te|mgne|㎍re|㎍|μg|T|P|세트)(?:\s*x\s*\d+(?:개|팩|병|캔|박스|정|포|매|스틱)?)?\s*'
-        
-        # 괄호 안 내용을 제거하는 패턴
-        bracket_pattern = r'\s*\([^)]*\)\s*'
-        
-        # 패턴을 반복적으로 적용
-        prev_name = name
-        while True:
-            cleaned = re.sub(pattern, '', prev_name, flags=re.IGNORECASE)
-            cleaned = re.sub(bracket_pattern, '', cleaned)
-            cleaned = cleaned.strip()
-            if cleaned == prev_name:  # 더 이상 변화가 없으면 종료
-                break
-            prev_name = cleaned
-        
-        return cleaned
+        return clean_product_name(name)
+
+    def remove_duplicates_and_units(self, input_file, output_file, category=None):
+        """
+        제품명을 정제하고 중복을 제거해 output_file로 저장하는 메서드
+        - 해시 저장소를 쓰는 경우 이미지 이름 변경은 파일 작업 없이 인덱스만 갱신합니다.
+        - dedup이 minhash이면 유사 제품명 클러스터마다 대표 행을 남기고 ClusterID 열을 추가합니다.
+        - 이미지 이름 변경은 디렉토리별로 모아서 실행합니다 (ImageRenameBatch).
+        - 반환: 헤더, 남긴 행, 입력 행 수, 크롤링 시각, 이미지 변경 / 삭제 수 (카테고리 간 중복 제거에 사용)
+        """
+        rows = []  # (중복 판단 키, 정제된 행, 원래 제품명)
+        renames = ImageRenameBatch()
+        planned = []  # (정제된 행, 원래 이미지 경로)
+        input_rows = 0
 
-    def remove_duplicates_and_units(self, input_file, output_file):
-        unique_entries = defaultdict(list)
-        
         with open(input_file, 'r', encoding='utf-8-sig') as f:
             reader = csv.reader(f)
             header = next(reader, None)
@@ -400,42 +883,92 @@ class Crawler:
                         print(f"제외된 제품 (+ 포함): {original_name}")
                         continue
                     
-                    cleaned_name = self.clean_product_name(original_name)  # 제품명 정제
-                    
-                    # 파일명에 사용할 수 없는 문자 제거
-                    safe_name = re.sub(r'[\\/*?:"<>|]', '_', cleaned_name)
-                    safe_name = safe_name.replace('  ', ' ').strip()
-                    key = cleaned_name.split(',')[0]
+                    # 제품명 정제, 파일명에 사용할 수 없는 문자 제거, 중복 판단 키 (같은 제품명은 캐시 사용)
+                    cleaned_name, safe_name, key = normalize_product_name(original_name)
                     
                     # 이미지 파일 처리
                     original_image = row[2]
-                    if original_image and os.path.exists(original_image):
-                        image_dir = os.path.dirname(original_image)
-                        new_image_path = os.path.join(image_dir, f"{safe_name}.jpg")
-                        
-                        try:
-                            if os.path.exists(original_image):
-                                if os.path.exists(new_image_path) and original_image != new_image_path:
-                                    os.remove(original_image)
-                                else:
-                                    os.rename(original_image, new_image_path)
-                                row[2] = new_image_path
-                        except Exception as e:
-                            print(f"이미지 이름 변경 실패 ({original_image} -> {new_image_path}): {str(e)}")
-                            row[2] = original_image
+                    if self.image_store is not None and category is not None and self.image_store.is_blob_path(original_image):
+                        # 해시 저장소: 인덱스의 제품명만 변경 (파일 시스템 작업 없음)
+                        row[2] = self.image_store.rename(category, original_name, safe_name) or original_image
+                    else:
+                        # 이름 변경은 계획만 하고 아래에서 디렉토리별로 모아서 실행
+                        new_image_path = renames.plan(original_image, safe_name)
+                        if new_image_path is not None:
+                            row[2] = new_image_path
 
                     new_row = [cleaned_name, row[1], row[2]]
-                    if key not in unique_entries or len(row[1]) > len(unique_entries[key][0][1]):
-                        unique_entries[key] = [new_row]
+                    if row[2] != original_image:
+                        planned.append((new_row, original_image))
+                    rows.append((key, new_row, original_name))
+                    input_rows += 1
 
-        # 정제된 데이터 저장
-        with open(output_file, 'w', encoding='utf-8-sig', newline='') as f:
-            writer = csv.writer(f)
-            writer.writerow(header)
-            for entries in unique_entries.values():
-                writer.writerow(entries[0])
+        # 이미지 이름 변경 실행 (실패한 행은 원래 경로 유지, 이미지 URL 캐시의 경로도 함께 변경)
+        failures = renames.apply(self.image_cache)
+        for new_row, original_image in planned:
+            if original_image in failures:
+                new_row[2] = original_image
+
+        if self.dedup == DEDUP_MINHASH:
+            header, output_rows = self.cluster_duplicates(header or CSV_HEADER, rows, category)
+        else:
+            unique_entries = defaultdict(list)
+            for key, new_row, _ in rows:
+                if key not in unique_entries or len(new_row[1]) > len(unique_entries[key][0][1]):
+                    unique_entries[key] = [new_row]
+            output_rows = [entries[0] for entries in unique_entries.values()]
+
+        # 정제된 데이터 저장 (원본 CSV의 크롤링 시각을 매니페스트에 유지)
+        input_manifest = load_manifest(input_file)
+        crawled_at = input_manifest['crawled_at'] if input_manifest else None
+        self.write_cleaned_rows(output_file, header, output_rows, crawled_at)
+
+        if self.image_store is not None and category is not None:
+            self.image_store.save_index(category)
 
         print(f"데이터 정제 완료: {output_file}")
+        return {'header': header, 'rows': output_rows, 'input_rows': input_rows, 'crawled_at': crawled_at,
+                'renamed': renames.renamed, 'removed': renames.removed, 'rename_failed': len(failures)}
+
+    def write_cleaned_rows(self, output_file, header, rows, crawled_at=None):
+        """
+        정제된 데이터를 저장하는 메서드 (임시 파일에 기록 후 교체, Parquet / CSV)
+        """
+        if output_file.endswith('.' + FORMAT_PARQUET):
+            write_product_rows(output_file, header, rows, crawled_at)
+            return
+        writer = AtomicCsvFile(output_file)
+        try:
+            writer.writerow(header)
+            writer.writerows(rows)
+        except Exception:
+            writer.discard()
+            raise
+        writer.commit(crawled_at)
+
+    def cluster_duplicates(self, header, rows, category=None):
+        """
+        정제된 제품명을 MinHash + LSH로 유사 제품 클러스터로 묶고 클러스터마다 대표 행(스펙이 가장 긴 행)을 반환하는 메서드
+        - 반환: (ClusterID 열을 추가한 헤더, 대표 행 목록)
+        - 모든 행의 클러스터 ID는 상태 디렉토리의 <카테고리>.clusters.csv에 저장합니다.
+        """
+        if not rows:
+            return list(header) + ['ClusterID'], []
+        cluster_ids = cluster_names([new_row[0] for _, new_row, _ in rows], threshold=self.dedup_threshold)
+        canonical = canonical_rows(cluster_ids, [len(new_row[1]) for _, new_row, _ in rows])
+
+        if category is not None:
+            os.makedirs(DATA_STATE_PATH, exist_ok=True)
+            safe_category = re.sub(r'[\\/*?:"<>|]', '_', category)
+            cluster_file = AtomicCsvFile(os.path.join(DATA_STATE_PATH, f'{safe_category}.clusters.csv'))
+            cluster_file.writerow(['ClusterID', 'Canonical', 'Name', 'CleanedName'])
+            canonical_set = set(canonical.tolist())
+            for index, (_, new_row, original_name) in enumerate(rows):
+                cluster_file.writerow([int(cluster_ids[index]), int(index in canonical_set), original_name, new_row[0]])
+            cluster_file.commit()
+
+        print(f"유사 제품 클러스터: {len(rows)}행 → {len(canonical)}개")
+        return list(header) + ['ClusterID'], [rows[index][1] + [int(cluster_ids[index])] for index in canonical]
 
     def update_image_name(self, image_path, new_name):
         """
@@ -458,59 +991,116 @@ class Crawler:
         
         return new_image_path
 
-    def save_image(self, image_url, product_name, csv_name, max_retries=3):
+    def image_excluded(self, image_url, product_name):
         """
-        이미지 URL에서 이미지를 다운로드하여 저장하는 메서드
+        저장하지 않는 이미지인지 확인하는 메서드 ('+' 포함 제품, 이미지 없음)
         """
         # '+'가 포함된 제품은 건너뛰기
         if '+' in product_name:
             print(f"제외된 이미지 (+ 포함): {product_name}")
+            return True
+
+        return 'noImg' in image_url
+
+    def image_save_path(self, image_url, product_name, csv_name):
+        """
+        이미지를 저장할 로컬 경로를 만드는 메서드 (저장하지 않는 이미지면 '')
+        """
+        if self.image_excluded(image_url, product_name):
             return ''
-        
-        for attempt in range(max_retries):
-            try:
-                if 'noImg' in image_url:
-                    return ''
-                
-                # 이미지 저장 경로 생성
-                safe_csv_name = re.sub(r'[\\/*?:"<>|]', '_', csv_name)
-                image_dir = os.path.join(self.image_path, safe_csv_name)
-                if not os.path.exists(image_dir):
-                    os.makedirs(image_dir)
-                
-                # 이미지 파일명 생성 (원본 제품명 사용, 파일시스템 금지 문자만 제거)
-                safe_name = re.sub(r'[\\/*?:"<>|]', '', product_name)
-                image_filename = f"{safe_name}.jpg"
-                save_path = os.path.join(image_dir, image_filename)
-                
-                # 이미지가 이미 존재하는 경우 건너뛰기
-                if os.path.exists(save_path):
-                    return save_path
-                
-                # 이미지 다운로드
-                response = requests.get(image_url, verify=False)
-                if response.status_code == 200:
-                    # 이미지 처리 및 저장
-                    img = Image.open(BytesIO(response.content))
-                    img = img.convert('RGB')  # PNG 등의 형식을 JPG로 변환
-                    img.save(save_path, 'JPEG')
-                    return save_path
-                else:
-                    print(f"이미지 다운로드 실패 (status code: {response.status_code}): {image_url}")
-                    return ''
-            
-            except Exception as e:
-                if attempt == max_retries - 1:
-                    print(f"이미지 저장 실패 ({product_name}): {str(e)}")
-                    return ''
-                else:
-                    print(f"이미지 다운로드 재시도 중... ({attempt + 1}/{max_retries})")
-                    sleep(2)
 
-        return ''
+        # 이미지 저장 경로 생성
+        safe_csv_name = re.sub(r'[\\/*?:"<>|]', '_', csv_name)
+        image_dir = os.path.join(self.image_path, safe_csv_name)
+        os.makedirs(image_dir, exist_ok=True)
+
+        # 이미지 파일명 생성 (원본 제품명 사용, 파일시스템 금지 문자만 제거)
+        safe_name = re.sub(r'[\\/*?:"<>|]', '', product_name)
+        return os.path.join(image_dir, f"{safe_name}.jpg")
+
+    def save_image(self, image_url, product_name, csv_name, max_retries=3):
+        """
+        이미지 URL에서 이미지를 다운로드하여 저장하는 메서드
+        """
+        if self.image_session is None:
+            self.image_session = create_session(max_retries=0)
+
+        if self.image_store is not None:
+            # 해시 저장소: 인덱스에 이미 있으면 재사용, 없으면 받아서 저장
+            if self.image_excluded(image_url, product_name):
+                return ''
+            # (이미지 URL 캐시를 쓰면 인덱스에 있어도 조건부 요청으로 재검증)
+            existing_path = self.image_store.lookup(csv_name, product_name) if self.image_cache is None else ''
+            if existing_path:
+                return existing_path
+            job_stats = new_job_stats()
+            image_path = self.image_store.download(self.image_session, image_url, csv_name, product_name, max_retries,
+                                                   stats=job_stats, cache=self.image_cache)
+        else:
+            save_path = self.image_save_path(image_url, product_name, csv_name)
+
+            # 저장하지 않는 이미지이거나 (캐시를 쓰지 않을 때) 이미 존재하는 경우 건너뛰기
+            if not save_path or (self.image_cache is None and os.path.exists(save_path)):
+                return save_path
+
+            job_stats = new_job_stats()
+            image_path = download_image(self.image_session, image_url, save_path, max_retries,
+                                        stats=job_stats, cache=self.image_cache)
+
+        if self.image_cache is not None:
+            self.image_cache.remember(image_url, job_stats, image_path)
+        return image_path
 
 # 메인 실행 블록
 if __name__ == '__main__':
-    crawler = Crawler()  # 크롤러 인스턴스 생성
-    crawler.StartCrawling()  # 크롤링 시작
-    crawler.DataSort()  # 데이터 정렬, 정제, 중복 제거 수행
+    parser = argparse.ArgumentParser(description='다나와 크롤러')
+    parser.add_argument('--engine', choices=[ENGINE_SELENIUM, ENGINE_HTTP], default=FETCH_ENGINE,
+                        help='목록 수집 엔진 (기본값: %(default)s)')
+    parser.add_argument('--scheduler', choices=[SCHEDULER_POOL, SCHEDULER_ASYNC], default=CRAWL_SCHEDULER,
+                        help='작업 분배 방식, async는 http 엔진 전용 (기본값: %(default)s)')
+    parser.add_argument('--concurrency', type=int, default=GLOBAL_CONCURRENCY, help='async 전역 동시 요청 수')
+    parser.add_argument('--per-host', type=int, default=PER_HOST_CONCURRENCY, help='async 호스트별 동시 요청 수')
+    parser.add_argument('--rate', type=float, default=PER_HOST_RATE, help='async 호스트별 초당 요청 수 (0: 제한 없음)')
+    parser.add_argument('--image-workers', type=int, default=IMAGE_WORKERS,
+                        help='이미지 다운로드 워커 수 (0: 크롤링 중 동기 다운로드)')
+    parser.add_argument('--image-store', choices=[IMAGE_STORE_NAMED, IMAGE_STORE_CONTENT], default=IMAGE_STORE,
+                        help='이미지 저장 방식 (content: 해시 기반 중복 제거 저장소, 기본값: %(default)s)')
+    parser.add_argument('--image-cache', action='store_true', default=USE_IMAGE_CACHE,
+                        help='이미지 URL 캐시 사용 (ETag / Last-Modified 조건부 요청)')
+    parser.add_argument('--image-cache-max-age', type=float, default=IMAGE_CACHE_MAX_AGE,
+                        help='마지막 확인 후 요청 없이 재사용할 시간(초), 0이면 항상 재검증')
+    parser.add_argument('--incremental', action='store_true', default=INCREMENTAL_CRAWL,
+                        help='증분 크롤링 (신상품순으로 보다가 이미 아는 제품에 도달하면 중단하고 지난 CSV와 병합)')
+    parser.add_argument('--stop-pages', type=int, default=INCREMENTAL_STOP_PAGES,
+                        help='이미 아는 제품만 있는 페이지가 이만큼 연속되면 중단 (기본값: %(default)s)')
+    parser.add_argument('--resume', action='store_true',
+                        help='지난 실행의 체크포인트에서 이어서 크롤링 (완료된 카테고리는 건너뜀)')
+    parser.add_argument('--browser-max-pages', type=int, default=BROWSER_MAX_PAGES,
+                        help='브라우저 세션을 교체할 사용 페이지 수 (0: 제한 없음, 기본값: %(default)s)')
+    parser.add_argument('--browser-max-rss', type=float, default=BROWSER_MAX_RSS_MB,
+                        help='브라우저 세션을 교체할 메모리(MB) (0: 제한 없음, 기본값: %(default)s)')
+    parser.add_argument('--output-format', choices=list(DATA_FORMATS), default=OUTPUT_FORMAT,
+                        help='제품 데이터 저장 형식 (parquet: 열 단위 저장, pyarrow 필요, 기본값: %(default)s)')
+    parser.add_argument('--dedup', choices=[DEDUP_KEY, DEDUP_MINHASH], default=DEDUP_METHOD,
+                        help='중복 제거 방식 (key: 쉼표 앞 제품명 일치, minhash: 유사 제품명 클러스터 + 정제 파일에 '
+                             'ClusterID 열 추가, 기본값: %(default)s)')
+    parser.add_argument('--dedup-threshold', type=float, default=NEAR_DUPLICATE_THRESHOLD,
+                        help='minhash 중복 제거의 유사도 기준 (0~1, 기본값: %(default)s)')
+    parser.add_argument('--cross-dedup', action=argparse.BooleanOptionalAction, default=CROSS_CATEGORY_DEDUP,
+                        help='정제 마지막에 카테고리 간 중복 제품 제거 (기본값: %(default)s)')
+    parser.add_argument('--sort-processes', type=int, default=PROCESS_COUNT,
+                        help='정제 단계에서 카테고리를 병렬로 처리할 프로세스 수 (1: 순차 처리, 기본값: %(default)s)')
+    args = parser.parse_args()
+
+    crawler = Crawler(engine=args.engine, scheduler=args.scheduler, image_workers=args.image_workers,
+                      image_store=args.image_store, image_cache=args.image_cache,
+                      image_cache_max_age=args.image_cache_max_age, incremental=args.incremental,
+                      stop_pages=args.stop_pages, resume=args.resume, browser_max_pages=args.browser_max_pages,
+                      browser_max_rss_mb=args.browser_max_rss,
+                      output_format=args.output_format, dedup=args.dedup,
+                      dedup_threshold=args.dedup_threshold, cross_dedup=args.cross_dedup)  # 크롤러 인스턴스 생성
+    if args.scheduler == SCHEDULER_ASYNC:
+        crawler.StartCrawlingAsync(concurrency=args.concurrency, per_host=args.per_host, rate=args.rate)
+    else:
+        crawler.StartCrawling()  # 크롤링 시작
+    crawler.DataSort(processes=args.sort_processes)  # 데이터 정렬, 정제, 중복 제거 수행
@@ -1,7 +1,34 @@
+import hashlib
+import json
+
+# 임베딩 차원 (solar-embedding-1-large 원본) / HNSW 설정
+EMBEDDING_DIMENSION = 4096
+HNSW_PARAMETERS = {"ef_construction": 128, "m": 24}
+
+
+def knn_method(quantization=None):
+    """
+    양자화 방식에 맞는 knn_vector 엔진 / 설정 (embedding_reduce의 양자화 이름과 같음)
+    - None: nmslib float32, float16: faiss SQ fp16 인코더, int8: lucene byte 벡터
+    """
+    if quantization == 'float16':
+        parameters = dict(HNSW_PARAMETERS, encoder={"name": "sq", "parameters": {"type": "fp16"}})
+        return {"engine": "faiss", "name": "hnsw", "space_type": "l2", "parameters": parameters}, {}
+    if quantization == 'int8':
+        return {"engine": "lucene", "name": "hnsw", "space_type": "l2", "parameters": HNSW_PARAMETERS}, \
+            {"data_type": "byte"}
+    if quantization is not None:
+        raise ValueError(f"지원하지 않는 양자화 방식입니다: {quantization}")
+    return {"engine": "nmslib", "name": "hnsw", "space_type": "l2", "parameters": HNSW_PARAMETERS}, {}
+
+
 class CreateOpensearch:
-    # 1. 인덱스 생성 
-    def create_index(self,client, index_name):
+    # 1. 인덱스 생성 (인덱스가 없거나 매핑이 바뀐 경우에만 삭제 후 다시 생성, 생성했으면 True 반환)
+    # - dimension: spec_emb 차원 (embedding_reduce로 축소한 벡터를 넣으면 축소 차원)
+    # - quantization: None(float32) / 'float16' / 'int8'
+    def create_index(self,client, index_name, dimension=EMBEDDING_DIMENSION, quantization=None):
 
+        method, vector_options = knn_method(quantization)
         mapping = {
         "settings": {
             "index": {
@@ -15,22 +42,23 @@ class CreateOpensearch:
                 "product_spec": {"type": "text"},
                 "spec_emb": {
                     "type": "knn_vector",
-                    "dimension": 4096,
-                    "method": {
-                        "engine": "nmslib",
-                        "name": "hnsw",
-                        "space_type": "l2",
-                        "parameters": {
-                            "ef_construction": 128,
-                            "m": 24
-                        }
-                    }
+                    "dimension": dimension,
+                    "method": method,
+                    **vector_options
                 },
             }
         }
     }
+        # 매핑 서명을 _meta에 넣어 두고, 같은 매핑의 인덱스가 이미 있으면 그대로 둠 (적재한 문서 유지)
+        signature = hashlib.sha256(json.dumps(mapping, sort_keys=True).encode('utf-8')).hexdigest()
+        mapping["mappings"]["_meta"] = {"mapping_signature": signature}
         if client.indices.exists(index=index_name):
+            current = client.indices.get_mapping(index=index_name).get(index_name, {}).get('mappings', {})
+            if current.get('_meta', {}).get('mapping_signature') == signature:
+                print(f"'{index_name}' 인덱스가 이미 같은 매핑으로 있습니다 (유지).")
+                return False
             client.indices.delete(index=index_name)
 
         client.indices.create(index=index_name, body=mapping)
-        print(f"'{index_name}' 인덱스 생성 완료.")
\ No newline at end of file
+        print(f"'{index_name}' 인덱스 생성 완료 (spec_emb {dimension}차원, {quantization or 'float32'}).")
+        return True
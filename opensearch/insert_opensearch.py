@@ -1,8 +1,9 @@
 import os
+import sys
 import pandas as pd
 from dotenv import load_dotenv
 from opensearchpy import OpenSearch
-from create_opensearch import CreateOpensearch
+from create_opensearch import CreateOpensearch, EMBEDDING_DIMENSION
 from glob import glob
 import urllib3
 import ast
@@ -10,7 +11,13 @@ import time
 from datetime import datetime
 import logging
 import json
-from opensearchpy.helpers import bulk
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from crawl_output import LoadedInputs
+from data_store import data_files, read_products, embedding_list
+from embedding_store import EmbeddingStore, has_embedding_store, embedding_store_paths
+from embedding_reduce import EmbeddingReducer
+from similar_products import ProductIdMap, PRODUCT_IDS_FILE
+from opensearch_bulk import BulkIndexer, format_bulk_stats, BULK_THREADS, BULK_MAX_CHUNK_BYTES
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 
 # 로그 설정
@@ -47,19 +54,108 @@ client = OpenSearch(
     verify_certs=False,
     timeout=30,
     max_retries=10,
-    retry_on_timeout=True
+    retry_on_timeout=True,
+    pool_maxsize=BULK_THREADS  # 벌크 스레드마다 연결 하나
 )
 
 # 인덱스 이름 통일
 INDEX_NAME = "product"
+
+# crawl_data 폴더의 모든 데이터 파일(CSV / Parquet) 경로 가져오기
+DATA_PATH = r'C:\dev\ZeroMoa\ZeroMoa\crawl_data'  # 절대 경로로 수정
+
+# 차원 축소 / 양자화 설정 파일 (test/reduce_embeddings.py --apply로 생성, None이면 4096차원 float32 그대로 적재)
+# 예: os.path.join(DATA_PATH, 'state', 'embedding_reducer.npz')
+EMBEDDING_REDUCER = None
+reducer = EmbeddingReducer.load(EMBEDDING_REDUCER) if EMBEDDING_REDUCER else None
+embedding_dim = reducer.dim if reducer is not None else EMBEDDING_DIMENSION
+
+file_paths = data_files(DATA_PATH)
+
+# 매니페스트(SHA-256)가 지난번 적재 때와 같은 파일은 건너뜀 (False이면 모든 파일 적재)
+SKIP_UNCHANGED_INPUTS = True
+loaded_inputs = LoadedInputs(os.path.join(DATA_PATH, 'state', f'loaded_{INDEX_NAME}.json'))
+
+# 벌크 적재: 동시 요청 수 / 요청당 최대 바이트 수 (거부된 문서는 백오프로 다시 보냄)
+bulk_indexer = BulkIndexer(client, thread_count=BULK_THREADS, max_chunk_bytes=BULK_MAX_CHUNK_BYTES, logger=logger)
+
+# 파일별 product_no 범위 기록 (similar_products.py가 임베딩 저장소 행과 product_no를 연결할 때 사용)
+product_ids = ProductIdMap(os.path.join(DATA_PATH, 'state', PRODUCT_IDS_FILE.format(index=INDEX_NAME)))
+
+# 인덱스가 없거나 매핑(차원 / 양자화)이 바뀐 경우에만 다시 생성
+# 다시 생성했으면 적재 기록 / product_no 범위 기록을 비워 모든 파일을 처음부터 다시 적재
 create_opensearch = CreateOpensearch()
-create_opensearch.create_index(client, INDEX_NAME)
+if create_opensearch.create_index(client, INDEX_NAME, dimension=embedding_dim,
+                                  quantization=reducer.quantization if reducer is not None else None):
+    loaded_inputs.loaded.clear()
+    loaded_inputs.save()
+    product_ids.ranges.clear()
+    product_ids.save()
+
 
-# crawl_data 폴더의 모든 CSV 파일 경로 가져오기
-file_paths = glob(r'C:\dev\ZeroMoa\ZeroMoa\crawl_data\*.csv')  # 절대 경로로 수정
+def embeddings_updated(file_path):
+    """
+    지난번 적재 이후 임베딩 저장소가 다시 기록됐는지 확인하는 함수 (데이터 파일이 같아도 다시 적재)
+    """
+    previous = loaded_inputs.loaded.get(os.path.basename(file_path))
+    if previous is None or not has_embedding_store(file_path):
+        return False
+    index_mtime = os.path.getmtime(embedding_store_paths(file_path)[1])
+    return index_mtime > datetime.fromisoformat(previous['loaded_at']).timestamp()
+
+
+def file_documents(file_path, df, embedding_store, file_start_id):
+    """
+    데이터 파일의 행마다 OpenSearch 문서를 만드는 생성기 (문서 준비에 실패한 행도 product_no 번호를 차지)
+    """
+    for idx, row in df.iterrows():
+        product_no = file_start_id + idx
+        try:
+            document = {
+                "_index": INDEX_NAME,
+                "_id": str(product_no),
+                "_source": {
+                    "product_no": product_no,
+                    "product_name": row['Name'],
+                    "product_spec": row['Spec'] if pd.notna(row['Spec']) else "",
+                    "spec_emb": None
+                }
+            }
+
+            if embedding_store is not None:
+                vector = embedding_store.get(idx)
+                if vector is not None and reducer is not None and len(vector) == reducer.components.shape[0]:
+                    vector = reducer.encode(vector[None, :])[0]
+                if vector is not None and len(vector) == embedding_dim:
+                    document['_source']['spec_emb'] = vector.tolist()
+            elif 'embedding' in df.columns:
+                try:
+                    embedding_data = embedding_list(row['embedding'])
+                    if reducer is not None and isinstance(embedding_data, list) and \
+                       len(embedding_data) == reducer.components.shape[0]:
+                        embedding_data = reducer.encode([embedding_data])[0].tolist()
+                    if isinstance(embedding_data, list) and \
+                       all(isinstance(x, (int, float)) for x in embedding_data) and \
+                       len(embedding_data) == embedding_dim:
+                        document['_source']['spec_emb'] = embedding_data
+                except Exception as e:
+                    logger.error(f"파일: {file_path}, 행 {idx}: embedding 변환 실패 - {str(e)}")
+
+            yield document
+
+        except Exception as e:
+            logger.error(f"문서 준비 중 오류 발생: {str(e)}")
+
+
+if SKIP_UNCHANGED_INPUTS:
+    skipped_files = [file_path for file_path in file_paths
+                     if loaded_inputs.unchanged(file_path) and not embeddings_updated(file_path)]
+    for file_path in skipped_files:
+        print(f"변경 없음, 건너뜀: {os.path.basename(file_path)}")
+    file_paths = [file_path for file_path in file_paths if file_path not in skipped_files]
 
 if not file_paths:
-    print("처리할 CSV 파일을 찾을 수 없습니다.")
+    print("처리할 데이터 파일을 찾을 수 없습니다.")
     exit()
 
 print(f"\n총 {len(file_paths)}개의 CSV 파일이 발견되었습니다.")
@@ -81,6 +177,8 @@ try:
 except Exception as e:
     print(f"마지막 문서 번호 확인 중 오류 발생: {str(e)}")
     current_id = 1
+# 건너뛴 파일의 product_no 범위와 겹치지 않도록 기록된 범위 뒤에서 시작
+current_id = max([current_id] + [entry['start'] + entry['rows'] for entry in product_ids.ranges.values()])
 
 print(f"시작 문서 번호: {current_id}")
 
@@ -92,53 +190,42 @@ for file_path in file_paths:
     print(f"\n파일 '{os.path.basename(file_path)}' 처리 시작")
     
     try:
-        df = pd.read_csv(file_path, encoding='utf-8')
+        # 임베딩 저장소(.npy)가 있으면 memmap으로 열어 행마다 읽고, 없으면 임베딩 열(JSON 문자열)을 읽음
+        # (축소 설정이 있으면 미리 축소해 둔 저장소를 우선 사용하고, 없으면 원본 벡터를 읽을 때 축소)
+        if reducer is not None and has_embedding_store(file_path, reducer.name):
+            embedding_store = EmbeddingStore(file_path, reducer.name)
+        else:
+            embedding_store = EmbeddingStore(file_path) if has_embedding_store(file_path) else None
+        columns = ['Name', 'Spec'] if embedding_store is not None else ['Name', 'Spec', 'embedding']
+        df = read_products(file_path, columns=columns)
         print(f"파일 '{os.path.basename(file_path)}'에서 {len(df)} 개의 행을 읽었습니다.")
+        if embedding_store is not None and len(embedding_store) != len(df):
+            logger.error(f"파일: {file_path}: 임베딩 저장소 행 수가 다릅니다 ({len(embedding_store)} != {len(df)})")
+            embedding_store = None
         
-        # 벌크 작업을 위한 문서 리스트
-        bulk_docs = []
-        
-        for idx, row in df.iterrows():
-            try:
-                document = {
-                    "_index": INDEX_NAME,
-                    "_id": str(current_id),
-                    "_source": {
-                        "product_no": current_id,
-                        "product_name": row['Name'],
-                        "product_spec": row['Spec'] if pd.notna(row['Spec']) else "",
-                        "spec_emb": None
-                    }
-                }
+        # 다시 적재하는 파일은 지난번 product_no 범위의 문서를 먼저 지움 (행 수가 바뀌어도 옛 문서가 남지 않도록)
+        previous = product_ids.ranges.get(os.path.basename(file_path))
+        if previous is not None:
+            client.delete_by_query(index=INDEX_NAME, refresh=True, body={
+                "query": {"range": {"product_no": {"gte": previous['start'],
+                                                   "lt": previous['start'] + previous['rows']}}}})
+
+        # 문서 생성기를 그대로 병렬 벌크 적재 (행 번호 idx의 product_no는 시작 번호 + idx)
+        file_start_id = current_id
+        stats = bulk_indexer.index(file_documents(file_path, df, embedding_store, file_start_id),
+                                   os.path.basename(file_path))
+        print(format_bulk_stats(stats))
 
-                if 'embedding' in df.columns and not pd.isna(row['embedding']):
-                    try:
-                        embedding_data = json.loads(row['embedding'])
-                        if isinstance(embedding_data, list) and \
-                           all(isinstance(x, (int, float)) for x in embedding_data) and \
-                           len(embedding_data) == 4096:
-                            document['_source']['spec_emb'] = embedding_data
-                    except Exception as e:
-                        logger.error(f"파일: {file_path}, 행 {idx}: embedding 변환 실패 - {str(e)}")
-
-                bulk_docs.append(document)
-                current_id += 1
-
-                # 2500개 문서마다 벌크 삽입 실행
-                if len(bulk_docs) >= 2500:
-                    success, failed = bulk(client, bulk_docs)
-                    logger.info(f"{success}개 문서 벌크 인덱싱 완료")
-                    bulk_docs = []
-
-            except Exception as e:
-                logger.error(f"문서 준비 중 오류 발생: {str(e)}")
-
-        # 남은 문서들 처리
-        if bulk_docs:
-            success, failed = bulk(client, bulk_docs)
-            logger.info(f"{success}개 문서 벌크 인덱싱 완료")
-
-        completed_files.append(os.path.basename(file_path))
+        current_id = file_start_id + len(df)
+        product_ids.record(file_path, file_start_id, len(df))
+        product_ids.save()
+        if stats['failed']:
+            # 적재 완료로 기록하지 않아 다음 실행에서 파일을 다시 적재
+            logger.error(f"파일: {file_path}: 적재 실패 문서 {stats['failed']}개")
+        else:
+            completed_files.append(os.path.basename(file_path))
+            loaded_inputs.mark(file_path)
+            loaded_inputs.save()
 
     except Exception as e:
         logger.error(f"파일 처리 중 오류 발생: {str(e)}")
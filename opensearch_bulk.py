@@ -0,0 +1,138 @@
+# OpenSearch 병렬 벌크 적재 (opensearchpy.helpers.parallel_bulk)
+# - 문서 생성기(generator)를 그대로 받아 여러 스레드(thread_count)로 _bulk 요청을 동시에 보냅니다.
+#   (클라이언트의 연결 풀 크기 pool_maxsize를 thread_count 이상으로 만들어야 연결을 재사용함)
+#   문서를 리스트로 모으지 않으므로 파일이 커도 메모리에는 보내는 중인 요청 몇 개만 남습니다.
+# - 요청 하나는 문서 수(chunk_size)와 바이트 수(max_chunk_bytes) 중 먼저 닿는 한도에서 끊습니다.
+#   (4096차원 임베딩 문서는 JSON으로 문서당 수십 KB라 바이트 한도가 요청 크기를 정함)
+# - 문서는 생성기에서 꺼낼 때 한 번만 JSON으로 직렬화하고, 거부된 문서를 다시 보낼 때 그 문자열을 재사용합니다.
+# - 거부된 문서(429 es_rejected_execution_exception, 5xx, 연결 오류)는 스트림이 끝난 뒤 지수 백오프(+ 지터)로
+#   max_retries번까지 다시 보냅니다. 매핑 오류(400) 등은 바로 실패로 기록합니다.
+#   (응답 항목을 _id로 원래 문서와 연결하므로 재시도하려면 한 번의 호출 안에서 _id가 겹치지 않아야 함)
+# - 파일(호출)마다 문서 수 / 바이트 수 / 처리량(문서/초, MB/초)을 로그로 남깁니다.
+# - test/opensearch_bulk_stub_server.py: _bulk 프로토콜을 흉내 내는 로컬 서버로 확인 / 성능 측정
+
+import logging
+import random
+from time import monotonic, sleep
+
+from opensearchpy.helpers import parallel_bulk, expand_action
+
+# 동시에 보내는 요청 수 / 대기열에 쌓아 두는 요청 수
+BULK_THREADS = 4
+BULK_QUEUE_SIZE = 4
+
+# 요청당 최대 문서 수 / 바이트 수 (OpenSearch 기본 http.max_content_length는 100MB)
+BULK_CHUNK_DOCS = 500
+BULK_MAX_CHUNK_BYTES = 20 * 1024 * 1024
+
+# 거부된 문서 재시도 횟수 / 백오프 시작 대기 시간(초) / 최대 대기 시간(초)
+BULK_MAX_RETRIES = 5
+BULK_BACKOFF = 2.0
+BULK_BACKOFF_MAX = 60.0
+
+# 다시 보낼 상태 코드 ('N/A'는 opensearchpy가 연결 오류 / 타임아웃에 붙이는 값)
+RETRY_STATUSES = (429, 502, 503, 504, 'N/A')
+
+
+def new_bulk_stats():
+    return {'docs': 0, 'indexed': 0, 'rejected': 0, 'retried': 0, 'failed': 0, 'bytes': 0, 'elapsed': 0.0}
+
+
+class BulkIndexer:
+    """
+    문서 생성기를 parallel_bulk로 적재하고 거부된 문서를 백오프로 다시 보내는 클래스
+    """
+
+    def __init__(self, client, thread_count=BULK_THREADS, chunk_size=BULK_CHUNK_DOCS,
+                 max_chunk_bytes=BULK_MAX_CHUNK_BYTES, queue_size=BULK_QUEUE_SIZE, max_retries=BULK_MAX_RETRIES,
+                 backoff=BULK_BACKOFF, backoff_max=BULK_BACKOFF_MAX, logger=None):
+        self.client = client
+        self.thread_count = thread_count
+        self.chunk_size = chunk_size
+        self.max_chunk_bytes = max_chunk_bytes
+        self.queue_size = queue_size
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.backoff_max = backoff_max
+        self.logger = logger or logging.getLogger(__name__)
+        self.stats = new_bulk_stats()
+
+    def _serialize(self, actions, stats):
+        """
+        문서를 (action 줄, 직렬화한 문서 줄)로 바꾸는 생성기 (parallel_bulk의 작업 공급 스레드에서 실행됨)
+        """
+        serializer = self.client.transport.serializer
+        for document in actions:
+            action, data = expand_action(document)
+            if data is not None:
+                data = serializer.dumps(data)
+                stats['bytes'] += len(data.encode('utf-8'))
+            stats['docs'] += 1
+            yield action, data
+
+    def _send(self, pairs, stats):
+        """
+        (action, 문서) 목록을 parallel_bulk로 보내고 다시 보낼 항목 목록을 반환하는 메서드
+        """
+        in_flight = {}
+
+        def track(pairs):
+            for pair in pairs:
+                _, action = next(iter(pair[0].items()))
+                if '_id' in action:
+                    in_flight[str(action['_id'])] = pair
+                yield pair
+
+        retry = []
+        for ok, item in parallel_bulk(self.client, track(pairs), thread_count=self.thread_count,
+                                      chunk_size=self.chunk_size, max_chunk_bytes=self.max_chunk_bytes,
+                                      queue_size=self.queue_size, expand_action_callback=lambda pair: pair,
+                                      raise_on_error=False, raise_on_exception=False):
+            _, info = next(iter(item.items()))
+            pair = in_flight.pop(str(info.get('_id')), None)
+            if ok:
+                stats['indexed'] += 1
+            elif info.get('status') in RETRY_STATUSES and pair is not None:
+                stats['rejected'] += 1
+                retry.append(pair)
+            else:
+                stats['failed'] += 1
+                self.logger.error(f"문서 {info.get('_id')} 적재 실패 ({info.get('status')}): {info.get('error')}")
+        return retry
+
+    def index(self, actions, label=''):
+        """
+        문서 생성기(또는 목록)를 적재하고 이번 호출의 통계를 반환하는 메서드
+        """
+        stats = new_bulk_stats()
+        start_time = monotonic()
+        retry = self._send(self._serialize(actions, stats), stats)
+        for attempt in range(self.max_retries):
+            if not retry:
+                break
+            delay = min(self.backoff * (2 ** attempt), self.backoff_max) * random.uniform(0.5, 1.0)
+            self.logger.warning(f"{label}: 거부된 문서 {len(retry)}개, {delay:.1f}초 후 다시 보냄 ({attempt + 1}번째)")
+            sleep(delay)
+            stats['retried'] += len(retry)
+            retry = self._send(retry, stats)
+        if retry:
+            stats['failed'] += len(retry)
+            self.logger.error(f"{label}: 재시도 {self.max_retries}번 후에도 거부된 문서 {len(retry)}개")
+        stats['elapsed'] = monotonic() - start_time
+
+        for key, value in stats.items():
+            self.stats[key] += value
+        self.logger.info(format_bulk_stats(stats, label))
+        return stats
+
+
+def format_bulk_stats(stats, label=''):
+    """
+    벌크 적재 요약 문자열을 만드는 함수
+    """
+    elapsed = stats['elapsed'] or 1e-9
+    megabytes = stats['bytes'] / 1024 / 1024
+    prefix = f"{label}: " if label else ''
+    return (f"{prefix}문서 {stats['docs']}개 (성공 {stats['indexed']}, 거부 {stats['rejected']}, "
+            f"재시도 {stats['retried']}, 실패 {stats['failed']}), {megabytes:.1f}MB, {stats['elapsed']:.1f}초, "
+            f"{stats['docs'] / elapsed:,.0f} 문서/초, {megabytes / elapsed:.1f} MB/초")
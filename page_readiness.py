@@ -0,0 +1,137 @@
+# Selenium 목록 페이지 준비 상태 감지
+# - 고정 sleep / implicit wait 대신 실제 DOM 변화로 목록 갱신 완료를 판단합니다.
+#   (첫 제품 링크 또는 제품 수가 바뀌었거나, 로딩 커버가 나타났다가 사라졌을 때)
+# - XHR 완료 횟수는 광고 / 분석 / 이미지 요청에도 늘어나므로 완료 신호로 쓰지 않고 힌트로만 씁니다.
+#   (목록이 그대로인 채 타임아웃이 나도 XHR 응답이 있었으면 페이지는 응답한 것이므로 타임아웃을 늘리지 않음)
+# - 타임아웃은 관측한 대기 시간으로 조정합니다 (TCP 재전송 타임아웃처럼 평균 + 4 × 편차).
+# - 카테고리별로 대기에 쓴 시간을 기록해 추출 시간과 비교할 수 있게 합니다.
+
+from time import monotonic
+
+from selenium.common.exceptions import TimeoutException
+from selenium.webdriver.support.ui import WebDriverWait
+
+# 목록 대기 타임아웃(초) 초기값 / 최솟값 / 최댓값
+LIST_TIMEOUT_INITIAL = 10.0
+LIST_TIMEOUT_MIN = 2.0
+LIST_TIMEOUT_MAX = 30.0
+
+# DOM 상태 확인 간격(초)
+POLL_INTERVAL = 0.05
+
+# 목록 상태: [첫 제품 링크, 제품 수, 로딩 커버 표시 여부, XHR 완료 횟수]
+# - 처음 실행할 때 페이지의 XHR 완료 횟수를 세는 훅을 설치합니다.
+LIST_STATE_SCRIPT = """
+if (!window.__crawlerXhrHook) {
+    window.__crawlerXhrHook = true;
+    window.__crawlerXhrDone = 0;
+    var send = XMLHttpRequest.prototype.send;
+    XMLHttpRequest.prototype.send = function () {
+        this.addEventListener('loadend', function () { window.__crawlerXhrDone += 1; });
+        return send.apply(this, arguments);
+    };
+}
+var items = document.getElementsByClassName('prod_main_info');
+var first = items.length ? items[0].querySelector('p[class="prod_name"] > a') : null;
+var cover = document.querySelector('.product_list_cover');
+var coverVisible = !!cover && window.getComputedStyle(cover).display !== 'none' && cover.offsetParent !== null;
+return [first ? first.href : '', items.length, coverVisible, window.__crawlerXhrDone || 0];
+"""
+
+
+class AdaptiveTimeout:
+    """
+    관측한 대기 시간의 평균과 편차로 타임아웃을 정하는 클래스 (평균 + 4 × 편차, 최솟값~최댓값)
+    """
+    def __init__(self, initial=LIST_TIMEOUT_INITIAL, minimum=LIST_TIMEOUT_MIN, maximum=LIST_TIMEOUT_MAX):
+        self.minimum = minimum
+        self.maximum = maximum
+        self.value = initial
+        self.mean = None
+        self.deviation = 0.0
+
+    def observe(self, seconds):
+        if self.mean is None:
+            self.mean = seconds
+            self.deviation = seconds / 2
+        else:
+            self.deviation = 0.75 * self.deviation + 0.25 * abs(self.mean - seconds)
+            self.mean = 0.875 * self.mean + 0.125 * seconds
+        self.value = min(self.maximum, max(self.minimum, self.mean + 4 * self.deviation))
+
+    def expired(self):
+        """
+        타임아웃이 난 경우 다음 대기는 두 배까지 기다리도록 늘리는 메서드
+        """
+        self.value = min(self.maximum, self.value * 2)
+
+
+class PageReadiness:
+    """
+    목록 페이지의 로딩 / 갱신 완료를 기다리는 클래스 (카테고리마다 생성, 타임아웃은 세션에서 공유)
+    """
+    def __init__(self, browser, timeout=None):
+        self.browser = browser
+        self.timeout = timeout or AdaptiveTimeout()
+        self.wait_time = 0.0
+        self.waits = 0
+        self.timeouts = 0
+
+    def state(self):
+        """
+        현재 목록 상태를 반환하는 메서드 (XHR 훅이 없으면 설치)
+        """
+        return self.browser.execute_script(LIST_STATE_SCRIPT)
+
+    def wait_for_list(self):
+        """
+        제품 목록이 있고 로딩 커버가 사라질 때까지 기다리는 메서드
+        """
+        return self._wait(lambda state: state[1] > 0 and not state[2], learn=False)
+
+    def wait_for_change(self, before):
+        """
+        클릭 등으로 목록 갱신을 시작한 뒤, 목록이 바뀌고(또는 로딩 커버가 나타났다가) 로딩 커버가 사라질 때까지 기다리는 메서드
+        - before: 갱신을 시작하기 전에 state()로 얻은 상태
+        """
+        cover_seen = [False]
+
+        def refreshed(state):
+            cover_seen[0] = cover_seen[0] or state[2]
+            changed = state[0] != before[0] or state[1] != before[1]
+            return (changed or cover_seen[0]) and state[1] > 0 and not state[2]
+        return self._wait(refreshed, learn=True, responded=lambda state: state[3] > before[3])
+
+    def wait_for_element(self, by, value):
+        """
+        요소가 나타날 때까지 기다렸다가 반환하는 메서드
+        """
+        start_time = monotonic()
+        try:
+            return WebDriverWait(self.browser, self.timeout.value, poll_frequency=POLL_INTERVAL).until(
+                lambda browser: browser.find_element(by, value))
+        finally:
+            self.wait_time += monotonic() - start_time
+            self.waits += 1
+
+    def _wait(self, condition, learn, responded=None):
+        """
+        condition(state)이 참이 될 때까지 기다리는 메서드 (타임아웃이면 False, 예외 없이 계속 진행)
+        - learn이 True이면 걸린 시간을 타임아웃 조정에 반영합니다 (목록 갱신 대기만 반영).
+        - 타임아웃일 때 responded(state)가 참이면(페이지는 응답함) 다음 타임아웃을 늘리지 않습니다.
+        """
+        start_time = monotonic()
+        try:
+            WebDriverWait(self.browser, self.timeout.value, poll_frequency=POLL_INTERVAL).until(
+                lambda browser: condition(self.state()))
+            if learn:
+                self.timeout.observe(monotonic() - start_time)
+            return True
+        except TimeoutException:
+            self.timeouts += 1
+            if responded is None or not responded(self.state()):
+                self.timeout.expired()
+            return False
+        finally:
+            self.wait_time += monotonic() - start_time
+            self.waits += 1
@@ -0,0 +1,264 @@
+# 비슷한 제품 목록 미리 계산 (전체 제품 kNN 배치 작업)
+# - 데이터 파일별 임베딩 저장소를 product_no 순서로 모아 정규화한 float32 행렬(memmap)을 만들고,
+#   질의 묶음(query_rows행) x 행렬 블록의 행렬 곱(vector_search.ExactIndex, 내적 = 코사인 유사도)으로
+#   모든 제품의 상위 k개 이웃을 한 번에 계산합니다. 행렬 곱은 BLAS가 여러 스레드로 처리합니다.
+# - 결과 표: <이름>.products.npy(product_no, int32, 오름차순) / <이름>.ids.npy(이웃 product_no, int32, N x k)
+#   / <이름>.scores.npy(코사인 유사도, float16, N x k) / <이름>.json(설정, 행 수, 생성 시각, 마지막에 기록)
+# - 증분 갱신: 새 제품은 전체 이웃을 계산하고, 기존 제품은 새 제품과의 유사도만 계산해 기존 목록과 합칩니다.
+#   삭제된 제품을 이웃으로 가진 행만 다시 계산합니다. (임베딩이 바뀐 제품은 build()로 전체를 다시 계산, test/build_similar_products.py --full)
+# - product_no: insert_opensearch.py가 파일마다 (시작 번호, 행 수)를 state/product_ids_<인덱스>.json에 기록하고
+#   행 번호 i의 product_no는 시작 번호 + i입니다. 기록이 없으면 data_files 순서로 1부터 매깁니다(새 인덱스와 같음).
+
+import json
+import os
+from datetime import datetime
+from time import monotonic
+
+import numpy as np
+
+from embedding_store import EmbeddingStore, write_npy
+from vector_search import ExactIndex, METRIC_IP, merge_top_k, finish_top_k
+
+# 제품당 이웃 수 / 한 번에 계산하는 질의 제품 수
+SIMILAR_K = 20
+SIMILAR_QUERY_ROWS = 2048
+
+# 결과 표 파일 이름 (state 디렉토리 아래)
+SIMILAR_TABLE_NAME = 'similar_products'
+PRODUCT_IDS_FILE = 'product_ids_{index}.json'
+
+# 이웃이 없는 자리의 product_no / 점수
+NO_NEIGHBOR = -1
+
+
+class ProductIdMap:
+    """
+    데이터 파일별 product_no 범위 기록 (insert_opensearch.py가 적재하면서 기록)
+    - record(path, start, rows): 파일의 행 i에 start + i를 부여했음을 기록 (save()에서 저장)
+    - ids(path, rows): 파일 행마다 product_no 배열 (기록이 없으면 None)
+    """
+    def __init__(self, state_path):
+        self.state_path = state_path
+        self.ranges = {}
+        if os.path.exists(state_path):
+            with open(state_path, 'r', encoding='utf-8') as f:
+                self.ranges = json.load(f)
+
+    def record(self, path, start, rows):
+        self.ranges[os.path.basename(path)] = {'start': int(start), 'rows': int(rows)}
+
+    def ids(self, path, rows):
+        entry = self.ranges.get(os.path.basename(path))
+        if entry is None or entry['rows'] != rows:
+            return None
+        return np.arange(entry['start'], entry['start'] + rows, dtype=np.int64)
+
+    def save(self):
+        os.makedirs(os.path.dirname(os.path.abspath(self.state_path)), exist_ok=True)
+        temp_path = self.state_path + '.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.ranges, f, ensure_ascii=False, indent=2)
+        os.replace(temp_path, self.state_path)
+
+
+def collect_embeddings(data_paths, id_map, matrix_path, block_rows=SIMILAR_QUERY_ROWS):
+    """
+    데이터 파일들의 임베딩을 product_no 오름차순으로 모아 단위 벡터로 정규화한 memmap 행렬을 만드는 함수
+    - 반환: (product_no 배열(int64), 행렬 memmap) / 임베딩이 없는 행은 제외
+    - id_map에 기록이 없는 파일은 앞 파일 다음 번호부터 순서대로 매김 (기록이 없으면 1부터)
+    """
+    stores = []
+    next_id = 1
+    for path in data_paths:
+        store = EmbeddingStore(path)
+        ids = id_map.ids(path, len(store)) if id_map is not None else None
+        if ids is None:
+            ids = np.arange(next_id, next_id + len(store), dtype=np.int64)
+        next_id = int(ids[-1]) + 1 if len(ids) else next_id
+        valid = store.valid
+        stores.append((store, ids[valid], np.asarray(store.index)[valid]))
+    dims = {store.dim for store, _, positions in stores if len(positions)}
+    if len(dims) > 1:
+        raise ValueError(f"임베딩 차원이 파일마다 다릅니다: {sorted(dims)}")
+    dim = dims.pop() if dims else 0
+
+    products = np.concatenate([ids for _, ids, _ in stores]) if stores else np.zeros(0, dtype=np.int64)
+    order = np.argsort(products, kind='stable')
+    products = products[order]
+    if len(products) and (np.diff(products) == 0).any():
+        raise ValueError("product_no가 중복됩니다 (product_ids 기록 확인)")
+    # 정렬 후 위치 → (파일 번호, 행렬 행 번호)
+    sources = np.concatenate([np.full(len(ids), number) for number, (_, ids, _) in enumerate(stores)]
+                             or [np.zeros(0, dtype=np.int64)])[order]
+    positions = np.concatenate([positions for _, _, positions in stores] or [np.zeros(0, dtype=np.int64)])[order]
+
+    os.makedirs(os.path.dirname(os.path.abspath(matrix_path)), exist_ok=True)
+    temp_path = matrix_path + '.tmp'
+    matrix = np.lib.format.open_memmap(temp_path, mode='w+', dtype=np.float32, shape=(len(products), dim))
+    for start in range(0, len(products), block_rows):
+        end = min(start + block_rows, len(products))
+        block = np.empty((end - start, dim), dtype=np.float32)
+        for number, (store, _, _) in enumerate(stores):
+            selected = np.flatnonzero(sources[start:end] == number)
+            if len(selected):
+                wanted = positions[start:end][selected]
+                rank = np.argsort(wanted)
+                rows = np.empty_like(block[selected])
+                rows[rank] = store.matrix[wanted[rank]]  # memmap은 정렬된 순서로 읽음
+                block[selected] = rows
+        norms = np.linalg.norm(block, axis=1, keepdims=True)
+        matrix[start:end] = block / np.where(norms > 0, norms, 1)
+    matrix.flush()
+    del matrix
+    os.replace(temp_path, matrix_path)
+    return products, np.load(matrix_path, mmap_mode='r')
+
+
+def new_similar_stats():
+    return {'products': 0, 'new': 0, 'removed': 0, 'recomputed': 0, 'merged': 0, 'changed': 0, 'elapsed': 0.0}
+
+
+class SimilarProductsTable:
+    """
+    product_no별 상위 k개 비슷한 제품 표
+    - build(products, matrix): 모든 제품의 이웃 계산 / update(products, matrix): 바뀐 제품과 영향받는 행만 계산
+    - neighbors(product_no): [(이웃 product_no, 유사도)] (가까운 순서)
+    - save() / load(): state 디렉토리의 .npy 파일(이웃 / 점수는 memmap으로 읽음)
+    """
+    def __init__(self, state_dir, name=SIMILAR_TABLE_NAME, k=SIMILAR_K, query_rows=SIMILAR_QUERY_ROWS):
+        self.state_dir = state_dir
+        self.name = name
+        self.k = k
+        self.query_rows = query_rows
+        self.products = np.zeros(0, dtype=np.int32)
+        self.ids = np.zeros((0, k), dtype=np.int32)
+        self.scores = np.zeros((0, k), dtype=np.float16)
+        self.stats = new_similar_stats()
+
+    def path(self, suffix):
+        return os.path.join(self.state_dir, f'{self.name}.{suffix}')
+
+    def exists(self):
+        return os.path.exists(self.path('json'))
+
+    def load(self):
+        with open(self.path('json'), 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+        self.k = meta['k']
+        self.products = np.load(self.path('products.npy'))
+        self.ids = np.load(self.path('ids.npy'), mmap_mode='r')
+        self.scores = np.load(self.path('scores.npy'), mmap_mode='r')
+        return self
+
+    def save(self):
+        os.makedirs(self.state_dir, exist_ok=True)
+        write_npy(self.path('products.npy'), self.products.astype(np.int32))
+        write_npy(self.path('ids.npy'), np.asarray(self.ids, dtype=np.int32))
+        write_npy(self.path('scores.npy'), np.asarray(self.scores, dtype=np.float16))
+        temp_path = self.path('json') + '.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump({'k': self.k, 'products': len(self.products), 'metric': 'cosine',
+                       'built_at': datetime.now().isoformat(timespec='seconds')}, f, ensure_ascii=False)
+        os.replace(temp_path, self.path('json'))
+
+    def neighbors(self, product_no):
+        position = np.searchsorted(self.products, product_no)
+        if position >= len(self.products) or self.products[position] != product_no:
+            return []
+        return [(int(neighbor), float(score)) for neighbor, score in zip(self.ids[position], self.scores[position])
+                if neighbor != NO_NEIGHBOR]
+
+    def _search(self, index, products, matrix, rows):
+        """
+        matrix의 rows행(오름차순)을 질의로 전체 이웃을 계산해 (이웃 product_no, 점수)를 반환하는 메서드 (자기 자신 제외)
+        """
+        ids = np.full((len(rows), self.k), NO_NEIGHBOR, dtype=np.int32)
+        scores = np.zeros((len(rows), self.k), dtype=np.float16)
+        for start in range(0, len(rows), self.query_rows):
+            batch = rows[start:start + self.query_rows]
+            found, found_scores = index.search(np.asarray(matrix[batch]), self.k, exclude=batch)
+            valid = found >= 0
+            ids[start:start + len(batch)] = np.where(valid, products[np.maximum(found, 0)], NO_NEIGHBOR)
+            scores[start:start + len(batch)] = np.where(valid, found_scores, 0)
+        return ids, scores
+
+    def build(self, products, matrix):
+        start_time = monotonic()
+        self.stats = new_similar_stats()
+        index = ExactIndex(matrix, METRIC_IP)
+        self.products = np.asarray(products, dtype=np.int32)
+        self.ids, self.scores = self._search(index, products, matrix, np.arange(len(products)))
+        self.stats.update(products=len(products), new=len(products), recomputed=len(products))
+        self.stats['elapsed'] += monotonic() - start_time
+        return self
+
+    def update(self, products, matrix):
+        """
+        기존 표를 현재 제품 목록으로 갱신하는 메서드
+        - 새 제품 / 삭제된 제품을 이웃으로 가진 제품: 전체 이웃을 다시 계산
+        - 나머지 기존 제품: 새 제품과의 유사도만 계산해 기존 상위 k개와 합침
+        """
+        if not len(self.products) or self.k != self.ids.shape[1]:
+            return self.build(products, matrix)
+        start_time = monotonic()
+        self.stats = new_similar_stats()
+        products = np.asarray(products, dtype=np.int64)
+        old_position = np.searchsorted(self.products, products)
+        old_position = np.minimum(old_position, len(self.products) - 1)
+        existing = self.products[old_position] == products
+        removed = np.setdiff1d(self.products, products)
+        new_rows = np.flatnonzero(~existing)
+
+        ids = np.full((len(products), self.k), NO_NEIGHBOR, dtype=np.int32)
+        scores = np.zeros((len(products), self.k), dtype=np.float16)
+        ids[existing] = self.ids[old_position[existing]]
+        scores[existing] = self.scores[old_position[existing]]
+        stale = existing & np.isin(ids, removed).any(axis=1)
+        recompute = np.flatnonzero(~existing | stale)
+        index = ExactIndex(matrix, METRIC_IP)
+        if len(recompute):
+            ids[recompute], scores[recompute] = self._search(index, products, matrix, recompute)
+
+        # 나머지 기존 제품: 새 제품 벡터와의 유사도만 계산해 합침
+        merge_rows = np.flatnonzero(existing & ~stale)
+        changed = 0
+        if len(new_rows) and len(merge_rows):
+            new_vectors = np.asarray(matrix[new_rows], dtype=np.float32)
+            for start in range(0, len(merge_rows), self.query_rows):
+                batch = merge_rows[start:start + self.query_rows]
+                batch_vectors = np.asarray(matrix[batch], dtype=np.float32)
+                similarities = batch_vectors @ new_vectors.T
+                take = min(self.k, len(new_rows))
+                candidates = np.argpartition(-similarities, take - 1, axis=1)[:, :take]
+                candidate_costs = -np.take_along_axis(similarities, candidates, 1)
+                # 저장된 점수는 float16이라 순위가 흔들리지 않도록 기존 이웃과의 유사도도 float32로 다시 계산
+                current_ids = ids[batch].astype(np.int64)
+                current_rows = np.searchsorted(products, np.maximum(current_ids, 0))
+                current_vectors = np.asarray(matrix[current_rows.ravel()], dtype=np.float32)
+                current_vectors = current_vectors.reshape(len(batch), self.k, -1)
+                current_costs = -np.einsum('bd,bkd->bk', batch_vectors, current_vectors)
+                current_costs[current_ids == NO_NEIGHBOR] = np.inf
+                merged_costs, merged_ids = merge_top_k(current_costs, current_ids, candidate_costs,
+                                                       products[new_rows][candidates], self.k)
+                merged_ids, merged_scores = finish_top_k(merged_costs, merged_ids, METRIC_IP)
+                merged_ids = np.where(merged_ids >= 0, merged_ids, NO_NEIGHBOR).astype(np.int32)
+                changed += int((merged_ids != ids[batch]).any(axis=1).sum())
+                ids[batch] = merged_ids
+                scores[batch] = np.where(merged_ids != NO_NEIGHBOR, merged_scores, 0)
+
+        self.products, self.ids, self.scores = products.astype(np.int32), ids, scores
+        self.stats.update(products=len(products), new=len(new_rows), removed=len(removed), recomputed=len(recompute),
+                          merged=len(merge_rows) if len(new_rows) else 0, changed=changed)
+        self.stats['elapsed'] += monotonic() - start_time
+        return self
+
+
+def format_similar_stats(stats):
+    """
+    비슷한 제품 표 생성 / 갱신 요약 문자열을 만드는 함수
+    """
+    elapsed = stats['elapsed'] or 1e-9
+    return (f"제품 {stats['products']}개 (새 제품 {stats['new']}개, 삭제 {stats['removed']}개), "
+            f"전체 이웃 계산 {stats['recomputed']}개, 새 제품과 합친 기존 제품 {stats['merged']}개 "
+            f"(목록이 바뀐 제품 {stats['changed']}개), {stats['elapsed']:.1f}초, "
+            f"{stats['recomputed'] / elapsed:,.0f} 제품/초")
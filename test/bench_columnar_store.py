@@ -0,0 +1,81 @@
+# CSV / Parquet 제품 데이터 저장 형식 벤치마크
+# - 합성 제품 데이터(제품명, 스펙, 이미지 경로, 임베딩)를 CSV(임베딩은 JSON 문자열)와
+#   Parquet(임베딩은 float32 고정 길이 리스트 열)으로 저장해 파일 크기와 읽기 시간을 비교합니다.
+# - 읽기: 전체 열 / 텍스트 열만 / 임베딩 행렬(N x dim float32)
+#
+# 사용법: python bench_columnar_store.py [행 수] [임베딩 차원]
+
+import os
+import sys
+import json
+import random
+import shutil
+import tempfile
+from time import perf_counter
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from data_store import write_products, read_products, read_embeddings, TEXT_COLUMNS
+
+SPEC_WORDS = ['건강기능식품', '홍삼', '비타민C', '1000mg', '60정', '2개월분', '[영양정보]', '열량 10kcal',
+              '탄수화물 2g', '단백질 0g', '지방 0g', '나트륨 5mg', '1회 제공량 2g', '캡슐', '분말', '액상']
+
+
+def synthetic_products(rows, dim, seed=0):
+    rng = random.Random(seed)
+    names = [f"테스트 제품 {i} {rng.choice(SPEC_WORDS)} {rng.randint(1, 999)}정" for i in range(rows)]
+    specs = [' / '.join(rng.choice(SPEC_WORDS) for _ in range(rng.randint(8, 30))) for _ in range(rows)]
+    images = [f"C:\\dev\\crawl_data\\images\\카테고리\\테스트 제품 {i}.jpg" for i in range(rows)]
+    embeddings = np.random.default_rng(seed).standard_normal((rows, dim)).astype(np.float32)
+    return pd.DataFrame({'Name': names, 'Spec': specs, 'ImageURL': images}), embeddings
+
+
+def timed(func, repeat=3):
+    best = None
+    for _ in range(repeat):
+        start = perf_counter()
+        result = func()
+        elapsed = perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+if __name__ == '__main__':
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    dim = int(sys.argv[2]) if len(sys.argv) > 2 else 256
+
+    df, embeddings = synthetic_products(rows, dim)
+    out_dir = tempfile.mkdtemp()
+    csv_path = os.path.join(out_dir, 'products.csv')
+    parquet_path = os.path.join(out_dir, 'products.parquet')
+    try:
+        start = perf_counter()
+        csv_df = df.copy()
+        csv_df['embedding'] = [json.dumps(vector.tolist()) for vector in embeddings]
+        csv_df.to_csv(csv_path, index=False, encoding='utf-8-sig')
+        csv_write = perf_counter() - start
+
+        start = perf_counter()
+        write_products(parquet_path, df, embeddings=embeddings)
+        parquet_write = perf_counter() - start
+
+        results = []
+        for label, path in (('CSV', csv_path), ('Parquet', parquet_path)):
+            full_time, _ = timed(lambda: read_products(path), repeat=1)
+            text_time, text_df = timed(lambda: read_products(path, columns=TEXT_COLUMNS))
+            emb_time, (matrix, valid) = timed(lambda: read_embeddings(path), repeat=1)
+            assert len(text_df) == rows and matrix.shape == (rows, dim) and valid.all()
+            assert np.allclose(matrix, embeddings, atol=1e-6)
+            results.append((label, os.path.getsize(path), full_time, text_time, emb_time))
+    finally:
+        shutil.rmtree(out_dir)
+
+    print(f"행 {rows:,}개, 임베딩 {dim}차원 / 쓰기: CSV {csv_write:.2f}초, Parquet {parquet_write:.2f}초")
+    print(f"{'형식':<8}{'크기(MB)':>10}{'전체 읽기':>10}{'텍스트 열':>10}{'임베딩 행렬':>12}")
+    for label, size, full_time, text_time, emb_time in results:
+        print(f"{label:<8}{size / 1024 / 1024:>10.1f}{full_time:>9.2f}s{text_time:>9.2f}s{emb_time:>11.2f}s")
+    csv_result, parquet_result = results
+    print(f"Parquet: 크기 {csv_result[1] / parquet_result[1]:.1f}배 작음, 텍스트 열 {csv_result[3] / parquet_result[3]:.1f}배, "
+          f"임베딩 {csv_result[4] / parquet_result[4]:.1f}배 빠름")
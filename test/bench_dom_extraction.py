@@ -0,0 +1,76 @@
+# Selenium 목록 페이지 제품 추출 벤치마크
+# - 요소별 추출: 제품마다 find_element / get_attribute로 WebDriver 요청 (기존 방식)
+# - 스크립트 추출: execute_script 한 번으로 모든 제품 추출 (새 방식)
+# - 픽스처: fixtures/danawa/ajax_page1.html의 제품 블록을 90개로 늘린 목록 페이지를 로컬 서버로 제공합니다.
+# - 두 방식의 결과가 같은지 확인하고 페이지당 추출 시간(ms)을 비교합니다.
+#
+# 사용법: python bench_dom_extraction.py [반복 횟수] [chromedriver 경로]
+
+import os
+import sys
+import functools
+import re
+import shutil
+import tempfile
+import threading
+from http.server import ThreadingHTTPServer, SimpleHTTPRequestHandler
+from time import perf_counter
+
+from selenium import webdriver
+from selenium.webdriver.chrome.service import Service
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from danawa_dom import extract_products_script, extract_products_elements
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'danawa')
+PRODUCTS_PER_PAGE = 90
+
+
+def build_fixture_page(out_dir):
+    """
+    제품 블록을 PRODUCTS_PER_PAGE개로 늘린 목록 페이지를 만드는 함수
+    """
+    with open(os.path.join(FIXTURE_DIR, 'ajax_page1.html'), 'r', encoding='utf-8') as f:
+        fragment = f.read()
+    items = re.findall(r'<li class="prod_item.*?</li>', fragment, flags=re.S)
+    page_items = [items[i % len(items)] for i in range(PRODUCTS_PER_PAGE)]
+    page = ('<!DOCTYPE html><html lang="ko"><head><meta charset="utf-8"></head><body>'
+            '<ul class="product_list">' + '\n'.join(page_items) + '</ul></body></html>')
+    with open(os.path.join(out_dir, 'list.html'), 'w', encoding='utf-8') as f:
+        f.write(page)
+
+
+def measure(extract, browser, repeat):
+    start = perf_counter()
+    for _ in range(repeat):
+        products = extract(browser)
+    return (perf_counter() - start) / repeat, products
+
+
+if __name__ == '__main__':
+    repeat = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    driver_path = sys.argv[2] if len(sys.argv) > 2 else None
+
+    out_dir = tempfile.mkdtemp()
+    build_fixture_page(out_dir)
+    SimpleHTTPRequestHandler.log_message = lambda *args: None
+    server = ThreadingHTTPServer(('127.0.0.1', 0), functools.partial(SimpleHTTPRequestHandler, directory=out_dir))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    options = webdriver.ChromeOptions()
+    options.add_argument('--headless')
+    options.add_argument('--disable-gpu')
+    browser = webdriver.Chrome(service=Service(driver_path), options=options) if driver_path \
+        else webdriver.Chrome(options=options)
+    try:
+        browser.get(f'http://127.0.0.1:{server.server_address[1]}/list.html')
+        elements_time, elements_products = measure(extract_products_elements, browser, max(1, repeat // 10))
+        script_time, script_products = measure(extract_products_script, browser, repeat)
+    finally:
+        browser.quit()
+        server.shutdown()
+        shutil.rmtree(out_dir)
+
+    print(f"제품 {len(script_products)}개 / 페이지, 결과 일치: {script_products == elements_products}")
+    print(f"요소별 추출   : {elements_time * 1000:.1f}ms / 페이지")
+    print(f"스크립트 추출 : {script_time * 1000:.1f}ms / 페이지 ({elements_time / script_time:.1f}배)")
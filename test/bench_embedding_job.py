@@ -0,0 +1,134 @@
+# 스트리밍 임베딩 작업(embedding_job.EmbeddingJob) 확인 / 벤치마크
+# - 로컬 임베딩 스텁 서버(embedding_stub_server)와 크롤링 CSV의 Spec으로 합성 CSV를 만들어 사용합니다.
+# - 중단 후 이어서 실행: 청크 몇 개를 처리한 뒤 오류로 멈추게 하고, 다시 실행해 남은 청크만 요청하는지,
+#   완성된 저장소의 모든 행이 서버 벡터와 같은지 확인합니다.
+# - 실패한 청크: 잘못된 API 키(401)로 실행하면 완료로 기록되지 않고, 올바른 키로 다시 실행하면
+#   실패한 청크부터 다시 임베딩해 저장소를 완성하는지 확인합니다.
+# - 메모리: 행 수가 다른 파일(N/4, N행)을 처리할 때 최대 메모리 사용량(tracemalloc)이 비슷한지 비교합니다.
+#
+# 사용법: python bench_embedding_job.py [크롤링 CSV 폴더] [행 수] [임베딩 차원]
+
+import os
+import sys
+import csv
+import shutil
+import tempfile
+import tracemalloc
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from embedding_batch import BatchEmbeddingClient, format_embedding_stats
+from embedding_job import EmbeddingJob, format_job_stats
+from embedding_store import EmbeddingStore, has_embedding_store
+from embedding_stub_server import (EmbeddingHandler, serve_embeddings, load_specs, stub_vector, DEFAULT_DATA_DIR,
+                                   STUB_MODEL)
+
+CHUNK_ROWS = 1000
+CRASH_AFTER_CHUNKS = 5
+
+
+class CrashingClient(BatchEmbeddingClient):
+    """
+    chunks번 임베딩한 뒤 오류를 내는 클라이언트 (작업 중단 흉내)
+    """
+    def __init__(self, chunks, **kwargs):
+        super().__init__(**kwargs)
+        self.remaining = chunks
+
+    def embed(self, texts):
+        if self.remaining == 0:
+            raise RuntimeError("작업 중단 (테스트)")
+        self.remaining -= 1
+        return super().embed(texts)
+
+
+def write_specs_csv(path, specs, rows):
+    with open(path, 'w', newline='', encoding='utf-8-sig') as f:
+        writer = csv.writer(f)
+        writer.writerow(['Name', 'Spec', 'ImageURL'])
+        for i in range(rows):
+            spec = specs[i % len(specs)]
+            writer.writerow([f"제품 {i}", f"{spec} #{i}" if spec else '', ''])
+
+
+def check_store(data_path, dim):
+    """
+    저장소의 모든 행이 스텁 서버 벡터와 같은지 확인하고 불일치 행 수를 반환하는 함수
+    """
+    store = EmbeddingStore(data_path)
+    mismatched = 0
+    with open(data_path, 'r', newline='', encoding='utf-8-sig') as f:
+        reader = csv.reader(f)
+        next(reader)
+        for row_number, row in enumerate(reader):
+            vector = store.get(row_number)
+            spec = row[1]
+            if not spec:
+                mismatched += vector is not None
+            elif vector is None or not np.allclose(vector, stub_vector(spec, dim), atol=1e-6):
+                mismatched += 1
+    return mismatched + abs(len(store) - (row_number + 1))
+
+
+if __name__ == '__main__':
+    data_dir = sys.argv[1] if len(sys.argv) > 1 else DEFAULT_DATA_DIR
+    rows = int(sys.argv[2]) if len(sys.argv) > 2 else 20000
+    EmbeddingHandler.dim = int(sys.argv[3]) if len(sys.argv) > 3 else 256
+    EmbeddingHandler.latency = 0.01
+
+    specs = load_specs(data_dir, 5000) or ['테스트 스펙']
+    server, base_url = serve_embeddings()
+    out_dir = tempfile.mkdtemp()
+    state_dir = os.path.join(out_dir, 'state')
+    try:
+        # 1) 청크 CRASH_AFTER_CHUNKS개 처리 후 중단 → 이어서 실행
+        data_path = os.path.join(out_dir, 'products.csv')
+        write_specs_csv(data_path, specs, rows)
+        crashing = CrashingClient(CRASH_AFTER_CHUNKS, base_url=base_url, model=STUB_MODEL)
+        try:
+            EmbeddingJob(data_path, state_dir, crashing, chunk_rows=CHUNK_ROWS).run()
+        except RuntimeError as e:
+            print(f"1회차: {e}, 요청 {crashing.stats['requests']}회, 저장소 사용 가능: {has_embedding_store(data_path)}")
+
+        client = BatchEmbeddingClient(base_url=base_url, model=STUB_MODEL)
+        job = EmbeddingJob(data_path, state_dir, client, chunk_rows=CHUNK_ROWS)
+        print(f"2회차: 완료된 청크 {job.resumed_chunks}개에서 이어서 진행")
+        job.run()
+        print(f"2회차: {format_job_stats(job.stats)}")
+        print(f"2회차: {format_embedding_stats(client.stats)}")
+        print(f"행 {rows}개 중 저장소 불일치 {check_store(data_path, EmbeddingHandler.dim)}개, "
+              f"다시 실행하면 완료 상태로 건너뜀: {EmbeddingJob(data_path, state_dir, client, chunk_rows=CHUNK_ROWS).done}")
+
+        # 2) 잘못된 API 키로 실패한 청크 → 올바른 키로 다시 실행
+        EmbeddingHandler.api_key = 'test-key'
+        data_path = os.path.join(out_dir, 'products_auth.csv')
+        write_specs_csv(data_path, specs, CHUNK_ROWS * 3)
+        job = EmbeddingJob(data_path, state_dir, BatchEmbeddingClient(api_key='wrong-key', base_url=base_url,
+                                                                      model=STUB_MODEL), chunk_rows=CHUNK_ROWS)
+        job.run()
+        print(f"잘못된 키: {format_job_stats(job.stats)}, 완료로 기록됨: {job.done}, 저장소 사용 가능: "
+              f"{has_embedding_store(data_path)}")
+        job = EmbeddingJob(data_path, state_dir, BatchEmbeddingClient(api_key='test-key', base_url=base_url,
+                                                                      model=STUB_MODEL), chunk_rows=CHUNK_ROWS)
+        job.run()
+        print(f"올바른 키로 다시 실행: {format_job_stats(job.stats)}, 완료로 기록됨: {job.done}, "
+              f"저장소 불일치 {check_store(data_path, EmbeddingHandler.dim)}개")
+        EmbeddingHandler.api_key = None
+
+        # 3) 행 수에 따른 최대 메모리 사용량
+        for size in (rows // 4, rows):  # tracemalloc을 켜면 느려지므로 작게
+            path = os.path.join(out_dir, f'products_{size}.csv')
+            write_specs_csv(path, specs, size)
+            job = EmbeddingJob(path, state_dir, BatchEmbeddingClient(base_url=base_url, model=STUB_MODEL),
+                               chunk_rows=CHUNK_ROWS)
+            tracemalloc.start()
+            job.run()
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            store_size = os.path.getsize(job.matrix_path)
+            print(f"{size}행: 최대 메모리 {peak / 1024 / 1024:.1f}MB, 저장소 {store_size / 1024 / 1024:.1f}MB, "
+                  f"{format_job_stats(job.stats)}")
+    finally:
+        server.shutdown()
+        shutil.rmtree(out_dir)
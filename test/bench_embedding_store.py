@@ -0,0 +1,95 @@
+# 임베딩 저장소(float32 .npy + memmap) 벤치마크
+# - 합성 임베딩을 기존 방식(CSV의 JSON 문자열 열), Parquet(float32 고정 길이 리스트 열),
+#   임베딩 저장소(<이름>.embeddings.npy + 행 번호 인덱스)로 저장해 파일 크기와 읽기 시간을 비교합니다.
+# - 저장소는 memmap으로 여는 시간, 전체 행렬을 한 번 훑는 시간(페이지 읽기), 행 1000개를 임의로 읽는 시간을 따로 잽니다.
+#   (같은 파일을 연달아 읽으므로 OS 페이지 캐시가 데워진 상태의 시간입니다)
+#
+# 사용법: python bench_embedding_store.py [행 수] [임베딩 차원]
+
+import os
+import sys
+import json
+import shutil
+import tempfile
+from time import perf_counter
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from data_store import write_products, read_embeddings
+from embedding_store import write_embedding_store, load_embeddings, EmbeddingStore, embedding_store_paths
+
+
+def timed(func, repeat=3):
+    best = None
+    for _ in range(repeat):
+        start = perf_counter()
+        result = func()
+        elapsed = perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+if __name__ == '__main__':
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    dim = int(sys.argv[2]) if len(sys.argv) > 2 else 256
+
+    rng = np.random.default_rng(0)
+    embeddings = rng.standard_normal((rows, dim)).astype(np.float32)
+    valid = rng.random(rows) >= 0.01  # 1%는 임베딩 없음 (빈 Spec / 실패)
+    df = pd.DataFrame({'Name': [f"테스트 제품 {i}" for i in range(rows)]})
+    sample_rows = rng.integers(0, rows, 1000)
+
+    out_dir = tempfile.mkdtemp()
+    csv_path = os.path.join(out_dir, 'products.csv')
+    parquet_path = os.path.join(out_dir, 'products.parquet')
+    store_path = os.path.join(out_dir, 'store.csv')
+    try:
+        start = perf_counter()
+        csv_df = df.copy()
+        csv_df['embedding'] = [json.dumps(vector.tolist()) if ok else None for vector, ok in zip(embeddings, valid)]
+        csv_df.to_csv(csv_path, index=False, encoding='utf-8-sig')
+        del csv_df
+        csv_write = perf_counter() - start
+
+        start = perf_counter()
+        write_products(parquet_path, df, embeddings=[vector if ok else None for vector, ok in zip(embeddings, valid)])
+        parquet_write = perf_counter() - start
+
+        start = perf_counter()
+        df.to_csv(store_path, index=False, encoding='utf-8-sig')
+        write_embedding_store(store_path, embeddings, valid)
+        store_write = perf_counter() - start
+
+        results = []
+        for label, path in (('CSV', csv_path), ('Parquet', parquet_path)):
+            load_time, (matrix, loaded_valid) = timed(lambda: read_embeddings(path), repeat=1)
+            assert matrix.shape == (rows, dim) and (loaded_valid == valid).all()
+            assert np.allclose(matrix[valid], embeddings[valid], atol=1e-6)
+            del matrix
+            results.append((label, os.path.getsize(path), load_time))
+
+        matrix_path, index_path = embedding_store_paths(store_path)
+        store_size = os.path.getsize(matrix_path) + os.path.getsize(index_path)
+        open_time, store = timed(lambda: EmbeddingStore(store_path))
+        scan_time, total = timed(lambda: float(np.asarray(store.matrix).sum(dtype=np.float64)))
+        sample_time, _ = timed(lambda: [store.get(row) for row in sample_rows])
+        dense_time, (matrix, loaded_valid) = timed(lambda: load_embeddings(store_path), repeat=1)
+        assert isinstance(store.matrix, np.memmap) and (loaded_valid == valid).all()
+        assert np.array_equal(matrix[valid], embeddings[valid]) and np.isclose(total, embeddings[valid].sum(dtype=np.float64))
+        del matrix, store
+    finally:
+        shutil.rmtree(out_dir)
+
+    print(f"행 {rows:,}개, 임베딩 {dim}차원 (임베딩 있는 행 {int(valid.sum()):,}개)")
+    print(f"쓰기: CSV {csv_write:.2f}초, Parquet {parquet_write:.2f}초, 저장소 {store_write:.2f}초")
+    print(f"{'형식':<10}{'크기(MB)':>10}{'임베딩 행렬 읽기':>16}")
+    for label, size, load_time in results:
+        print(f"{label:<10}{size / 1024 / 1024:>10.1f}{load_time:>15.3f}s")
+    print(f"{'저장소':<10}{store_size / 1024 / 1024:>10.1f}{dense_time:>15.3f}s  (N x dim 행렬로 복사)")
+    print(f"저장소 memmap 열기 {open_time * 1000:.2f}ms, 전체 훑기 {scan_time:.3f}초, "
+          f"임의의 행 {len(sample_rows)}개 {sample_time * 1000:.2f}ms")
+    csv_size, csv_load = results[0][1], results[0][2]
+    print(f"CSV 대비 저장소: 크기 {csv_size / store_size:.1f}배 작음, "
+          f"열기 {csv_load / open_time:,.0f}배 / 전체 행렬 {csv_load / dense_time:.1f}배 빠름")
@@ -0,0 +1,83 @@
+# 이미지 저장 fast path 벤치마크
+# - 기존 방식: 모든 응답을 PIL로 디코딩 → RGB 변환 → JPEG 재인코딩
+# - 새 방식: store_image_stream (JPEG는 그대로 스트리밍 저장, 그 외 형식만 변환)
+# - 픽스처: 'crawl_data - 복사본/images'의 썸네일 (일부는 PNG로 바꿔 변환 경로도 포함)
+# - 1,000장당 CPU 시간(process_time)을 비교합니다.
+#
+# 사용법: python bench_image_fastpath.py [이미지 수] [PNG 비율]
+
+import os
+import sys
+import shutil
+import tempfile
+from io import BytesIO
+from time import process_time
+
+from PIL import Image
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from image_pipeline import store_image_stream, IMAGE_CHUNK_SIZE
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'crawl_data - 복사본', 'images')
+
+
+def load_fixtures(count, png_ratio):
+    """
+    (바이트, Content-Type) 픽스처 목록을 만드는 함수
+    """
+    fixtures = []
+    file_names = sorted(name for name in os.listdir(FIXTURE_DIR) if name.endswith('.jpg'))[:count]
+    png_every = int(1 / png_ratio) if png_ratio > 0 else 0
+    for i, file_name in enumerate(file_names):
+        with open(os.path.join(FIXTURE_DIR, file_name), 'rb') as f:
+            data = f.read()
+        if png_every and i % png_every == 0:
+            buffer = BytesIO()
+            Image.open(BytesIO(data)).save(buffer, 'PNG')
+            fixtures.append((buffer.getvalue(), 'image/png'))
+        else:
+            fixtures.append((data, 'image/jpeg'))
+    return fixtures
+
+
+def chunked(data):
+    for i in range(0, len(data), IMAGE_CHUNK_SIZE):
+        yield data[i:i + IMAGE_CHUNK_SIZE]
+
+
+def legacy_save(data, content_type, save_path):
+    img = Image.open(BytesIO(data))
+    img = img.convert('RGB')
+    img.save(save_path, 'JPEG')
+
+
+def fastpath_save(data, content_type, save_path):
+    store_image_stream(chunked(data), content_type, save_path)
+
+
+def run(save_func, fixtures, out_dir):
+    start = process_time()
+    for i, (data, content_type) in enumerate(fixtures):
+        save_func(data, content_type, os.path.join(out_dir, f'{i}.jpg'))
+    return process_time() - start
+
+
+if __name__ == '__main__':
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    png_ratio = float(sys.argv[2]) if len(sys.argv) > 2 else 0.05
+
+    fixtures = load_fixtures(count, png_ratio)
+    png_count = sum(1 for _, content_type in fixtures if content_type == 'image/png')
+    print(f"픽스처: {len(fixtures)}장 (PNG {png_count}장)")
+
+    out_dir = tempfile.mkdtemp()
+    try:
+        legacy = run(legacy_save, fixtures, out_dir)
+        fastpath = run(fastpath_save, fixtures, out_dir)
+    finally:
+        shutil.rmtree(out_dir)
+
+    per_1000 = 1000 / len(fixtures)
+    print(f"기존 방식  : {legacy * per_1000:.3f}초 CPU / 1,000장")
+    print(f"fast path  : {fastpath * per_1000:.3f}초 CPU / 1,000장")
+    print(f"절약       : {(legacy - fastpath) * per_1000:.3f}초 CPU / 1,000장 ({(1 - fastpath / legacy) * 100:.1f}%)")
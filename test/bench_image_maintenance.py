@@ -0,0 +1,119 @@
+# 이미지 디렉토리 정리 벤치마크
+# - 크롤링 CSV 폴더와 이미지 폴더를 임시 디렉토리에 복사하고, 일부 이미지를 다시 인코딩 / 축소한 사본을
+#   다른 제품명으로 저장(CSV에서 참조)한 뒤 고아 이미지도 몇 개 추가해서 dry-run과 link 적용을 실행합니다.
+#   지각 해시 계산 속도(images/sec), 사본이 원본과 같은 그룹으로 묶인 비율, 하드 링크 적용 결과를 확인합니다.
+# - 다중 인덱스 해싱 검색은 무작위 해시 count개(+ 몇 비트만 바꾼 해시)로 따로 측정합니다.
+#
+# 사용법: python bench_image_maintenance.py [크롤링 CSV 폴더] [사본 수] [검색 벤치마크 해시 수]
+
+import os
+import sys
+import csv
+import random
+import shutil
+import tempfile
+from time import perf_counter
+
+import numpy as np
+from PIL import Image
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from image_maintenance import clean_images, format_clean_stats, duplicate_groups, HAMMING_THRESHOLD, MODE_LINK
+
+DEFAULT_DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'crawl_data - 복사본')
+ORPHAN_COUNT = 20
+
+
+def make_variant(source, target, rng):
+    """
+    원본 이미지를 다시 인코딩하거나 축소해서 저장 (같은 썸네일을 다른 제품명으로 다시 받은 경우)
+    """
+    with Image.open(source) as img:
+        img = img.convert('RGB')
+        if rng.random() < 0.5:
+            img = img.resize((max(int(img.width * 0.9), 1), max(int(img.height * 0.9), 1)))
+        img.save(target, 'JPEG', quality=rng.choice([75, 85, 95]))
+
+
+def index_benchmark(count, rng):
+    """
+    무작위 해시 count개와, 그중 1%를 threshold 이하 비트만 바꾼 해시로 중복 그룹 검색 시간 / 재현율 측정
+    """
+    hashes = np.random.default_rng(17).integers(0, np.iinfo(np.uint64).max, size=count, dtype=np.uint64,
+                                                endpoint=True)
+    planted = []
+    variants = []
+    for i in range(count // 100):
+        index = rng.randrange(count)
+        value = int(hashes[index])
+        for bit in rng.sample(range(64), rng.randint(1, HAMMING_THRESHOLD)):
+            value ^= 1 << bit
+        planted.append((index, count + i))
+        variants.append(value)
+    hashes = np.concatenate([hashes, np.array(variants, dtype=np.uint64)])
+
+    start = perf_counter()
+    groups = duplicate_groups(hashes)
+    elapsed = perf_counter() - start
+    labels = np.full(len(hashes), -1)
+    for number, group in enumerate(groups):
+        labels[group] = number
+    found = sum(labels[a] >= 0 and labels[a] == labels[b] for a, b in planted)
+    print(f"다중 인덱스 해싱: 해시 {len(hashes):,}개, {elapsed:.2f}초, "
+          f"심어 둔 유사 해시 {found}/{len(planted)}개 발견, 그룹 {len(groups)}개")
+
+
+if __name__ == '__main__':
+    data_dir = sys.argv[1] if len(sys.argv) > 1 else DEFAULT_DATA_DIR
+    variant_count = int(sys.argv[2]) if len(sys.argv) > 2 else 500
+    index_count = int(sys.argv[3]) if len(sys.argv) > 3 else 300000
+    rng = random.Random(17)
+
+    index_benchmark(index_count, rng)
+
+    image_dir = os.path.join(data_dir, 'images')
+    if not os.path.isdir(image_dir):
+        print(f"이미지 폴더를 찾을 수 없습니다: {image_dir}")
+        sys.exit(0)
+
+    work_dir = tempfile.mkdtemp()
+    try:
+        work_data = os.path.join(work_dir, 'crawl_data')
+        work_images = os.path.join(work_data, 'images')
+        shutil.copytree(image_dir, work_images)
+        for name in os.listdir(data_dir):
+            if name.endswith('.csv'):
+                shutil.copy(os.path.join(data_dir, name), work_data)
+
+        # 다른 제품명으로 저장된 사본 (CSV에서 참조) + 고아 이미지
+        sources = sorted(os.listdir(work_images))
+        variant_rows = []
+        for i, source in enumerate(rng.sample(sources, min(variant_count, len(sources)))):
+            target = os.path.join(work_images, f'사본 {i} {source}')
+            make_variant(os.path.join(work_images, source), target, rng)
+            variant_rows.append([f'사본 {i}', '', 'C:\\dev\\crawl_data\\images\\' + os.path.basename(target),
+                                 os.path.basename(target)])
+        for i in range(ORPHAN_COUNT):
+            shutil.copy(os.path.join(work_images, sources[i]), os.path.join(work_images, f'고아 {i}.jpg'))
+        with open(os.path.join(work_data, '사본.csv'), 'w', newline='', encoding='utf-8-sig') as f:
+            csv.writer(f).writerows([['Name', 'Spec', 'ImageURL']] + [row[:3] for row in variant_rows])
+
+        report_path = os.path.join(work_data, 'state', 'image_maintenance.csv')
+        stats = clean_images(work_data, work_images, apply=False, report_path=report_path)
+        print(format_clean_stats(stats, False))
+        with open(report_path, 'r', newline='', encoding='utf-8-sig') as f:
+            report = list(csv.DictReader(f))
+        targets = {os.path.basename(row['Path']): os.path.basename(row['Target']) for row in report if row['Action'] == 'link'}
+        targets.update({target: path for path, target in list(targets.items())})
+        grouped = sum(row[3] in targets for row in variant_rows)
+        print(f"사본 {len(variant_rows)}개 중 {grouped}개가 중복 그룹에 포함, "
+              f"고아 이미지 {sum(row['Action'] == 'orphan' for row in report)}개 (추가한 고아 {ORPHAN_COUNT}개)")
+
+        stats = clean_images(work_data, work_images, apply=True, mode=MODE_LINK, report_path=report_path)
+        print(format_clean_stats(stats, True))
+        linked = sum(os.stat(os.path.join(work_images, os.path.basename(row['Path']))).st_nlink > 1
+                     for row in report if row['Action'] == 'link')
+        print(f"하드 링크로 교체된 이미지: {linked}개, 다시 실행한 dry-run: "
+              f"{format_clean_stats(clean_images(work_data, work_images), False)}")
+    finally:
+        shutil.rmtree(work_dir)
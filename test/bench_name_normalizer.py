@@ -0,0 +1,106 @@
+# 제품명 정제 골든 테스트 / 벤치마크
+# - fixtures/names/golden_names.csv: 기존 Crawler.clean_product_name의 결과 (입력, 기대값)
+#   name_normalizer.clean_product_name의 결과가 모두 같은지 확인합니다.
+# - 크롤링 CSV 폴더의 제품명으로 기존 방식 / 컴파일된 패턴 / 컴파일 + LRU 캐시의 초당 처리 행 수를 비교합니다.
+#   (정제 단계에서 행마다 하는 작업: 제품명 정제 + 파일명 문자 치환 + 중복 판단 키)
+#
+# 사용법: python bench_name_normalizer.py [크롤링 CSV 폴더] [반복 횟수]
+
+import os
+import sys
+import re
+import csv
+from glob import glob
+from time import perf_counter
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from name_normalizer import clean_product_name, normalize_product_name, safe_file_name
+
+GOLDEN_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'names', 'golden_names.csv')
+DEFAULT_DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'crawl_data - 복사본')
+
+
+def legacy_clean_product_name(name):
+    """
+    기존 Crawler.clean_product_name (비교 기준)
+    """
+    pattern = r'\s*\d+(?:\.\d+)?\s*(?:ml|정|포|l|g|kg|mg|개|can|캔|팩|페트|병|입|박스|캡슐|스틱|매|베지캡슐|분|da|달톤|mgα-te|mgne|㎍re|㎍|μg|T|P|세트)(?:\s*x\s*\d+(?:개|팩|병|캔|박스|정|포|매|스틱)?)?\s*'
+    bracket_pattern = r'\s*\([^)]*\)\s*'
+    prev_name = name
+    while True:
+        cleaned = re.sub(pattern, '', prev_name, flags=re.IGNORECASE)
+        cleaned = re.sub(bracket_pattern, '', cleaned)
+        cleaned = cleaned.strip()
+        if cleaned == prev_name:
+            break
+        prev_name = cleaned
+    return cleaned
+
+
+def legacy_normalize(name):
+    cleaned_name = legacy_clean_product_name(name)
+    safe_name = re.sub(r'[\\/*?:"<>|]', '_', cleaned_name)
+    safe_name = safe_name.replace('  ', ' ').strip()
+    return cleaned_name, safe_name, cleaned_name.split(',')[0]
+
+
+def compiled_normalize(name):
+    """
+    캐시 없이 컴파일된 패턴만 사용하는 정제
+    """
+    cleaned_name = clean_product_name(name)
+    safe_name = safe_file_name(cleaned_name).replace('  ', ' ').strip()
+    return cleaned_name, safe_name, cleaned_name.split(',')[0]
+
+
+def check_golden():
+    with open(GOLDEN_FILE, 'r', newline='', encoding='utf-8-sig') as f:
+        reader = csv.reader(f)
+        next(reader)
+        cases = [(row[0], row[1]) for row in reader]
+    failures = [(name, expected, clean_product_name(name)) for name, expected in cases
+                if clean_product_name(name) != expected]
+    for name, expected, actual in failures[:20]:
+        print(f"불일치: {name!r} -> {actual!r} (기대값 {expected!r})")
+    print(f"골든 데이터 {len(cases)}건 중 {len(cases) - len(failures)}건 일치")
+    return not failures
+
+
+def load_names(data_dir):
+    names = []
+    for path in sorted(glob(os.path.join(data_dir, '*.csv'))):
+        with open(path, 'r', newline='', encoding='utf-8-sig') as f:
+            reader = csv.reader(f)
+            next(reader, None)
+            names.extend(row[0] for row in reader if row)
+    return names
+
+
+def measure(normalize, names):
+    start = perf_counter()
+    results = [normalize(name) for name in names]
+    return len(names) / (perf_counter() - start), results
+
+
+if __name__ == '__main__':
+    data_dir = sys.argv[1] if len(sys.argv) > 1 else DEFAULT_DATA_DIR
+    repeat = int(sys.argv[2]) if len(sys.argv) > 2 else 1
+
+    if not check_golden():
+        sys.exit(1)
+
+    names = load_names(data_dir) * repeat
+    if not names:
+        print(f"제품명을 찾을 수 없습니다: {data_dir}")
+        sys.exit(0)
+    print(f"제품명 {len(names):,}행 (고유 {len(set(names)):,}개)")
+
+    legacy_rate, expected = measure(legacy_normalize, names)
+    compiled_rate, compiled = measure(compiled_normalize, names)
+    normalize_product_name.cache_clear()
+    cached_rate, cached = measure(normalize_product_name, names)
+    print(f"결과 일치: {compiled == expected and cached == expected}")
+    print(f"기존 방식         : {legacy_rate:,.0f} 행/초")
+    print(f"컴파일된 패턴     : {compiled_rate:,.0f} 행/초 ({compiled_rate / legacy_rate:.1f}배)")
+    print(f"컴파일 + LRU 캐시 : {cached_rate:,.0f} 행/초 ({cached_rate / legacy_rate:.1f}배), "
+          f"{normalize_product_name.cache_info()}")
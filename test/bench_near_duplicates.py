@@ -0,0 +1,91 @@
+# 유사 제품명 클러스터링 벤치마크
+# - 크롤링 CSV 폴더의 정제된 제품명에, 변형(띄어쓰기 제거 / 브랜드 접두어 제거 / 단어 순서 변경 / 접미어 추가)한
+#   제품명을 더해 target개로 만든 뒤 MinHash + LSH 클러스터링 시간을 측정합니다.
+# - 변형한 제품명이 원래 제품명과 같은 클러스터에 들어간 비율(재현율)과,
+#   숫자만 다른 제품명이 묶이지 않았는지, 기존 방식(쉼표 앞 제품명)과 중복 제거 결과 수를 비교합니다.
+#
+# 사용법: python bench_near_duplicates.py [크롤링 CSV 폴더] [제품명 수] [유사도 기준]
+
+import os
+import sys
+import csv
+import random
+from glob import glob
+from time import perf_counter
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from name_normalizer import clean_product_name
+from near_duplicates import cluster_names, canonical_rows, lsh_params, NEAR_DUPLICATE_THRESHOLD, NUM_PERM
+
+DEFAULT_DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'crawl_data - 복사본')
+SUFFIXES = ['입', ' 기획', ' 세트', ' 대용량', ' 정품']
+
+
+def load_names(data_dir):
+    names = []
+    for path in sorted(glob(os.path.join(data_dir, '*.csv'))):
+        with open(path, 'r', newline='', encoding='utf-8-sig') as f:
+            reader = csv.reader(f)
+            next(reader, None)
+            names.extend(clean_product_name(row[0]) for row in reader if row)
+    return [name for name in names if name]
+
+
+def perturb(name, rng):
+    tokens = name.split()
+    kind = rng.randrange(4)
+    if kind == 0 and len(tokens) > 1:
+        # 띄어쓰기 하나 제거
+        i = rng.randrange(len(tokens) - 1)
+        tokens[i:i + 2] = [tokens[i] + tokens[i + 1]]
+    elif kind == 1 and len(tokens) > 3:
+        tokens = tokens[1:]  # 브랜드 접두어 제거
+    elif kind == 2 and len(tokens) > 2:
+        i = rng.randrange(1, len(tokens) - 1)
+        tokens[i], tokens[i + 1] = tokens[i + 1], tokens[i]  # 단어 순서 변경
+    else:
+        return name + rng.choice(SUFFIXES)
+    return ' '.join(tokens)
+
+
+if __name__ == '__main__':
+    data_dir = sys.argv[1] if len(sys.argv) > 1 else DEFAULT_DATA_DIR
+    target = int(sys.argv[2]) if len(sys.argv) > 2 else 300000
+    threshold = float(sys.argv[3]) if len(sys.argv) > 3 else NEAR_DUPLICATE_THRESHOLD
+
+    base = load_names(data_dir)
+    if not base:
+        print(f"제품명을 찾을 수 없습니다: {data_dir}")
+        sys.exit(0)
+    rng = random.Random(15)
+    names = list(base)
+    sources = []  # (변형한 제품명 위치, 원래 제품명 위치)
+    while len(names) < target:
+        source = rng.randrange(len(base))
+        variant = perturb(base[source], rng)
+        if variant != base[source]:
+            sources.append((len(names), source))
+            names.append(variant)
+
+    # 숫자만 다른 제품명 (묶이면 안 됨)
+    numbered = [(f"테스트상사 선물세트 {i}호", f"테스트상사 선물세트 {i + 1}호") for i in range(1, 200)]
+    offset = len(names)
+    for first, second in numbered:
+        names.extend([first, second])
+
+    bands, rows = lsh_params(threshold, NUM_PERM)
+    start = perf_counter()
+    cluster_ids = cluster_names(names, threshold=threshold)
+    elapsed = perf_counter() - start
+    canonical = canonical_rows(cluster_ids, [len(name) for name in names])
+
+    recall = sum(cluster_ids[variant] == cluster_ids[source] for variant, source in sources) / len(sources)
+    numbered_merged = sum(cluster_ids[offset + 2 * i] == cluster_ids[offset + 2 * i + 1] for i in range(len(numbered)))
+    base_clusters = len(set(cluster_ids[:len(base)].tolist()))
+    key_groups = len({name.split(',')[0] for name in base})
+
+    print(f"제품명 {len(names):,}개 (원본 {len(base):,}개 + 변형 {len(sources):,}개), 유사도 기준 {threshold}, "
+          f"밴드 {bands} x {rows}행")
+    print(f"클러스터링: {elapsed:.2f}초 ({len(names) / elapsed:,.0f}개/초), 클러스터 {len(canonical):,}개")
+    print(f"변형 제품명 재현율: {recall:.1%}, 숫자만 다른 제품명 병합: {numbered_merged}/{len(numbered)}")
+    print(f"원본 제품명 기준 중복 제거 결과: MinHash {base_clusters:,}개 / 쉼표 앞 제품명 {key_groups:,}개")
@@ -0,0 +1,89 @@
+# 비슷한 제품 표(similar_products) 확인 / 벤치마크
+# - 합성 임베딩(reduce_embeddings.synthetic_embeddings)으로 데이터 파일 여러 개와 임베딩 저장소를 만들고
+#   전체 제품 kNN 표를 만든 뒤, 질의 하나씩 완전 탐색한 결과와 비교합니다.
+# - 증분 갱신: 파일 하나를 추가(새 제품)한 경우와 파일 하나를 삭제(삭제된 제품)한 경우 각각 update()의 결과를
+#   전체 다시 계산(build)한 결과와 비교하고 두 방식의 시간을 비교합니다.
+#
+# 사용법: python bench_similar_products.py [파일당 제품 수] [차원]
+
+import os
+import sys
+import shutil
+import tempfile
+from time import perf_counter
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from embedding_store import write_embedding_store
+from embedding_reduce import recall_at_k
+from similar_products import SimilarProductsTable, ProductIdMap, collect_embeddings, format_similar_stats
+from vector_search import ExactIndex, METRIC_IP
+from reduce_embeddings import synthetic_embeddings
+
+FILES = 5
+K = 20
+CHECK_PRODUCTS = 200
+
+
+def write_file(path, vectors):
+    pd.DataFrame({'Name': [f"제품 {i}" for i in range(len(vectors))]}).to_csv(path, index=False)
+    # 2%는 임베딩 없음
+    write_embedding_store(path, [None if i % 50 == 7 else vector for i, vector in enumerate(vectors)])
+
+
+def neighbor_matrix(table, products):
+    return np.array([[neighbor for neighbor, _ in table.neighbors(product)] for product in products])
+
+
+if __name__ == '__main__':
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    dim = int(sys.argv[2]) if len(sys.argv) > 2 else 256
+
+    data = synthetic_embeddings(rows * (FILES + 1), dim, clusters=rows // 10)
+    out_dir = tempfile.mkdtemp()
+    state_dir = os.path.join(out_dir, 'state')
+    matrix_path = os.path.join(state_dir, 'matrix.npy')
+    os.makedirs(state_dir)
+    try:
+        paths = [os.path.join(out_dir, f'category_{number}.csv') for number in range(FILES + 1)]
+        id_map = ProductIdMap(os.path.join(state_dir, 'product_ids.json'))
+        for number in range(FILES):
+            write_file(paths[number], data[number * rows:(number + 1) * rows])
+            id_map.record(paths[number], 1 + number * rows, rows)
+
+        products, matrix = collect_embeddings(paths[:FILES], id_map, matrix_path)
+        table = SimilarProductsTable(state_dir, k=K).build(products, matrix)
+        table.save()
+        print(f"전체 계산: {format_similar_stats(table.stats)}")
+
+        # 질의 하나씩 완전 탐색한 결과와 비교
+        sample = np.random.default_rng(0).choice(len(products), CHECK_PRODUCTS, replace=False)
+        exact = ExactIndex(matrix, METRIC_IP)
+        expected = np.array([products[exact.search(matrix[row], K, exclude=[row])[0][0]] for row in sample])
+        table = SimilarProductsTable(state_dir).load()
+        print(f"저장한 표: 이웃 {table.ids.dtype} / 점수 {table.scores.dtype}, "
+              f"{(table.ids.nbytes + table.scores.nbytes) / len(products):.0f}바이트/제품, "
+              f"완전 탐색과 recall@{K} {recall_at_k(expected, neighbor_matrix(table, products[sample])):.4f}")
+
+        # 파일 하나 추가(새 제품) → 첫 파일 삭제(삭제된 제품)
+        write_file(paths[FILES], data[FILES * rows:])
+        id_map.record(paths[FILES], 1 + FILES * rows, rows)
+        for label, step_paths in (("파일 추가", paths), ("파일 삭제", paths[1:])):
+            products, matrix = collect_embeddings(step_paths, id_map, matrix_path)
+            start = perf_counter()
+            table.update(products, matrix)
+            update_time = perf_counter() - start
+            print(f"{label} 증분 갱신: {format_similar_stats(table.stats)}")
+
+            start = perf_counter()
+            rebuilt = SimilarProductsTable(state_dir, name='rebuilt', k=K).build(products, matrix)
+            build_time = perf_counter() - start
+            same = (table.ids == rebuilt.ids).all(axis=1).mean()
+            print(f"  증분 {update_time:.1f}초 / 전체 다시 계산 {build_time:.1f}초, "
+                  f"이웃 목록이 전체 계산과 같은 제품 {same * 100:.2f}%, "
+                  f"recall@{K} {recall_at_k(rebuilt.ids, table.ids):.4f}")
+        del matrix, exact, table, rebuilt
+    finally:
+        shutil.rmtree(out_dir)
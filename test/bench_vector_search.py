@@ -0,0 +1,68 @@
+# 프로세스 내 벡터 검색(vector_search) 벤치마크
+# - 합성 임베딩(reduce_embeddings.synthetic_embeddings, 군집 구조 단위 벡터)을 .npy로 저장하고 memmap으로 열어
+#   완전 탐색(ExactIndex)과 IVF(IVFIndex) 근사 탐색의 처리량(QPS)과 recall@k를 비교합니다.
+# - 완전 탐색은 질의를 한 번에 묶은 경우와 질의 하나씩 보낸 경우를 모두 잽니다.
+#
+# 사용법: python bench_vector_search.py [벡터 수] [차원] [질의 수]
+
+import os
+import sys
+import shutil
+import tempfile
+from time import perf_counter
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from embedding_reduce import recall_at_k
+from vector_search import ExactIndex, IVFIndex, format_search_stats
+from reduce_embeddings import synthetic_embeddings
+
+K = 10
+NPROBES = (1, 4, 8, 16, 32)
+SINGLE_QUERIES = 50
+
+if __name__ == '__main__':
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    dim = int(sys.argv[2]) if len(sys.argv) > 2 else 256
+    query_count = int(sys.argv[3]) if len(sys.argv) > 3 else 1000
+
+    data = synthetic_embeddings(rows + query_count, dim, clusters=max(1, rows // 50))
+    queries = data[rows:]
+    out_dir = tempfile.mkdtemp()
+    try:
+        matrix_path = os.path.join(out_dir, 'vectors.npy')
+        np.save(matrix_path, data[:rows])
+        del data
+        matrix = np.load(matrix_path, mmap_mode='r')
+
+        start = perf_counter()
+        exact = ExactIndex(matrix)
+        print(f"벡터 {rows:,}개, {dim}차원 (memmap), 질의 {query_count}개, k={K} / "
+              f"완전 탐색 준비(노름 계산) {perf_counter() - start:.2f}초")
+
+        start = perf_counter()
+        truth, _ = exact.search(queries, K)
+        print(format_search_stats("완전 탐색 (질의 묶음)", query_count, perf_counter() - start))
+
+        start = perf_counter()
+        for query in queries[:SINGLE_QUERIES]:
+            exact.search(query, K)
+        print(format_search_stats("완전 탐색 (질의 하나씩)", SINGLE_QUERIES, perf_counter() - start))
+
+        start = perf_counter()
+        ivf = IVFIndex().build(matrix)
+        sizes = np.diff(ivf.offsets)
+        print(f"IVF 생성: 목록 {ivf.nlist}개 (목록당 평균 {sizes.mean():.0f}개, 최대 {sizes.max()}개), "
+              f"{perf_counter() - start:.2f}초")
+        ivf.save(os.path.join(out_dir, 'vectors'))
+        ivf = IVFIndex.load(os.path.join(out_dir, 'vectors'))
+
+        for nprobe in NPROBES:
+            start = perf_counter()
+            found, _ = ivf.search(queries, K, nprobe=nprobe)
+            elapsed = perf_counter() - start
+            print(format_search_stats(f"IVF nprobe={nprobe:<3}", query_count, elapsed, recall_at_k(truth, found)))
+        del matrix, ivf, exact
+    finally:
+        shutil.rmtree(out_dir)
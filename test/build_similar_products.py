@@ -0,0 +1,49 @@
+# 비슷한 제품 표 생성 / 갱신 명령 (similar_products)
+# - 데이터 파일별 임베딩 저장소와 insert_opensearch.py가 기록한 product_no로 모든 제품의 상위 k개 이웃을 계산해
+#   state/similar_products.*.npy에 저장합니다. 기존 표가 있으면 새 제품 / 삭제된 제품에 영향받는 행만 갱신합니다.
+# - 임베딩을 다시 만든(내용이 바뀐) 경우에는 --full로 전체를 다시 계산합니다.
+#
+# 사용법: python build_similar_products.py [--data-dir 경로] [--index-name product] [--k 20] [--full]
+
+import os
+import sys
+import argparse
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from data_store import data_files
+from embedding_store import has_embedding_store
+from similar_products import (SimilarProductsTable, ProductIdMap, collect_embeddings, format_similar_stats,
+                              SIMILAR_K, SIMILAR_TABLE_NAME, PRODUCT_IDS_FILE)
+
+DATA_DIR = r'C:\dev\ZeroMoa\ZeroMoa\crawl_data'
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='비슷한 제품 표 생성 / 갱신')
+    parser.add_argument('--data-dir', default=DATA_DIR, help='데이터 파일 / 임베딩 저장소 디렉토리')
+    parser.add_argument('--index-name', default='product', help='product_no를 기록한 OpenSearch 인덱스 이름')
+    parser.add_argument('--k', type=int, default=SIMILAR_K, help='제품당 이웃 수 (기본값: %(default)s)')
+    parser.add_argument('--full', action='store_true', help='기존 표를 무시하고 전체를 다시 계산')
+    args = parser.parse_args()
+
+    state_dir = os.path.join(args.data_dir, 'state')
+    data_paths = [path for path in data_files(args.data_dir) if has_embedding_store(path)]
+    if not data_paths:
+        print(f"임베딩 저장소를 찾을 수 없습니다: {args.data_dir}")
+        sys.exit(0)
+
+    id_map = ProductIdMap(os.path.join(state_dir, PRODUCT_IDS_FILE.format(index=args.index_name)))
+    products, matrix = collect_embeddings(data_paths, id_map,
+                                          os.path.join(state_dir, f'{SIMILAR_TABLE_NAME}.matrix.npy'))
+    print(f"파일 {len(data_paths)}개, 임베딩이 있는 제품 {len(products)}개, {matrix.shape[1]}차원")
+
+    table = SimilarProductsTable(state_dir, k=args.k)
+    if table.exists() and not args.full:
+        table.load()
+        table.k = args.k
+        table.update(products, matrix)
+    else:
+        table.build(products, matrix)
+    table.save()
+    print(format_similar_stats(table.stats))
+    if len(products):
+        print(f"예: product_no {products[0]} → {table.neighbors(products[0])[:5]}")
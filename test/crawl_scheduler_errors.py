@@ -0,0 +1,61 @@
+# on_page 콜백에서 오류가 났을 때 비동기 스케줄러(crawl_scheduler.CrawlScheduler)의 동작을 확인하는 스크립트
+# - 다나와 HTML 픽스처 서버(danawa_http_fixture)의 2페이지짜리 카테고리를 사용합니다.
+# - chain_pages=True (증분 크롤링): 1페이지 on_page가 실패하면 이미 예약된 2페이지는 전달되지 않고
+#   on_finish가 오류와 함께 한 번만 호출되어야 합니다 (on_finish 뒤에 on_page가 호출되면 실패).
+# - chain_pages=False: 실패한 1페이지만 건너뛰고 2페이지는 전달된 뒤 on_finish가 한 번 호출되어야 합니다.
+#
+# 사용법: python crawl_scheduler_errors.py
+
+import os
+import sys
+import threading
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from crawl_scheduler import CrawlScheduler
+from danawa_http import DanawaListFetcher
+from danawa_http_fixture import serve_fixtures
+
+CATEGORY = '테스트카테고리'
+
+
+def run(base_url, chain_pages):
+    """
+    1페이지 on_page에서 오류를 내고 (on_page로 전달된 페이지, on_finish 호출, 잘못된 순서의 호출) 기록을 반환하는 함수
+    """
+    events = {'pages': [], 'finished': [], 'after_finish': []}
+    lock = threading.Lock()
+
+    def on_page(name, page, products):
+        with lock:
+            if events['finished']:
+                events['after_finish'].append(page)
+            events['pages'].append(page)
+        if page == 1:
+            raise RuntimeError("기록 중 오류 (테스트)")
+        return False
+
+    def on_finish(name, error):
+        with lock:
+            events['finished'].append(error is not None)
+
+    fetcher = DanawaListFetcher()
+    scheduler = CrawlScheduler(fetcher, concurrency=4, rate=0, chain_pages=chain_pages)
+    stats = scheduler.run([(CATEGORY, f'{base_url}/list/?cate=16253962')], on_page, on_finish)
+    fetcher.close()
+    return events, stats
+
+
+if __name__ == '__main__':
+    server, base_url = serve_fixtures()
+    passed = True
+    try:
+        for chain_pages, expected_pages in ((True, [1]), (False, [1, 2])):
+            events, stats = run(base_url, chain_pages)
+            ok = events['pages'] == expected_pages and events['finished'] == [True] and not events['after_finish']
+            passed = passed and ok
+            print(f"chain_pages={chain_pages}: on_page {events['pages']}, on_finish {len(events['finished'])}회 "
+                  f"(오류 {events['finished']}), on_finish 뒤 on_page {events['after_finish']}, "
+                  f"오류 {stats['errors']}건 -> {'통과' if ok else '실패'}")
+    finally:
+        server.shutdown()
+    sys.exit(0 if passed else 1)
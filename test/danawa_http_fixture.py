@@ -0,0 +1,73 @@
+# 저장된 다나와 HTML 픽스처를 로컬 HTTP 서버로 제공하고 HTTP 목록 수집 엔진을 확인하는 스크립트
+# - GET  /list/?cate=...                         -> fixtures/danawa/list.html
+# - POST /list/ajax/getProductList.ajax.php      -> fixtures/danawa/ajax_page{page}.html (없으면 빈 응답)
+
+import os
+import sys
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import parse_qs
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from danawa_http import DanawaListFetcher, LIST_AJAX_PATH
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'danawa')
+
+
+class FixtureHandler(BaseHTTPRequestHandler):
+    fixture_dir = FIXTURE_DIR
+
+    def _send_file(self, file_name):
+        path = os.path.join(self.fixture_dir, file_name)
+        body = b''
+        if os.path.exists(path):
+            with open(path, 'rb') as f:
+                body = f.read()
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path.startswith('/list/'):
+            self._send_file('list.html')
+        else:
+            self.send_error(404)
+
+    def do_POST(self):
+        if not self.path.startswith(LIST_AJAX_PATH):
+            self.send_error(404)
+            return
+        length = int(self.headers.get('Content-Length') or 0)
+        form = parse_qs(self.rfile.read(length).decode('utf-8'))
+        page = form.get('page', ['1'])[0]
+        self._send_file(f'ajax_page{page}.html')
+
+    def log_message(self, format, *args):
+        pass
+
+
+def serve_fixtures(handler=FixtureHandler):
+    """
+    픽스처 서버를 백그라운드 스레드로 실행하고 (서버, 기본 URL)을 반환하는 함수
+    """
+    server = ThreadingHTTPServer(('127.0.0.1', 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f'http://127.0.0.1:{server.server_address[1]}'
+
+
+if __name__ == '__main__':
+    server, base_url = serve_fixtures()
+    try:
+        fetcher = DanawaListFetcher()
+        listing = fetcher.open_category(f'{base_url}/list/?cate=16253962')
+        print(f"총 제품 수: {listing.total_count}, 페이지 수: {listing.page_count}")
+        print(f"폼 파라미터: {listing.form}")
+        for page, products in fetcher.iter_pages(listing):
+            print(f"\n{page} 페이지 ({len(products)}개)")
+            for productName, spec_list_text, image_url, product_id in products:
+                print(f"[{product_id}] {productName} | {spec_list_text} | {image_url}")
+        fetcher.close()
+    finally:
+        server.shutdown()
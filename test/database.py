@@ -5,6 +5,13 @@ import os
 import re
 from typing import Tuple, Set, Optional
 from nutrition import get_nutrition_fields
+import sys
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from crawl_output import LoadedInputs
+from data_store import data_files, read_products, TEXT_COLUMNS
+
+# 매니페스트(SHA-256)가 지난번 적재 때와 같은 파일은 건너뜀 (False이면 모든 파일 적재)
+SKIP_UNCHANGED_INPUTS = True
 
 FIELD_MAPPING = {
     "열량": "energy_kcal",
@@ -511,7 +518,7 @@ def insert_products(file_path):
     
     try:
         print(f"\n파일 '{file_path}' 처리 시작")
-        df = pd.read_csv(file_path, encoding='utf-8')
+        df = read_products(file_path, columns=TEXT_COLUMNS)
         
         if len(df.columns) == 3:
             df.columns = ['Name', 'Spec', 'ImageURL']
@@ -547,20 +554,29 @@ def insert_products(file_path):
                 error_count += 1
         
         print(f"파일 처리 완료: 성공 {success_count}건, 실패 {error_count}건")
+        if error_count:
+            # 실패한 행이 있으면 적재 완료로 기록하지 않아 다음 실행에서 다시 적재
+            print(f"실패한 행이 있어 적재 완료로 기록하지 않음: {os.path.basename(file_path)}")
+        return error_count == 0
         
     except Exception as e:
         print(f"파일 처리 중 오류 발생: {str(e)}")
         conn.rollback()
+        return False
     finally:
         cursor.close()
         conn.close()
 
 def process_all_files():
     folder_path = "crawl_data"
-    for file_name in os.listdir(folder_path):
-        if file_name.endswith('.csv'):
-            file_path = os.path.join(folder_path, file_name)
-            insert_products(file_path)
+    loaded_inputs = LoadedInputs(os.path.join(folder_path, 'state', 'loaded_database.json'))
+    for file_path in data_files(folder_path):
+        if SKIP_UNCHANGED_INPUTS and loaded_inputs.unchanged(file_path):
+            print(f"변경 없음, 건너뜀: {os.path.basename(file_path)}")
+            continue
+        if insert_products(file_path):
+            loaded_inputs.mark(file_path)
+            loaded_inputs.save()
 
 if __name__ == "__main__":
     process_all_files()
@@ -1,30 +1,43 @@
+# 이미지 디렉토리 정리 명령 (image_maintenance.clean_images)
+# - CSV / Parquet에서 참조하지 않는 이미지(고아 이미지)를 삭제하고,
+#   지각 해시(pHash / dHash)가 비슷한 중복 이미지를 하드 링크로 바꾸거나(link) 하나로 합칩니다(collapse).
+# - 기본은 dry-run: 삭제 / 변경할 목록을 보고서 CSV로만 저장하고, --apply를 붙여야 실제로 변경합니다.
+#
+# 사용법: python duplicate_image.py [--csv-dir 경로] [--image-dir 경로] [--mode link|collapse] [--apply]
+
 import os
-import pandas as pd
+import sys
+import argparse
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from image_maintenance import (clean_images, format_clean_stats, HASH_PHASH, HASH_DHASH, HASH_METHOD,
+                               HAMMING_THRESHOLD, PIXEL_TOLERANCE, HASH_WORKERS, MODE_LINK, MODE_COLLAPSE)
+
+CSV_DIR = r'C:\dev\ZeroMoa\Danawa-Crawler\crawl_data'
+IMAGE_DIR = r'C:\dev\ZeroMoa\Danawa-Crawler\crawl_data\images'
+
+# 보고서 파일명 (CSV 디렉토리의 state 아래에 저장)
+REPORT_FILE = 'image_maintenance.csv'
 
-def clean_images_for_all_csvs(csv_dir, image_dir):
-    # 이미지 디렉토리의 모든 파일 목록
-    existing_images = set(os.listdir(image_dir))
-    
-    # CSV 디렉토리의 모든 CSV 파일 순회
-    csv_images = set()
-    for csv_file in os.listdir(csv_dir):
-        if csv_file.endswith('.csv'):
-            csv_path = os.path.join(csv_dir, csv_file)
-            df = pd.read_csv(csv_path)
-            
-            # CSV에 있는 이미지 파일명만 추출
-            for image_path in df['ImageURL']:
-                if pd.notna(image_path):  # NaN 값 체크
-                    image_name = os.path.basename(image_path)
-                    csv_images.add(image_name)
-    
-    # CSV에 없는 이미지 파일 삭제
-    for image in existing_images:
-        if image not in csv_images:
-            os.remove(os.path.join(image_dir, image))
-            print(f"삭제된 이미지: {image}")
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='이미지 디렉토리 정리 (고아 이미지 삭제, 중복 이미지 정리)')
+    parser.add_argument('--csv-dir', default=CSV_DIR, help='제품 데이터(CSV / Parquet) 디렉토리')
+    parser.add_argument('--image-dir', default=IMAGE_DIR, help='이미지 디렉토리 (하위 디렉토리 포함)')
+    parser.add_argument('--mode', choices=[MODE_LINK, MODE_COLLAPSE], default=MODE_LINK,
+                        help='중복 이미지 처리 (link: 하드 링크로 교체, collapse: 삭제 후 참조 변경, 기본값: %(default)s)')
+    parser.add_argument('--hash', choices=[HASH_PHASH, HASH_DHASH], default=HASH_METHOD,
+                        help='지각 해시 방식 (기본값: %(default)s)')
+    parser.add_argument('--threshold', type=int, default=HAMMING_THRESHOLD,
+                        help='중복 후보로 볼 해밍 거리 (0~63, 기본값: %(default)s)')
+    parser.add_argument('--tolerance', type=int, default=PIXEL_TOLERANCE,
+                        help='후보 쌍을 같은 이미지로 볼 썸네일 픽셀 차이 (0~255, 기본값: %(default)s)')
+    parser.add_argument('--workers', type=int, default=HASH_WORKERS, help='해시 계산 프로세스 수')
+    parser.add_argument('--report', default=None, help='보고서 CSV 경로 (기본값: <csv-dir>/state/image_maintenance.csv)')
+    parser.add_argument('--apply', action='store_true', help='실제로 삭제 / 변경 (없으면 dry-run)')
+    args = parser.parse_args()
 
-# 실행
-csv_dir = r'C:\dev\ZeroMoa\Danawa-Crawler\crawl_data'
-image_dir = r'C:\dev\ZeroMoa\Danawa-Crawler\crawl_data\images'
-clean_images_for_all_csvs(csv_dir, image_dir)
+    report_path = args.report or os.path.join(args.csv_dir, 'state', REPORT_FILE)
+    stats = clean_images(args.csv_dir, args.image_dir, apply=args.apply, mode=args.mode, method=args.hash,
+                         threshold=args.threshold, tolerance=args.tolerance, workers=args.workers, report_path=report_path)
+    print(format_clean_stats(stats, args.apply))
+    print(f"보고서: {report_path}")
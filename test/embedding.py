@@ -1,63 +1,59 @@
 import os
 from dotenv import load_dotenv
-from openai import OpenAI
 import pandas as pd
 from glob import glob
 import numpy as np
+import sys
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from data_store import data_files
+from embedding_job import EmbeddingJob, format_job_stats, EMBEDDING_CHUNK_ROWS
+from embedding_batch import BatchEmbeddingClient, format_embedding_stats, EMBEDDING_BASE_URL, EMBEDDING_MODEL
+from embedding_cache import EmbeddingCache, EMBEDDING_CACHE_FILE
 
 load_dotenv()
 
 embedding_api_key = os.getenv("UPSTAGE_API_KEY")
 
-embedding_client = OpenAI(
+# 모든 파일 / 실행이 함께 쓰는 임베딩 캐시 (모델 + 정규화한 Spec 텍스트 → float32 벡터)
+embedding_cache = EmbeddingCache(os.path.join('crawl_data', 'state', EMBEDDING_CACHE_FILE))
+
+# 배치(요청당 최대 100개) + 동시 요청(4개)으로 임베딩, 속도 제한 시 지수 백오프 후 재시도
+embedding_client = BatchEmbeddingClient(
     api_key=embedding_api_key,
-    base_url="https://api.upstage.ai/v1/solar"
+    base_url=os.getenv("EMBEDDING_BASE_URL", EMBEDDING_BASE_URL),
+    model=EMBEDDING_MODEL,
+    cache=embedding_cache
 )
 
-# crawl_data 폴더의 모든 CSV 파일 경로 가져오기
-file_paths = glob('crawl_data/*.csv')
-
-def get_embedding(text):
-    try:
-        response = embedding_client.embeddings.create(
-            model="solar-embedding-1-large-passage",
-            input=text
-        )
-        return response.data[0].embedding
-    except Exception as e:
-        print(f"임베딩 생성 중 오류 발생: {e}")
-        return None
+# crawl_data 폴더의 모든 데이터 파일(CSV / Parquet) 경로 가져오기
+file_paths = data_files('crawl_data')
 
 for file_path in file_paths:
     print(f"\n파일 '{file_path}' 처리 시작")
-    
+
     try:
-        df = pd.read_csv(file_path, encoding='utf-8')
-        
-        if 'Spec' not in df.columns:
-            print(f"'{file_path}'에 'Spec' 컬럼이 없습니다.")
+        # Spec을 청크 단위로 읽어 임베딩하고 청크마다 임베딩 저장소(.part)와 진행 기록에 반영
+        # (중단되면 다음 실행에서 마지막으로 완료한 청크 다음부터 이어서 진행, 원본 데이터 파일은 수정하지 않음)
+        job = EmbeddingJob(file_path, os.path.join('crawl_data', 'state'), embedding_client,
+                           chunk_rows=EMBEDDING_CHUNK_ROWS)
+        if job.done:
+            print(f"이미 임베딩 완료, 건너뜀: {file_path}")
             continue
-            
+        if job.resumed_chunks:
+            print(f"청크 {job.resumed_chunks}개 완료된 상태에서 이어서 진행")
+
         print("임베딩 생성 중...")
-        embeddings = []
-        for spec in df['Spec']:
-            if pd.isna(spec):
-                embeddings.append(None)
-            else:
-                embedding = get_embedding(str(spec))
-                embeddings.append(embedding)
-        
-        # 임베딩을 DataFrame에 추가
-        df['embedding'] = embeddings
-        
-        # 기존 파일 덮어쓰기
-        df.to_csv(file_path, index=False)
-        print(f"임베딩 완료: {file_path}")
-        
+        stored = job.run()
+        if job.done:
+            print(f"임베딩 완료: {file_path} ({stored}/{job.ledger['rows']}행, {format_job_stats(job.stats)})")
+        else:
+            print(f"임베딩 미완료 (실패한 청크부터 다음 실행에서 다시 진행): {file_path} ({format_job_stats(job.stats)})")
+
     except Exception as e:
         print(f"파일 처리 중 오류 발생: {e}")
         continue
 
+embedding_cache.close()
+print(format_embedding_stats(embedding_client.stats))
 print("\n모든 파일 처리 완료")
 
-    
\ No newline at end of file
@@ -1,17 +1,27 @@
 import os
+import sys
 from dotenv import load_dotenv
-from openai import OpenAI
 import pandas as pd
 from glob import glob
 import numpy as np
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from data_store import embedding_list, EMBEDDING_COLUMN
+from embedding_store import EmbeddingStore, has_embedding_store, write_embedding_store
+from embedding_batch import BatchEmbeddingClient, format_embedding_stats, EMBEDDING_BASE_URL, EMBEDDING_MODEL
+from embedding_cache import EmbeddingCache, EMBEDDING_CACHE_FILE
 
 load_dotenv()
 
 embedding_api_key = os.getenv("UPSTAGE_API_KEY")
 
-embedding_client = OpenAI(
+# 모든 파일 / 실행이 함께 쓰는 임베딩 캐시 (모델 + 정규화한 Spec 텍스트 → float32 벡터)
+embedding_cache = EmbeddingCache(os.path.join('crawl_data', 'state', EMBEDDING_CACHE_FILE))
+
+embedding_client = BatchEmbeddingClient(
     api_key=embedding_api_key,
-    base_url="https://api.upstage.ai/v1/solar"
+    base_url=os.getenv("EMBEDDING_BASE_URL", EMBEDDING_BASE_URL),
+    model=EMBEDDING_MODEL,
+    cache=embedding_cache
 )
 
 # crawl_data 폴더의 모든 CSV 파일 경로 가져오기
@@ -22,18 +32,6 @@ if not os.path.exists(file):
     print(f"파일을 찾을 수 없습니다: {file}")
     exit()
 
-def get_embedding(text):
-    try:
-        response = embedding_client.embeddings.create(
-            model="solar-embedding-1-large-passage",
-            input=text
-        )
-        return response.data[0].embedding
-    except Exception as e:
-        print(f"임베딩 생성 중 오류 발생: {e}")
-        return None
-
-
 print(f"\n파일 '{file}' 처리 시작")
 
 try:
@@ -44,31 +42,40 @@ try:
         exit()
     
     print("임베딩 생성 중...")
+    # 기존 임베딩: 임베딩 저장소(.npy)가 있으면 저장소, 없으면 예전 방식의 임베딩 열(JSON 리스트 문자열)
+    store = EmbeddingStore(file) if has_embedding_store(file) else None
+    if store is not None and len(store) != len(df):
+        store = None  # 행 수가 다르면 데이터 파일이 바뀐 것이므로 사용하지 않음
     embeddings = []
+    missing = []  # 새로 만들 (행 번호, Spec)
     for idx, spec in enumerate(df['Spec']):
         if pd.isna(spec):
             embeddings.append(None)
+        elif store is not None and store.get(idx) is not None:
+            embeddings.append(np.array(store.get(idx)))  # memmap에서 복사 (저장소를 다시 쓰기 전에 파일을 닫기 위해)
+        elif EMBEDDING_COLUMN in df.columns and not pd.isna(df.loc[idx, EMBEDDING_COLUMN]):
+            embeddings.append(embedding_list(df.loc[idx, EMBEDDING_COLUMN]))
         else:
-            # 이미 임베딩이 있는지 확인
-            if 'embedding' in df.columns and not pd.isna(df.loc[idx, 'embedding']):
-                embeddings.append(eval(df.loc[idx, 'embedding']))
-                print(f"기존 임베딩 사용 - 행 {idx+1}")
-            else:
-                embedding = get_embedding(str(spec))
-                embeddings.append(embedding)
-                print(f"새 임베딩 생성 - 행 {idx+1}")
-    
-    # 임베딩을 DataFrame에 추가
-    df['embedding'] = embeddings
+            embeddings.append(None)
+            missing.append((idx, str(spec)))
+
+    # 없는 행만 캐시 확인 후 배치로 요청
+    for (idx, _), embedding in zip(missing, embedding_client.embed([spec for _, spec in missing])):
+        embeddings[idx] = embedding
+    print(f"기존 임베딩 사용 {len(df) - len(missing)}행, 새 임베딩 {len(missing)}행")
     
-    # 기존 파일 덮어쓰기
-    df.to_csv(file, index=False)
+    # 임베딩 저장소(float32 .npy + 행 번호 인덱스)에 기록
+    # (예전 방식의 임베딩 열은 그대로 둠: 로더는 저장소를 먼저 사용하고, 데이터 파일을 다시 쓰면 매니페스트가 맞지 않음)
+    store = None
+    write_embedding_store(file, embeddings)
     print(f"임베딩 완료: {file}")
     
 except Exception as e:
     print(f"파일 처리 중 오류 발생: {e}")
     
 
+embedding_cache.close()
+print(format_embedding_stats(embedding_client.stats))
 print("\n모든 파일 처리 완료")
 
     
\ No newline at end of file
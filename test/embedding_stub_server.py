@@ -0,0 +1,198 @@
+# OpenAI 호환 embeddings API를 흉내 내는 로컬 서버로 배치 임베딩 클라이언트를 확인하는 스크립트
+# - POST .../embeddings  {"model": ..., "input": [텍스트, ...]}
+#   -> 텍스트마다 텍스트 해시로 정한 고정 벡터 (응답 data 순서는 섞고 index로 원래 위치 표시)
+# - 요청당 최대 텍스트 수 / 텍스트 길이를 넘으면 400, 동시 처리 중인 요청이 max_inflight를 넘거나
+#   rate_limit_ratio 확률로 429(Retry-After)를 반환하고, 요청마다 latency + 텍스트당 시간만큼 지연합니다.
+# - 크롤링 CSV 폴더의 Spec으로 기존 방식(텍스트 하나씩 순차 요청)과 배치 + 동시 요청을 비교하고
+#   모든 행의 벡터가 순서대로 맞는지 확인합니다.
+# - 임베딩 캐시(임시 SQLite 파일)를 붙여 같은 Spec을 두 번 처리하고 적중률 / 줄어든 요청 수를 확인합니다.
+#
+# 사용법: python embedding_stub_server.py [크롤링 CSV 폴더] [텍스트 수]
+
+import os
+import sys
+import csv
+import json
+import random
+import shutil
+import hashlib
+import tempfile
+import threading
+from glob import glob
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from embedding_batch import BatchEmbeddingClient, format_embedding_stats
+from embedding_cache import EmbeddingCache, EMBEDDING_CACHE_FILE
+
+DEFAULT_DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'crawl_data - 복사본')
+STUB_MODEL = 'stub-embedding'
+
+
+def stub_vector(text, dim):
+    """
+    텍스트마다 항상 같은 단위 벡터 (서버 응답 확인용)
+    """
+    seed = int.from_bytes(hashlib.sha256(text.encode('utf-8')).digest()[:8], 'little')
+    vector = np.random.default_rng(seed).standard_normal(dim).astype(np.float32)
+    return (vector / np.linalg.norm(vector)).tolist()
+
+
+class EmbeddingHandler(BaseHTTPRequestHandler):
+    dim = 64
+    max_batch = 100
+    max_text_chars = 4000
+    max_inflight = 8
+    rate_limit_ratio = 0.0
+    latency = 0.05
+    per_item_latency = 0.0005
+    api_key = None  # 설정하면 Authorization 헤더가 다른 요청에 401을 돌려줌
+    inflight = 0
+    lock = threading.Lock()
+    counts = {'requests': 0, 'rate_limited': 0, 'rejected': 0}
+
+    def _send_json(self, status, body, headers=None):
+        data = json.dumps(body).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _error(self, status, message, headers=None):
+        self._send_json(status, {'error': {'message': message, 'type': 'invalid_request_error', 'code': status}},
+                        headers)
+
+    def do_POST(self):
+        if not self.path.rstrip('/').endswith('/embeddings'):
+            self.send_error(404)
+            return
+        length = int(self.headers.get('Content-Length') or 0)
+        payload = json.loads(self.rfile.read(length).decode('utf-8'))
+        texts = payload.get('input')
+        if isinstance(texts, str):
+            texts = [texts]
+
+        cls = type(self)
+        if cls.api_key is not None and self.headers.get('Authorization') != f'Bearer {cls.api_key}':
+            self._send_json(401, {'error': {'message': 'invalid api key', 'type': 'authentication_error',
+                                            'code': 401}})
+            return
+        with cls.lock:
+            cls.counts['requests'] += 1
+            limited = cls.inflight >= cls.max_inflight or random.random() < cls.rate_limit_ratio
+            if limited:
+                cls.counts['rate_limited'] += 1
+            else:
+                cls.inflight += 1
+        if limited:
+            self._error(429, 'rate limit exceeded', {'Retry-After': '0.1'})
+            return
+
+        try:
+            if not texts or len(texts) > cls.max_batch:
+                cls.counts['rejected'] += 1
+                self._error(400, f'input must contain 1 to {cls.max_batch} texts')
+                return
+            if any(len(text) > cls.max_text_chars for text in texts):
+                cls.counts['rejected'] += 1
+                self._error(400, f'text longer than {cls.max_text_chars} characters')
+                return
+            threading.Event().wait(cls.latency + cls.per_item_latency * len(texts))
+            data = [{'object': 'embedding', 'index': index, 'embedding': stub_vector(text, cls.dim)}
+                    for index, text in enumerate(texts)]
+            random.shuffle(data)  # 클라이언트가 index로 순서를 맞추는지 확인
+            tokens = sum(len(text) for text in texts)
+            self._send_json(200, {'object': 'list', 'data': data, 'model': payload.get('model', STUB_MODEL),
+                                  'usage': {'prompt_tokens': tokens, 'total_tokens': tokens}})
+        finally:
+            with cls.lock:
+                cls.inflight -= 1
+
+    def log_message(self, format, *args):
+        pass
+
+
+def serve_embeddings(handler=EmbeddingHandler):
+    """
+    임베딩 스텁 서버를 백그라운드 스레드로 실행하고 (서버, 기본 URL)을 반환하는 함수
+    """
+    server = ThreadingHTTPServer(('127.0.0.1', 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f'http://127.0.0.1:{server.server_address[1]}/v1'
+
+
+def load_specs(data_dir, count):
+    specs = []
+    for path in sorted(glob(os.path.join(data_dir, '*.csv'))):
+        with open(path, 'r', newline='', encoding='utf-8-sig') as f:
+            reader = csv.reader(f)
+            next(reader, None)
+            specs.extend(row[1] for row in reader if len(row) > 1)
+        if len(specs) >= count:
+            break
+    return specs[:count]
+
+
+def check_order(texts, embeddings, dim):
+    mismatched = 0
+    for text, embedding in zip(texts, embeddings):
+        # 빈 텍스트와 서버가 거절하는 텍스트는 None
+        valid = text and text.strip() and len(text) <= EmbeddingHandler.max_text_chars
+        expected = stub_vector(text, dim) if valid else None
+        if (embedding is None) != (expected is None) or (
+                expected is not None and not np.allclose(embedding, expected, atol=1e-6)):
+            mismatched += 1
+    return mismatched
+
+
+if __name__ == '__main__':
+    data_dir = sys.argv[1] if len(sys.argv) > 1 else DEFAULT_DATA_DIR
+    count = int(sys.argv[2]) if len(sys.argv) > 2 else 3000
+
+    texts = load_specs(data_dir, count)
+    if not texts:
+        print(f"Spec을 찾을 수 없습니다: {data_dir}")
+        sys.exit(0)
+    texts[len(texts) // 2] = 'x' * (EmbeddingHandler.max_text_chars + 1)  # 400 오류로 배치 분할 확인
+    texts[len(texts) // 3] = ''  # 빈 텍스트는 요청하지 않음
+
+    server, base_url = serve_embeddings()
+    try:
+        # 기존 방식: 텍스트 하나씩 순차 요청 (일부만 측정해 전체 시간 추정)
+        sample = texts[:200]
+        sequential = BatchEmbeddingClient(base_url=base_url, model=STUB_MODEL, batch_size=1, concurrency=1)
+        sequential.embed(sample)
+        sequential_rate = sequential.stats['texts'] / sequential.stats['elapsed']
+        print(f"순차 요청 (텍스트 {len(sample)}개): {format_embedding_stats(sequential.stats)}")
+
+        # 배치 + 동시 요청 (일부 요청은 429로 거절)
+        EmbeddingHandler.rate_limit_ratio = 0.1
+        batched = BatchEmbeddingClient(base_url=base_url, model=STUB_MODEL, backoff=0.05)
+        embeddings = batched.embed(texts)
+        batched_rate = batched.stats['texts'] / batched.stats['elapsed']
+        print(f"배치 + 동시 요청 (텍스트 {len(texts)}개): {format_embedding_stats(batched.stats)}")
+        print(f"서버: {EmbeddingHandler.counts}")
+        print(f"처리량: {batched_rate / sequential_rate:.1f}배, "
+              f"순서 / 값 불일치 {check_order(texts, embeddings, EmbeddingHandler.dim)}개")
+
+        # 임베딩 캐시: 첫 실행은 같은 Spec만 한 번씩 요청, 두 번째 실행은 캐시에서 모두 읽음
+        cache_dir = tempfile.mkdtemp()
+        try:
+            cache = EmbeddingCache(os.path.join(cache_dir, EMBEDDING_CACHE_FILE))
+            for run in (1, 2):
+                cached = BatchEmbeddingClient(base_url=base_url, model=STUB_MODEL, backoff=0.05, cache=cache)
+                embeddings = cached.embed(texts)
+                print(f"캐시 사용 {run}회차: {format_embedding_stats(cached.stats)}, "
+                      f"순서 / 값 불일치 {check_order(texts, embeddings, EmbeddingHandler.dim)}개")
+            print(f"캐시 항목 {cache.count()}개, 파일 크기 "
+                  f"{os.path.getsize(os.path.join(cache_dir, EMBEDDING_CACHE_FILE)) / 1024 / 1024:.1f}MB")
+            cache.close()
+        finally:
+            shutil.rmtree(cache_dir)
+    finally:
+        server.shutdown()
@@ -0,0 +1,110 @@
+# 이미지 URL 캐시(ImageUrlCache)가 크롤링 → DataSort → 다시 크롤링 흐름에서 적중하는지 확인하는 스크립트
+# - 로컬 HTTP 서버가 픽스처 이미지를 ETag와 함께 돌려주고, If-None-Match가 같으면 304를 돌려줍니다.
+# - 임시 디렉토리에서 Crawler(이름 기반 저장소, 이미지 URL 캐시 사용)로 이미지를 받아 카테고리 CSV를 만들고
+#   DataSort로 정제(이미지 파일 이름을 정제된 제품명으로 변경)한 뒤, 같은 제품을 다시 크롤링합니다.
+# - 다시 크롤링할 때 모든 이미지가 304(캐시 적중)로 처리되고 200(전체 다운로드)이 없어야 합니다.
+#
+# 사용법: python image_cache_recrawl.py [이미지 수]
+
+import os
+import sys
+import csv
+import shutil
+import tempfile
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import quote, unquote
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+import new_copy
+from new_copy import Crawler, DEDUP_KEY, IMAGE_STORE_NAMED
+from crawl_checkpoint import CSV_HEADER
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'crawl_data - 복사본', 'images')
+CATEGORY = '테스트카테고리'
+
+
+class ImageHandler(BaseHTTPRequestHandler):
+    counts = {200: 0, 304: 0}
+    lock = threading.Lock()
+
+    def do_GET(self):
+        name = unquote(self.path.lstrip('/'))
+        path = os.path.join(FIXTURE_DIR, name)
+        if not os.path.exists(path):
+            self.send_error(404)
+            return
+        etag = f'"{os.path.getsize(path)}-{len(name)}"'
+        status = 304 if self.headers.get('If-None-Match') == etag else 200
+        with self.lock:
+            self.counts[status] += 1
+        self.send_response(status)
+        self.send_header('ETag', etag)
+        if status == 304:
+            self.end_headers()
+            return
+        with open(path, 'rb') as f:
+            data = f.read()
+        self.send_header('Content-Type', 'image/jpeg')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def crawl(crawler, products, base_url):
+    """
+    제품마다 이미지를 받아 크롤링 CSV(원래 제품명, 스펙, 이미지 경로)를 쓰는 함수
+    """
+    with open(os.path.join(new_copy.DATA_PATH, f'{CATEGORY}.csv'), 'w', newline='', encoding='utf-8-sig') as f:
+        writer = csv.writer(f)
+        writer.writerow(CSV_HEADER)
+        for name in products:
+            image_path = crawler.save_image(f'{base_url}/{quote(name + ".jpg")}', name, CATEGORY)
+            writer.writerow([name, f'{name} 스펙', image_path])
+    crawler.image_cache.flush()
+
+
+if __name__ == '__main__':
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 30
+    products = sorted(os.path.splitext(name)[0] for name in os.listdir(FIXTURE_DIR)
+                      if name.endswith('.jpg') and '+' not in name)[:count]
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), ImageHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f'http://127.0.0.1:{server.server_address[1]}'
+
+    work_dir = tempfile.mkdtemp()
+    current_dir = os.getcwd()
+    try:
+        # 크롤러는 현재 디렉토리의 categories.csv와 DATA_PATH를 사용
+        os.chdir(work_dir)
+        with open('categories.csv', 'w', newline='', encoding='utf-8-sig') as f:
+            csv.writer(f).writerows([['name', 'url'], [CATEGORY, base_url]])
+        new_copy.DATA_PATH = os.path.join(work_dir, 'crawl_data')
+        new_copy.DATA_STATE_PATH = os.path.join(new_copy.DATA_PATH, 'state')
+        os.makedirs(new_copy.DATA_PATH)
+
+        crawler = Crawler(image_store=IMAGE_STORE_NAMED, image_cache=True, dedup=DEDUP_KEY, cross_dedup=False)
+        crawl(crawler, products, base_url)
+        print(f"첫 크롤링: 이미지 {len(products)}개, 응답 {ImageHandler.counts}")
+
+        crawler.DataSort(processes=1)
+        image_dir = os.path.join(crawler.image_path, CATEGORY)
+        renamed = sum(not os.path.exists(os.path.join(image_dir, f'{name}.jpg')) for name in products)
+        print(f"DataSort: 이름이 바뀐 이미지 {renamed}개")
+
+        ImageHandler.counts.update({200: 0, 304: 0})
+        crawl(crawler, products, base_url)
+        print(f"다시 크롤링: 응답 {ImageHandler.counts}")
+        crawler.image_cache.close()
+
+        passed = renamed > 0 and ImageHandler.counts[200] == 0 and ImageHandler.counts[304] == len(products)
+        print("확인 결과:", "통과" if passed else "실패 (이름이 바뀐 이미지를 다시 받음)")
+    finally:
+        os.chdir(current_dir)
+        server.shutdown()
+        shutil.rmtree(work_dir)
+    sys.exit(0 if passed else 1)
@@ -2,6 +2,9 @@ import pandas as pd
 import os
 from pathlib import Path
 import re
+import sys
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from data_store import data_files, read_products, TEXT_COLUMNS
 
 # FIELD_MAPPING을 전역 변수로 이동
 FIELD_MAPPING = {
@@ -177,12 +180,12 @@ def get_nutrition_fields():
         "카테킨": set()
     }
 
-    for csv_file in crawl_data_path.glob('*.csv'):
+    for csv_file in map(Path, data_files(crawl_data_path)):
         total_files += 1
         print(f"\n2. 처리 중인 파일: {csv_file.name}")
         
         try:
-            df = pd.read_csv(csv_file, encoding='utf-8')
+            df = read_products(str(csv_file), columns=TEXT_COLUMNS)
             print(f"   - 파일 크기: {len(df)} 행 x {len(df.columns)} 열")
             
             nutrition_info_found = False
@@ -299,9 +302,9 @@ def analyze_nutrition_units():
     crawl_data_path = Path('crawl_data')
     
     # CSV 파일들을 순회하며 단위 분석
-    for csv_file in crawl_data_path.glob('*.csv'):
+    for csv_file in map(Path, data_files(crawl_data_path)):
         try:
-            df = pd.read_csv(csv_file, encoding='utf-8')
+            df = read_products(str(csv_file), columns=TEXT_COLUMNS)
             
             for _, row in df.iterrows():
                 for col in df.columns:
@@ -393,12 +396,12 @@ def analyze_unit_conversions():
     
     print("단위 변환 분석 시작...")
     
-    for csv_file in crawl_data_path.glob('*.csv'):
+    for csv_file in map(Path, data_files(crawl_data_path)):
         total_files += 1
         print(f"\r처리 중인 파일: {csv_file.name}", end='')
         
         try:
-            df = pd.read_csv(csv_file, encoding='utf-8')
+            df = read_products(str(csv_file), columns=TEXT_COLUMNS)
             
             for _, row in df.iterrows():
                 for col in df.columns:
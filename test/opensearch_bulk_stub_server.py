@@ -0,0 +1,186 @@
+# OpenSearch _bulk API를 흉내 내는 로컬 서버로 병렬 벌크 적재(opensearch_bulk.BulkIndexer)를 확인하는 스크립트
+# - POST [/<인덱스>]/_bulk  (NDJSON: action 줄 + 문서 줄)
+#   -> 항목마다 status 201과 _id를 돌려주고, reject_ratio 확률로 429(es_rejected_execution_exception)를 돌려줍니다.
+#   요청 본문이 max_content_length를 넘으면 413, 요청마다 latency + MB당 시간(색인 시간)만큼 지연합니다.
+# - 합성 문서(임베딩 4096차원)로 기존 방식(2500개씩 리스트로 모아 helpers.bulk 순차 호출)과
+#   BulkIndexer(스레드 1개 / 여러 개, 일부 항목 429 거부)를 비교하고, 서버에 저장된 문서 수 / 값,
+#   최대 요청 크기(max_chunk_bytes 이하인지), 최대 동시 요청 수를 확인합니다.
+#
+# 사용법: python opensearch_bulk_stub_server.py [문서 수] [차원]
+
+import os
+import sys
+import json
+import random
+import logging
+import threading
+from time import perf_counter
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+import numpy as np
+from opensearchpy import OpenSearch
+from opensearchpy.helpers import bulk
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from opensearch_bulk import BulkIndexer, format_bulk_stats, BULK_THREADS
+
+STUB_INDEX = 'product'
+MAX_CHUNK_BYTES = 8 * 1024 * 1024
+
+
+class BulkHandler(BaseHTTPRequestHandler):
+    max_content_length = 100 * 1024 * 1024
+    reject_ratio = 0.0
+    latency = 0.05
+    per_mb_latency = 0.1  # 서버의 색인(HNSW 그래프 갱신) 시간 흉내
+    inflight = 0
+    lock = threading.Lock()
+    documents = {}
+    counts = {'requests': 0, 'items': 0, 'rejected': 0, 'too_large': 0, 'max_bytes': 0, 'max_inflight': 0}
+
+    def _send_json(self, status, body):
+        data = json.dumps(body).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_POST(self):
+        path = self.path.split('?')[0].rstrip('/')
+        if not path.endswith('/_bulk'):
+            self.send_error(404)
+            return
+        default_index = path[1:-len('/_bulk')] or None
+        length = int(self.headers.get('Content-Length') or 0)
+        body = self.rfile.read(length)
+
+        cls = type(self)
+        with cls.lock:
+            cls.counts['requests'] += 1
+            cls.counts['max_bytes'] = max(cls.counts['max_bytes'], length)
+            cls.inflight += 1
+            cls.counts['max_inflight'] = max(cls.counts['max_inflight'], cls.inflight)
+        try:
+            if length > cls.max_content_length:
+                cls.counts['too_large'] += 1
+                self._send_json(413, {'error': {'type': 'content_too_long_exception',
+                                                'reason': f'request body is too large ({length} bytes)'},
+                                      'status': 413})
+                return
+            lines = [line for line in body.decode('utf-8').split('\n') if line]
+            threading.Event().wait(cls.latency + cls.per_mb_latency * length / 1024 / 1024)
+            items = []
+            position = 0
+            while position < len(lines):
+                op_type, action = next(iter(json.loads(lines[position]).items()))
+                source = json.loads(lines[position + 1]) if op_type != 'delete' else None
+                position += 1 if op_type == 'delete' else 2
+                index_name = action.get('_index', default_index)
+                with cls.lock:
+                    cls.counts['items'] += 1
+                    rejected = random.random() < cls.reject_ratio
+                    if rejected:
+                        cls.counts['rejected'] += 1
+                    else:
+                        cls.documents[(index_name, action['_id'])] = source
+                if rejected:
+                    items.append({op_type: {'_index': index_name, '_id': action['_id'], 'status': 429,
+                                            'error': {'type': 'es_rejected_execution_exception',
+                                                      'reason': 'rejected execution (queue capacity 200)'}}})
+                else:
+                    items.append({op_type: {'_index': index_name, '_id': action['_id'], '_version': 1,
+                                            'result': 'created', 'status': 201}})
+            self._send_json(200, {'took': 1, 'errors': any('error' in next(iter(item.values())) for item in items),
+                                  'items': items})
+        finally:
+            with cls.lock:
+                cls.inflight -= 1
+
+    def log_message(self, format, *args):
+        pass
+
+
+def serve_bulk(handler=BulkHandler):
+    """
+    _bulk 스텁 서버를 백그라운드 스레드로 실행하고 (서버, OpenSearch 클라이언트)를 반환하는 함수
+    """
+    server = ThreadingHTTPServer(('127.0.0.1', 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    client = OpenSearch(hosts=[{'host': '127.0.0.1', 'port': server.server_address[1]}], timeout=60,
+                        pool_maxsize=BULK_THREADS)
+    return server, client
+
+
+def stub_embedding(product_no, dim):
+    return np.random.default_rng(product_no).standard_normal(dim).astype(np.float32)
+
+
+def stub_documents(count, dim):
+    """
+    insert_opensearch.py와 같은 모양의 합성 문서 생성기
+    """
+    for product_no in range(1, count + 1):
+        yield {
+            "_index": STUB_INDEX,
+            "_id": str(product_no),
+            "_source": {
+                "product_no": product_no,
+                "product_name": f"제품 {product_no}",
+                "product_spec": "1회 제공량 30g / 열량 120kcal",
+                "spec_emb": stub_embedding(product_no, dim).tolist()
+            }
+        }
+
+
+def check_documents(count, dim):
+    mismatched = 0
+    for product_no in range(1, count + 1):
+        source = BulkHandler.documents.get((STUB_INDEX, str(product_no)))
+        if source is None or source['product_no'] != product_no or \
+                not np.array_equal(np.asarray(source['spec_emb'], dtype=np.float32), stub_embedding(product_no, dim)):
+            mismatched += 1
+    return mismatched
+
+
+def reset_server():
+    BulkHandler.documents.clear()
+    for key in BulkHandler.counts:
+        BulkHandler.counts[key] = 0
+
+
+if __name__ == '__main__':
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    dim = int(sys.argv[2]) if len(sys.argv) > 2 else 4096
+    logging.basicConfig(level=logging.WARNING, format='%(levelname)s - %(message)s')
+
+    server, client = serve_bulk()
+    try:
+        # 기존 방식: 2500개씩 리스트로 모아 helpers.bulk 순차 호출 (요청당 500개, 바이트 한도는 기본값 100MB)
+        start = perf_counter()
+        bulk_docs = []
+        for document in stub_documents(count, dim):
+            bulk_docs.append(document)
+            if len(bulk_docs) >= 2500:
+                bulk(client, bulk_docs)
+                bulk_docs = []
+        if bulk_docs:
+            bulk(client, bulk_docs)
+        baseline = perf_counter() - start
+        print(f"기존 방식 (helpers.bulk 순차): 문서 {count}개, {baseline:.1f}초, {count / baseline:,.0f} 문서/초, "
+              f"최대 요청 {BulkHandler.counts['max_bytes'] / 1024 / 1024:.1f}MB, "
+              f"불일치 {check_documents(count, dim)}개")
+
+        for threads, reject_ratio in ((1, 0.0), (BULK_THREADS, 0.0), (BULK_THREADS, 0.1)):
+            reset_server()
+            BulkHandler.reject_ratio = reject_ratio
+            indexer = BulkIndexer(client, thread_count=threads, max_chunk_bytes=MAX_CHUNK_BYTES, backoff=0.1)
+            stats = indexer.index(stub_documents(count, dim), f"스레드 {threads}개, 거부 {reject_ratio:.0%}")
+            print(format_bulk_stats(stats, f"BulkIndexer 스레드 {threads}개, 거부 {reject_ratio:.0%}"))
+            print(f"  서버: 요청 {BulkHandler.counts['requests']}개, 최대 요청 "
+                  f"{BulkHandler.counts['max_bytes'] / 1024 / 1024:.1f}MB (한도 {MAX_CHUNK_BYTES / 1024 / 1024:.0f}MB), "
+                  f"최대 동시 요청 {BulkHandler.counts['max_inflight']}개, 거부 항목 {BulkHandler.counts['rejected']}개, "
+                  f"저장 문서 {len(BulkHandler.documents)}개, 불일치 {check_documents(count, dim)}개, "
+                  f"기존 방식 대비 {baseline / stats['elapsed']:.1f}배")
+    finally:
+        server.shutdown()
@@ -0,0 +1,120 @@
+# 임베딩 차원 축소 / 양자화 평가 및 적용 명령 (embedding_reduce)
+# - 평가: 임베딩 저장소의 벡터(최대 --eval-rows행)로 (축소 방식, 차원, 양자화) 조합마다 recall@k를 계산하고
+#   기준(--threshold) 이상인 설정 중 벡터 크기가 가장 작은 설정을 표시합니다.
+#   저장소가 없으면 --synthetic 행 수로 합성 임베딩(저차원 구조 + 잡음, 단위 벡터)을 만들어 평가합니다.
+# - --apply: 고른 설정(또는 --dim / --method / --quantization)으로 학습한 설정 파일을 state/embedding_reducer.npz에
+#   저장하고, 모든 데이터 파일의 축소 저장소(<이름>.embeddings.<설정>.npy)를 만듭니다.
+#   insert_opensearch.py의 EMBEDDING_REDUCER에 설정 파일 경로를 넣으면 같은 차원 / 양자화로 인덱스를 만듭니다.
+#
+# 사용법: python reduce_embeddings.py [--data-dir 경로] [--dims 128,256,512] [--threshold 0.9] [--apply]
+
+import os
+import sys
+import argparse
+from time import perf_counter
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from data_store import data_files
+from embedding_store import EmbeddingStore, has_embedding_store
+from embedding_reduce import (EmbeddingReducer, evaluate_reductions, choose_reduction, format_reduction_results,
+                              write_reduced_store, REDUCE_METHODS, REDUCE_PCA, QUANT_FLOAT16, QUANT_INT8,
+                              RECALL_K, RECALL_QUERIES, RECALL_THRESHOLD, FIT_SAMPLE_ROWS, REDUCER_FILE)
+
+DATA_DIR = r'C:\dev\ZeroMoa\ZeroMoa\crawl_data'
+
+# 평가에 사용하는 최대 행 수
+EVAL_ROWS = 50000
+
+QUANT_CHOICES = {'float32': None, 'float16': QUANT_FLOAT16, 'int8': QUANT_INT8}
+
+
+def store_matrix(data_paths, max_rows, seed=0):
+    """
+    여러 데이터 파일의 임베딩 저장소에서 최대 max_rows행을 무작위로 모은 float32 행렬
+    """
+    matrices = [EmbeddingStore(path).matrix for path in data_paths]
+    matrices = [matrix for matrix in matrices if len(matrix)]
+    if not matrices:
+        return None
+    offsets = np.cumsum([0] + [len(matrix) for matrix in matrices])
+    total = int(offsets[-1])
+    rows = np.arange(total) if total <= max_rows else \
+        np.sort(np.random.default_rng(seed).choice(total, max_rows, replace=False))
+    parts = []
+    for number, matrix in enumerate(matrices):
+        local = rows[(rows >= offsets[number]) & (rows < offsets[number + 1])] - offsets[number]
+        parts.append(np.asarray(matrix[local], dtype=np.float32))
+    return np.concatenate(parts)
+
+
+def synthetic_embeddings(rows, dim, rank=256, clusters=200, seed=0):
+    """
+    실제 임베딩처럼 분산이 일부 방향에 몰린(멱법칙) 군집 구조 + 잡음을 가진 단위 벡터
+    """
+    rng = np.random.default_rng(seed)
+    basis = rng.standard_normal((rank, dim)).astype(np.float32) / np.sqrt(dim)
+    spectrum = (np.arange(1, rank + 1) ** -0.6).astype(np.float32)
+    centers = rng.standard_normal((clusters, rank)).astype(np.float32) * spectrum
+    labels = rng.integers(0, clusters, rows)
+    latent = centers[labels] + 0.5 * rng.standard_normal((rows, rank)).astype(np.float32) * spectrum
+    matrix = latent @ basis + 0.003 * rng.standard_normal((rows, dim)).astype(np.float32)
+    return matrix / np.linalg.norm(matrix, axis=1, keepdims=True)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='임베딩 차원 축소 / 양자화 평가 및 적용')
+    parser.add_argument('--data-dir', default=DATA_DIR, help='데이터 파일 / 임베딩 저장소 디렉토리')
+    parser.add_argument('--dims', default='128,256,512,1024', help='평가할 축소 차원 목록 (쉼표 구분)')
+    parser.add_argument('--methods', default=REDUCE_PCA, help=f'축소 방식 목록 ({", ".join(REDUCE_METHODS)})')
+    parser.add_argument('--quantizations', default='float32,float16,int8', help='양자화 목록 (float32,float16,int8)')
+    parser.add_argument('--k', type=int, default=RECALL_K, help='recall@k의 k (기본값: %(default)s)')
+    parser.add_argument('--queries', type=int, default=RECALL_QUERIES, help='질의 수 (기본값: %(default)s)')
+    parser.add_argument('--threshold', type=float, default=RECALL_THRESHOLD, help='recall 기준 (기본값: %(default)s)')
+    parser.add_argument('--eval-rows', type=int, default=EVAL_ROWS, help='평가에 사용할 최대 행 수')
+    parser.add_argument('--sample', type=int, default=FIT_SAMPLE_ROWS, help='학습에 사용할 최대 행 수')
+    parser.add_argument('--synthetic', type=int, default=0, help='저장소 대신 합성 임베딩 행 수 (0이면 사용 안 함)')
+    parser.add_argument('--synthetic-dim', type=int, default=4096, help='합성 임베딩 차원')
+    parser.add_argument('--apply', action='store_true', help='설정을 학습해 저장하고 축소 저장소를 만듦')
+    parser.add_argument('--dim', type=int, default=None, help='--apply에 사용할 차원 (없으면 평가로 고른 설정)')
+    parser.add_argument('--method', choices=REDUCE_METHODS, default=None, help='--apply에 사용할 축소 방식')
+    parser.add_argument('--quantization', choices=list(QUANT_CHOICES), default=None, help='--apply에 사용할 양자화')
+    args = parser.parse_args()
+
+    data_paths = [path for path in data_files(args.data_dir) if has_embedding_store(path)]
+    if args.synthetic:
+        matrix = synthetic_embeddings(args.synthetic, args.synthetic_dim)
+    else:
+        matrix = store_matrix(data_paths, args.eval_rows)
+    if matrix is None:
+        print(f"임베딩 저장소를 찾을 수 없습니다: {args.data_dir} (--synthetic으로 합성 데이터 평가 가능)")
+        sys.exit(0)
+
+    start = perf_counter()
+    results = evaluate_reductions(matrix, [int(dim) for dim in args.dims.split(',')],
+                                  methods=args.methods.split(','),
+                                  quantizations=[QUANT_CHOICES[name] for name in args.quantizations.split(',')],
+                                  k=args.k, queries=args.queries, sample=args.sample)
+    print(f"행 {len(matrix):,}개, {matrix.shape[1]}차원, 질의 {min(args.queries, len(matrix))}개 "
+          f"({perf_counter() - start:.1f}초)")
+    print(format_reduction_results(results, args.k, args.threshold))
+
+    if args.apply:
+        if args.synthetic:
+            print("합성 데이터로는 적용하지 않습니다.")
+            sys.exit(0)
+        chosen = choose_reduction(results, args.threshold)
+        dim = args.dim or (chosen and chosen['method'] and chosen['dim'])
+        if not dim:
+            print("적용할 설정이 없습니다 (--dim으로 지정).")
+            sys.exit(0)
+        method = args.method or (chosen['method'] if chosen and chosen['method'] else REDUCE_PCA)
+        quantization = QUANT_CHOICES[args.quantization] if args.quantization else (chosen or {}).get('quantization')
+        reducer = EmbeddingReducer(dim, method, quantization).fit(matrix, args.sample)
+        reducer_path = os.path.join(args.data_dir, 'state', REDUCER_FILE)
+        reducer.save(reducer_path)
+        for path in data_paths:
+            rows = write_reduced_store(path, reducer)
+            print(f"축소 저장소 생성: {os.path.basename(path)} ({rows}행, {reducer.name})")
+        print(f"설정 파일: {reducer_path} (insert_opensearch.py의 EMBEDDING_REDUCER에 지정)")
@@ -1,6 +1,9 @@
 import pandas as pd
 import re
 import os
+import sys
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from data_store import data_files, read_products
 
 def extract_serving_size(text):
     if pd.isna(text) or '[영양정보]' not in str(text):
@@ -17,8 +20,8 @@ def extract_serving_size(text):
 
 def process_csv_file(file_path):
     try:
-        # CSV 파일 읽기
-        df = pd.read_csv(file_path)
+        # 데이터 파일(CSV / Parquet) 읽기 (Name, Spec 열만)
+        df = read_products(file_path, columns=['Name', 'Spec'])
         
         # Spec 컬럼에서 1회 제공량 정보 추출
         serving_info = df['Spec'].apply(extract_serving_size)
@@ -52,9 +55,7 @@ def process_csv_file(file_path):
         print(f"파일 처리 중 오류 발생: {e}")
         return None
 
-# crawl_data 폴더의 모든 CSV 파일 처리
+# crawl_data 폴더의 모든 정제 데이터 파일 처리
 folder_path = "crawl_data"
-for file_name in os.listdir(folder_path):
-    if file_name.endswith('.csv') and file_name.startswith('정제_중복제거_'):
-        file_path = os.path.join(folder_path, file_name)
-        process_csv_file(file_path)
+for file_path in data_files(folder_path, prefix='정제_중복제거_'):
+    process_csv_file(file_path)
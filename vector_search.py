@@ -0,0 +1,289 @@
+# 프로세스 안에서 동작하는 벡터 검색 (OpenSearch 없이 배치 작업 / 테스트용)
+# - ExactIndex: 완전 탐색. 행렬(memmap 가능)을 block_rows행씩 읽어 질의 묶음과 한 번의 행렬 곱으로 거리를 계산하고
+#   블록마다 상위 k개만 남깁니다. 행 노름은 처음 한 번만 계산합니다.
+# - IVFIndex: k-means 중심(nlist개)으로 벡터를 나눈 역색인. 질의마다 가까운 중심 nprobe개의 목록만 탐색합니다.
+#   같은 목록을 탐색하는 질의를 모아 목록마다 행렬 곱 한 번으로 계산합니다 (목록 순서로 재배열한 벡터 사용).
+#   save / load로 중심 / 목록(.npz)과 재배열한 벡터(.npy, memmap)를 저장합니다.
+# - 거리: l2(제곱 L2 거리, 작을수록 가까움, OpenSearch space_type l2와 같은 순서) / ip(내적, 클수록 가까움)
+#   search는 (행 번호, 점수) 배열을 반환하며 점수는 l2면 거리, ip면 내적입니다. 결과가 k개보다 적으면 행 번호 -1.
+
+import os
+
+import numpy as np
+
+from crawl_output import publish
+
+# 거리 종류
+METRIC_L2 = 'l2'
+METRIC_IP = 'ip'
+METRICS = (METRIC_L2, METRIC_IP)
+
+# 한 번에 읽는 행렬 행 수 / 한 번에 계산하는 질의 수 (질의 x 블록 거리 행렬 크기를 제한)
+SEARCH_BLOCK_ROWS = 8192
+QUERY_BATCH = 1024
+
+# IVF: 목록당 학습 표본 수 / k-means 반복 횟수 / 기본 탐색 목록 수
+IVF_TRAIN_PER_LIST = 64
+IVF_ITERATIONS = 10
+IVF_NPROBE = 8
+
+# IVF 저장 파일 이름 (<경로>.ivf.npz, <경로>.ivf.vectors.npy)
+IVF_META_SUFFIX = '.ivf.npz'
+IVF_VECTORS_SUFFIX = '.ivf.vectors.npy'
+
+
+def row_norms(matrix, block_rows=SEARCH_BLOCK_ROWS):
+    """
+    행마다 제곱 노름 (memmap은 블록 단위로 읽음)
+    """
+    norms = np.empty(len(matrix), dtype=np.float32)
+    for start in range(0, len(matrix), block_rows):
+        block = np.asarray(matrix[start:start + block_rows], dtype=np.float32)
+        norms[start:start + len(block)] = np.einsum('ij,ij->i', block, block)
+    return norms
+
+
+def merge_top_k(best_costs, best_rows, costs, rows, k):
+    """
+    지금까지의 상위 k개와 새 후보를 합쳐 비용이 작은 k개를 남기는 함수 (정렬은 마지막에 한 번)
+    """
+    merged_costs = np.concatenate([best_costs, costs], axis=1)
+    merged_rows = np.concatenate([best_rows, rows], axis=1)
+    if merged_costs.shape[1] > k:
+        keep = np.argpartition(merged_costs, k - 1, axis=1)[:, :k]
+        merged_costs = np.take_along_axis(merged_costs, keep, 1)
+        merged_rows = np.take_along_axis(merged_rows, keep, 1)
+    return merged_costs, merged_rows
+
+
+def finish_top_k(costs, rows, metric):
+    """
+    상위 k개를 가까운 순서로 정렬하고 비용을 점수로 바꾸는 함수 (찾지 못한 자리는 행 번호 -1)
+    """
+    order = np.argsort(costs, axis=1, kind='stable')
+    costs = np.take_along_axis(costs, order, 1)
+    rows = np.take_along_axis(rows, order, 1)
+    rows[~np.isfinite(costs)] = -1
+    return rows, (costs if metric == METRIC_L2 else -costs)
+
+
+def block_costs(queries, query_norms, block, block_norms, metric):
+    """
+    질의 x 블록 비용 행렬 (l2: 제곱 거리, ip: -내적)
+    """
+    products = queries @ block.T
+    if metric == METRIC_IP:
+        return -products
+    return np.maximum(query_norms[:, None] + block_norms[None, :] - 2 * products, 0)
+
+
+class ExactIndex:
+    """
+    완전 탐색 인덱스 (행렬은 복사하지 않고 블록 단위로 읽음)
+    - search(queries, k, exclude): 질의마다 (행 번호, 점수) 상위 k개
+    """
+    def __init__(self, matrix, metric=METRIC_L2, block_rows=SEARCH_BLOCK_ROWS):
+        if metric not in METRICS:
+            raise ValueError(f"지원하지 않는 거리입니다: {metric}")
+        self.matrix = matrix
+        self.metric = metric
+        self.block_rows = block_rows
+        self.norms = row_norms(matrix, block_rows) if metric == METRIC_L2 else None
+
+    def __len__(self):
+        return len(self.matrix)
+
+    def search(self, queries, k, exclude=None):
+        """
+        - exclude: 질의마다 결과에서 뺄 행 번호 (질의가 행렬의 행일 때 자기 자신 제외, -1이면 없음)
+        """
+        queries = np.atleast_2d(np.asarray(queries, dtype=np.float32))
+        rows = np.empty((len(queries), k), dtype=np.int64)
+        scores = np.empty((len(queries), k), dtype=np.float32)
+        for start in range(0, len(queries), QUERY_BATCH):
+            batch = slice(start, start + QUERY_BATCH)
+            batch_exclude = None if exclude is None else np.asarray(exclude)[batch]
+            rows[batch], scores[batch] = self._search_batch(queries[batch], k, batch_exclude)
+        return rows, scores
+
+    def _search_batch(self, queries, k, exclude):
+        query_norms = np.einsum('ij,ij->i', queries, queries)
+        best_costs = np.full((len(queries), 0), np.inf, dtype=np.float32)
+        best_rows = np.full((len(queries), 0), -1, dtype=np.int64)
+        for start in range(0, len(self.matrix), self.block_rows):
+            block = np.asarray(self.matrix[start:start + self.block_rows], dtype=np.float32)
+            norms = None if self.norms is None else self.norms[start:start + len(block)]
+            costs = block_costs(queries, query_norms, block, norms, self.metric)
+            if exclude is not None:
+                local = exclude - start
+                inside = (local >= 0) & (local < len(block))
+                costs[np.flatnonzero(inside), local[inside]] = np.inf
+            if costs.shape[1] > k:
+                candidates = np.argpartition(costs, k - 1, axis=1)[:, :k]
+            else:
+                candidates = np.broadcast_to(np.arange(costs.shape[1]), costs.shape)
+            best_costs, best_rows = merge_top_k(best_costs, best_rows, np.take_along_axis(costs, candidates, 1),
+                                                candidates + start, k)
+        if best_costs.shape[1] < k:  # 행렬 행이 k개보다 적은 경우
+            padding = k - best_costs.shape[1]
+            best_costs = np.pad(best_costs, ((0, 0), (0, padding)), constant_values=np.inf)
+            best_rows = np.pad(best_rows, ((0, 0), (0, padding)), constant_values=-1)
+        return finish_top_k(best_costs, best_rows, self.metric)
+
+
+def nearest_centroids(matrix, centroids, block_rows=SEARCH_BLOCK_ROWS):
+    """
+    행마다 가장 가까운(L2) 중심 번호 (블록 단위)
+    """
+    labels = np.empty(len(matrix), dtype=np.int32)
+    centroid_norms = np.einsum('ij,ij->i', centroids, centroids)
+    for start in range(0, len(matrix), block_rows):
+        block = np.asarray(matrix[start:start + block_rows], dtype=np.float32)
+        labels[start:start + len(block)] = np.argmin(centroid_norms[None, :] - 2 * (block @ centroids.T), axis=1)
+    return labels
+
+
+def train_kmeans(data, nlist, iterations=IVF_ITERATIONS, seed=0):
+    """
+    표본으로 k-means 중심을 학습하는 함수 (무작위 초기화, 빈 목록은 무작위 표본으로 다시 채움)
+    """
+    rng = np.random.default_rng(seed)
+    centroids = data[rng.choice(len(data), nlist, replace=False)].copy()
+    for _ in range(iterations):
+        labels = nearest_centroids(data, centroids)
+        counts = np.bincount(labels, minlength=nlist)
+        empty = counts == 0
+        # 목록 순서로 정렬한 뒤 구간 합으로 중심 계산
+        order = np.argsort(labels, kind='stable')
+        starts = np.concatenate([[0], np.cumsum(counts)[:-1]])[~empty]
+        sums = np.add.reduceat(data[order], starts, axis=0, dtype=np.float64)
+        centroids[~empty] = (sums / counts[~empty, None]).astype(np.float32)
+        if empty.any():
+            centroids[empty] = data[rng.choice(len(data), int(empty.sum()), replace=False)]
+    return centroids
+
+
+class IVFIndex:
+    """
+    k-means 역색인 근사 탐색 인덱스
+    - build(matrix): 표본으로 중심 학습 후 모든 행을 목록에 배정하고 목록 순서로 벡터를 재배열
+    - search(queries, k, nprobe): 질의마다 가까운 목록 nprobe개만 탐색한 (행 번호, 점수) 상위 k개
+    - save(path) / load(path): 중심 / 목록 / 재배열한 벡터 저장 (load는 벡터를 memmap으로 엶)
+    """
+    def __init__(self, nlist=None, metric=METRIC_L2, nprobe=IVF_NPROBE):
+        if metric not in METRICS:
+            raise ValueError(f"지원하지 않는 거리입니다: {metric}")
+        self.nlist = nlist
+        self.metric = metric
+        self.nprobe = nprobe
+        self.centroids = None
+        self.order = None  # 목록 순서로 재배열한 위치 → 원래 행 번호
+        self.offsets = None  # 목록 i의 위치 범위: offsets[i]:offsets[i + 1]
+        self.vectors = None
+        self.norms = None
+
+    def __len__(self):
+        return 0 if self.order is None else len(self.order)
+
+    def build(self, matrix, train_rows=None, iterations=IVF_ITERATIONS, seed=0):
+        if self.nlist is None:
+            self.nlist = max(1, int(round(np.sqrt(len(matrix)))))
+        self.nlist = min(self.nlist, len(matrix))
+        train_rows = train_rows or min(len(matrix), self.nlist * IVF_TRAIN_PER_LIST)
+        sample = np.sort(np.random.default_rng(seed).choice(len(matrix), train_rows, replace=False))
+        self.centroids = train_kmeans(np.asarray(matrix[sample], dtype=np.float32), self.nlist, iterations, seed)
+        labels = nearest_centroids(matrix, self.centroids)
+        self.order = np.argsort(labels, kind='stable').astype(np.int64)
+        self.offsets = np.concatenate([[0], np.cumsum(np.bincount(labels, minlength=self.nlist))]).astype(np.int64)
+        self.vectors = np.empty((len(matrix), matrix.shape[1]), dtype=np.float32)
+        for start in range(0, len(self.order), SEARCH_BLOCK_ROWS):
+            rows = self.order[start:start + SEARCH_BLOCK_ROWS]
+            self.vectors[start:start + len(rows)] = matrix[np.sort(rows)][np.argsort(np.argsort(rows))]
+        self.norms = row_norms(self.vectors)
+        return self
+
+    def search(self, queries, k, nprobe=None):
+        queries = np.atleast_2d(np.asarray(queries, dtype=np.float32))
+        nprobe = min(nprobe or self.nprobe, self.nlist)
+        rows = np.empty((len(queries), k), dtype=np.int64)
+        scores = np.empty((len(queries), k), dtype=np.float32)
+        for start in range(0, len(queries), QUERY_BATCH):
+            batch = slice(start, start + QUERY_BATCH)
+            rows[batch], scores[batch] = self._search_batch(queries[batch], k, nprobe)
+        return rows, scores
+
+    def _search_batch(self, queries, k, nprobe):
+        query_norms = np.einsum('ij,ij->i', queries, queries)
+        # 가까운 목록 선택 (목록 배정과 같은 L2 기준)
+        centroid_costs = np.einsum('ij,ij->i', self.centroids, self.centroids)[None, :] \
+            - 2 * (queries @ self.centroids.T)
+        if nprobe < self.nlist:
+            probes = np.argpartition(centroid_costs, nprobe - 1, axis=1)[:, :nprobe]
+        else:
+            probes = np.broadcast_to(np.arange(self.nlist), (len(queries), self.nlist))
+        best_costs = np.full((len(queries), k), np.inf, dtype=np.float32)
+        best_rows = np.full((len(queries), k), -1, dtype=np.int64)
+
+        # 목록마다 그 목록을 탐색하는 질의를 모아 한 번에 계산
+        flat_lists = probes.reshape(-1)
+        flat_queries = np.repeat(np.arange(len(queries)), probes.shape[1])
+        order = np.argsort(flat_lists, kind='stable')
+        flat_lists, flat_queries = flat_lists[order], flat_queries[order]
+        bounds = np.flatnonzero(np.diff(flat_lists)) + 1
+        for group in np.split(np.arange(len(flat_lists)), bounds):
+            if not len(group):
+                continue
+            list_number = flat_lists[group[0]]
+            start, end = self.offsets[list_number], self.offsets[list_number + 1]
+            if start == end:
+                continue
+            members = flat_queries[group]
+            block = np.asarray(self.vectors[start:end], dtype=np.float32)
+            costs = block_costs(queries[members], query_norms[members], block, self.norms[start:end], self.metric)
+            if costs.shape[1] > k:
+                candidates = np.argpartition(costs, k - 1, axis=1)[:, :k]
+            else:
+                candidates = np.broadcast_to(np.arange(costs.shape[1]), costs.shape)
+            merged_costs, merged_rows = merge_top_k(best_costs[members], best_rows[members],
+                                                    np.take_along_axis(costs, candidates, 1),
+                                                    self.order[candidates + start], k)
+            best_costs[members], best_rows[members] = merged_costs, merged_rows
+        return finish_top_k(best_costs, best_rows, self.metric)
+
+    def save(self, path):
+        """
+        <path>.ivf.npz(중심 / 목록)와 <path>.ivf.vectors.npy(재배열한 벡터)로 저장
+        """
+        vectors_path = path + IVF_VECTORS_SUFFIX
+        temp_path = vectors_path + '.tmp'
+        with open(temp_path, 'wb') as f:
+            np.lib.format.write_array(f, np.ascontiguousarray(self.vectors), allow_pickle=False)
+            f.flush()
+            os.fsync(f.fileno())
+        publish(temp_path, vectors_path)
+        meta_path = path + IVF_META_SUFFIX
+        temp_path = meta_path + '.tmp.npz'
+        np.savez(temp_path, nlist=self.nlist, metric=self.metric, nprobe=self.nprobe, centroids=self.centroids,
+                 order=self.order, offsets=self.offsets, norms=self.norms)
+        os.replace(temp_path, meta_path)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path + IVF_META_SUFFIX) as data:
+            index = cls(int(data['nlist']), str(data['metric']), int(data['nprobe']))
+            index.centroids = data['centroids']
+            index.order = data['order']
+            index.offsets = data['offsets']
+            index.norms = data['norms']
+        index.vectors = np.load(path + IVF_VECTORS_SUFFIX, mmap_mode='r')
+        return index
+
+
+def format_search_stats(label, queries, elapsed, recall=None):
+    """
+    검색 처리량 요약 문자열을 만드는 함수
+    """
+    text = f"{label}: 질의 {queries}개, {elapsed:.2f}초, {queries / (elapsed or 1e-9):,.1f} QPS"
+    if recall is not None:
+        text += f", recall {recall:.3f}"
+    return text